@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Design, DesignVersion
+from .models import Design, DesignBlob, DesignVersion
 
 
 @admin.register(Design)
@@ -11,6 +11,12 @@ class DesignAdmin(admin.ModelAdmin):
 
 @admin.register(DesignVersion)
 class DesignVersionAdmin(admin.ModelAdmin):
-    list_display = ("id", "design", "version", "created_at", "note")
+    list_display = ("id", "design", "version", "keyframe_version", "size", "created_at", "note")
     list_select_related = ("design",)
     search_fields = ("design__name",)
+
+
+@admin.register(DesignBlob)
+class DesignBlobAdmin(admin.ModelAdmin):
+    list_display = ("digest", "size", "stored_size", "created_at")
+    exclude = ("payload",)
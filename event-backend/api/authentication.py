@@ -12,17 +12,21 @@ class JWTAuthentication(authentication.BaseAuthentication):
             return None
         if len(auth) != 2:
             raise exceptions.AuthenticationFailed('Invalid token')
-        try:
-            payload = jwt.decode(auth[1], settings.SECRET_KEY, algorithms=['HS256'])
-        except jwt.ExpiredSignatureError:
-            raise exceptions.AuthenticationFailed('Token expired')
-        except jwt.InvalidTokenError:
-            raise exceptions.AuthenticationFailed('Invalid token')
-        from django.contrib.auth import get_user_model
-        user = get_user_model().objects.filter(id=payload['user_id']).first()
-        if user is None:
-            raise exceptions.AuthenticationFailed('User not found')
-        return (user, None)
+        return (user_from_token(auth[1]), None)
+
+def user_from_token(token):
+    """User a JWT was issued for; raises AuthenticationFailed"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        raise exceptions.AuthenticationFailed('Token expired')
+    except jwt.InvalidTokenError:
+        raise exceptions.AuthenticationFailed('Invalid token')
+    from django.contrib.auth import get_user_model
+    user = get_user_model().objects.filter(id=payload['user_id']).first()
+    if user is None:
+        raise exceptions.AuthenticationFailed('User not found')
+    return user
 
 def create_jwt(user):
     payload = {
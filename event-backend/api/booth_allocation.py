@@ -0,0 +1,274 @@
+"""
+Vendor-to-booth allocation
+1. Min-cost matching of vendor size preferences to booth types. Cost only depends on the
+   (preference, booth_type) pair, so it is solved exactly as a small min-cost flow between classes.
+2. Within each booth type, vendors of the same category are laid out on adjacent booths and then
+   refined with a vectorized swap local search between nearby booths that pulls each category together.
+Pure functions over plain data so large halls can be solved in a worker process.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+BOOTH_TYPE_RANK = {
+    'booth_standard': 1,
+    'booth_large': 2,
+    'booth_premium': 3,
+    'booth_island': 4,
+}
+
+PREFERENCE_RANK = {
+    'small': 1, 'standard': 1,
+    'medium': 1.5,  # between standard and large: prefers the upgrade, then a standard booth
+    'large': 2,
+    'premium': 3,
+    'island': 4,
+    **BOOTH_TYPE_RANK,
+}
+
+# Halls with at least this many free booths are solved in a worker process
+WORKER_THRESHOLD = 500
+ALLOCATION_TIMEOUT = 30   # seconds a request waits for the worker
+# Swap search only pairs each booth with its nearest neighbours, so memory stays O(n * k)
+SWAP_NEIGHBOURS = 32
+NEIGHBOUR_BLOCK = 512     # rows of the distance matrix held at once while finding neighbours
+
+UPGRADE_COST = 1.0
+DOWNGRADE_COST = 3.0
+NO_PREFERENCE_COST = 0.5
+
+
+def preference_rank(preference):
+    return PREFERENCE_RANK.get((preference or '').strip().lower())
+
+
+def match_cost(pref_rank, booth_rank):
+    """Cost of giving a vendor with `pref_rank` a booth of `booth_rank` - downgrades hurt more than upgrades"""
+    if pref_rank is None:
+        return NO_PREFERENCE_COST * (booth_rank - 1)
+    if booth_rank >= pref_rank:
+        return UPGRADE_COST * (booth_rank - pref_rank)
+    return DOWNGRADE_COST * (pref_rank - booth_rank)
+
+
+# ========================================== Class-level matching ==========================================
+def min_cost_class_flow(supply, demand):
+    """Min-cost max-flow from preference classes to booth types (successive shortest paths).
+
+    supply: {pref_rank: vendor count}, demand: {booth_type: booth count}
+    Returns {(pref_rank, booth_type): count}
+    """
+    prefs, types = list(supply), list(demand)
+    # Nodes: 0 = source, 1..P = prefs, P+1..P+T = types, P+T+1 = sink
+    sink = len(prefs) + len(types) + 1
+    edges = []  # [to, capacity, cost, reverse index]
+    graph = defaultdict(list)
+
+    def add_edge(u, v, capacity, cost):
+        graph[u].append(len(edges))
+        edges.append([v, capacity, cost, len(edges) + 1])
+        graph[v].append(len(edges))
+        edges.append([u, 0, -cost, len(edges) - 1])
+
+    for i, pref in enumerate(prefs):
+        add_edge(0, 1 + i, supply[pref], 0.0)
+        for j, booth_type in enumerate(types):
+            add_edge(1 + i, 1 + len(prefs) + j, min(supply[pref], demand[booth_type]),
+                     match_cost(pref, BOOTH_TYPE_RANK[booth_type]))
+    for j, booth_type in enumerate(types):
+        add_edge(1 + len(prefs) + j, sink, demand[booth_type], 0.0)
+
+    while True:
+        # Bellman-Ford - the graph has at most a dozen nodes
+        dist = {0: 0.0}
+        parent = {}
+        for _ in range(sink + 1):
+            updated = False
+            for u in list(dist):
+                for e in graph[u]:
+                    v, capacity, cost, _ = edges[e]
+                    if capacity > 0 and dist[u] + cost < dist.get(v, float('inf')) - 1e-9:
+                        dist[v] = dist[u] + cost
+                        parent[v] = e
+                        updated = True
+            if not updated:
+                break
+        if sink not in dist:
+            break
+        push, node = float('inf'), sink
+        while node != 0:
+            e = parent[node]
+            push = min(push, edges[e][1])
+            node = edges[edges[e][3]][0]
+        node = sink
+        while node != 0:
+            e = parent[node]
+            edges[e][1] -= push
+            edges[edges[e][3]][1] += push
+            node = edges[edges[e][3]][0]
+
+    flow = {}
+    for i, pref in enumerate(prefs):
+        for e in graph[1 + i]:
+            v, capacity, _, rev = edges[e]
+            if 1 + len(prefs) <= v < sink and edges[rev][1] > 0:
+                flow[(pref, types[v - 1 - len(prefs)])] = edges[rev][1]
+    return flow
+
+
+# ========================================== Spatial refinement ==========================================
+def serpentine_order(centers, row_height):
+    """Order booths row by row, alternating direction, so neighbours in the order are neighbours in space"""
+    rows = np.floor(centers[:, 1] / max(row_height, 1e-6)).astype(int)
+    x = np.where(rows % 2 == 0, centers[:, 0], -centers[:, 0])
+    return np.lexsort((x, rows))
+
+
+def category_centroids(positions, codes, n_categories, anchor_sum, anchor_count):
+    valid = codes >= 0
+    sums = np.zeros((n_categories, 2)) + anchor_sum
+    counts = np.zeros(n_categories) + anchor_count
+    np.add.at(sums, codes[valid], positions[valid])
+    np.add.at(counts, codes[valid], 1)
+    return sums / np.maximum(counts, 1)[:, None]
+
+
+def nearest_neighbours(positions, k, block=NEIGHBOUR_BLOCK):
+    """(n, k) indices of each point's k nearest other points, a block of distance rows at a time"""
+    n = len(positions)
+    result = np.empty((n, k), dtype=np.intp)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        distances = np.linalg.norm(positions[start:stop, None, :] - positions[None, :, :], axis=2)
+        distances[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        result[start:stop] = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    return result
+
+
+def swap_pairs(positions, k):
+    """Unique (i, j) pairs, i < j, of booths within each other's k nearest neighbours"""
+    n = len(positions)
+    near = nearest_neighbours(positions, k)
+    rows = np.repeat(np.arange(n), k)
+    cols = near.ravel()
+    keys = np.unique(np.minimum(rows, cols) * n + np.maximum(rows, cols))
+    return np.stack([keys // n, keys % n], axis=1)
+
+
+def refine_clusters(positions, codes, n_categories, anchor_sum, anchor_count, rounds=40, neighbours=SWAP_NEIGHBOURS):
+    """Swap vendors between booths of one type while it shortens distances to their category centroid.
+
+    positions: (n, 2) booth centres; codes: (n,) category of the vendor on each booth (-1 = none or empty).
+    Only booths among each other's `neighbours` nearest are swap candidates, so every array is
+    O(n * neighbours); categories still travel across the hall over successive rounds. Each round
+    evaluates every candidate swap at once and applies the best disjoint improving ones.
+    """
+    codes = codes.copy()
+    positions = positions.astype(np.float32)
+    n = len(codes)
+    if n < 2 or n_categories == 0:
+        return codes
+    pairs = swap_pairs(positions, min(neighbours, n - 1))
+    first, second = pairs[:, 0], pairs[:, 1]
+    for _ in range(rounds):
+        centroids = category_centroids(positions, codes, n_categories, anchor_sum, anchor_count)
+        vendor_centroid = centroids[np.maximum(codes, 0)].astype(np.float32)
+        has_category = codes >= 0
+        own = np.where(has_category, np.linalg.norm(positions - vendor_centroid, axis=1), 0.0)
+        # Distance of the vendor now on one booth of the pair from the other booth
+        moved_out = np.where(has_category[first], np.linalg.norm(positions[second] - vendor_centroid[first], axis=1), 0.0)
+        moved_in = np.where(has_category[second], np.linalg.norm(positions[first] - vendor_centroid[second], axis=1), 0.0)
+        gain = own[first] + own[second] - moved_out - moved_in
+        gain[codes[first] == codes[second]] = 0.0
+        candidates = np.flatnonzero(gain > 1e-6)
+        if not len(candidates):
+            break
+        order = candidates[np.argsort(-gain[candidates])][:4 * n]
+        used = np.zeros(n, dtype=bool)
+        for i, j in pairs[order]:
+            if used[i] or used[j]:
+                continue
+            codes[i], codes[j] = codes[j], codes[i]
+            used[i] = used[j] = True
+    return codes
+
+
+# ========================================== Entry point ==========================================
+def allocate(problem):
+    """Allocate free booths to unassigned vendors.
+
+    problem = {
+        'booths': [(booth_id, booth_type, cx, cy, height)],   # free booths
+        'vendors': [(vendor_id, booth_size_preference, category)],  # unassigned vendors, priority order
+        'anchors': [(category, cx, cy)],                      # already-placed vendors
+    }
+    Returns {'assignments': [(vendor_id, booth_id)], 'unassigned': [vendor_id], 'match_cost': float}
+    """
+    booths_by_type = defaultdict(list)
+    for booth in problem['booths']:
+        booths_by_type[booth[1]].append(booth)
+    vendors_by_pref = defaultdict(list)
+    for vendor_id, preference, category in problem['vendors']:
+        vendors_by_pref[preference_rank(preference)].append((vendor_id, category or ''))
+
+    flow = min_cost_class_flow(
+        {pref: len(vendors) for pref, vendors in vendors_by_pref.items()},
+        {booth_type: len(booths) for booth_type, booths in booths_by_type.items()},
+    )
+
+    categories = sorted({category for vendors in vendors_by_pref.values() for _, category in vendors if category})
+    code_of = {category: code for code, category in enumerate(categories)}
+    anchor_sum = np.zeros((len(categories), 2))
+    anchor_count = np.zeros(len(categories))
+    for category, cx, cy in problem['anchors']:
+        if category in code_of:
+            anchor_sum[code_of[category]] += (cx, cy)
+            anchor_count[code_of[category]] += 1
+
+    # Hand out vendors per (preference -> booth type) quota, in priority order
+    cursor = defaultdict(int)
+    vendors_for_type = defaultdict(list)
+    total_cost = 0.0
+    for (pref, booth_type), count in sorted(flow.items(), key=lambda item: str(item[0])):
+        start = cursor[pref]
+        vendors_for_type[booth_type].extend(vendors_by_pref[pref][start:start + count])
+        cursor[pref] += count
+        total_cost += count * match_cost(pref, BOOTH_TYPE_RANK[booth_type])
+
+    assignments = []
+    for booth_type, vendors in vendors_for_type.items():
+        booths = booths_by_type[booth_type]
+        centers = np.array([(b[2], b[3]) for b in booths], dtype=float)
+        order = serpentine_order(centers, float(np.median([b[4] for b in booths])))
+        # Spare booths take part in the search as empty slots (some slack, not the whole hall)
+        order = order[:len(vendors) + max(len(vendors) // 4, 8)]
+        slots = centers[order]
+        slot_booths = [booths[k][0] for k in order]
+
+        # Seed: vendors grouped by category (categories with placed anchors ordered by anchor position)
+        def seed_key(vendor):
+            code = code_of.get(vendor[1], -1)
+            if code >= 0 and anchor_count[code]:
+                cx, cy = anchor_sum[code] / anchor_count[code]
+                return (0, cy, cx, vendor[1])
+            return (1, 0, 0, vendor[1])
+        vendors = sorted(vendors, key=seed_key)
+        codes = np.full(len(slots), -1, dtype=int)
+        codes[:len(vendors)] = [code_of.get(category, -1) for _, category in vendors]
+        refined = refine_clusters(slots, codes, len(categories), anchor_sum, anchor_count)
+
+        # Map refined category codes back onto concrete vendors
+        pool = defaultdict(list)
+        for vendor_id, category in vendors:
+            pool[code_of.get(category, -1)].append(vendor_id)
+        for booth_id, code in zip(slot_booths, refined):
+            if pool[int(code)]:
+                assignments.append((pool[int(code)].pop(), booth_id))
+
+    assigned = {vendor_id for vendor_id, _ in assignments}
+    return {
+        'assignments': assignments,
+        'unassigned': [vendor_id for vendor_id, _, _ in problem['vendors'] if vendor_id not in assigned],
+        'match_cost': total_cost,
+    }
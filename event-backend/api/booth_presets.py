@@ -0,0 +1,150 @@
+"""
+Tradeshow hall presets
+A preset name plus hall dimensions expands into a full floor plan: double rows of booths split by
+cross aisles, optional island blocks, restrooms, an entrance lobby with info desk and doors.
+Booth positions are pure array arithmetic over row/column indices, so the same preset and hall
+always produce the same booths, in the same order, with the same labels.
+"""
+
+import numpy as np
+
+from .layout_generator import row_label
+
+PERIMETER = 3.0          # aisle kept along every wall
+LOBBY_DEPTH = 6.0        # entrance band along the bottom wall
+RESTROOM_SIZE = (4.0, 3.0)
+DOOR_SIZE = (1.2, 0.8)
+DOOR_SPACING = 40.0      # one door per this much wall length
+INFO_DESK_SIZE = (3.0, 1.5)
+MAX_HALL_SIDE = 500.0    # metres
+MAX_PRESET_BOOTHS = 5000
+
+PRESETS = {
+    'standard_grid': {
+        'booth': ('booth_standard', 3.0, 3.0), 'aisle': 3.0, 'cross_every': 10, 'islands': None,
+    },
+    'large_booths': {
+        'booth': ('booth_large', 6.0, 3.0), 'aisle': 3.0, 'cross_every': 6, 'islands': None,
+    },
+    'island_center': {
+        'booth': ('booth_standard', 3.0, 3.0), 'aisle': 3.0, 'cross_every': 10,
+        'islands': {'size': 6.0, 'cols': 3, 'rows': 2},
+    },
+    'expo': {
+        'booth': ('booth_standard', 3.0, 3.0), 'aisle': 4.0, 'cross_every': 8,
+        'islands': {'size': 9.0, 'cols': 4, 'rows': 2}, 'premium_front_row': True,
+    },
+}
+
+FACILITY_CATEGORY = 'facility'
+BOOTH_CATEGORY = 'booth'
+
+
+def item(booth_type, label, x, y, width, height):
+    category = BOOTH_CATEGORY if booth_type.startswith('booth_') else FACILITY_CATEGORY
+    return {
+        'booth_type': booth_type, 'category': category, 'label': label,
+        'position_x': round(float(x), 2), 'position_y': round(float(y), 2),
+        'width': round(float(width), 2), 'height': round(float(height), 2),
+    }
+
+
+def row_columns(x0, x1, booth_width, aisle, cross_every):
+    """Left edges of booths along a row, with a cross aisle after every `cross_every` booths"""
+    pitch_block = cross_every * booth_width + aisle
+    n_blocks = int((x1 - x0 + aisle) // pitch_block) + 1
+    k = np.arange(n_blocks * cross_every)
+    x = x0 + k * booth_width + (k // cross_every) * aisle
+    x = x[x + booth_width <= x1 + 1e-9]
+    # Centre the row in the available width
+    if len(x):
+        x = x + ((x1 - x0) - (x[-1] + booth_width - x0)) / 2
+    return x
+
+
+def generate_preset(preset_name, hall_width, hall_height):
+    """Booth dicts for a preset; raises ValueError for an unknown preset or a hall too small for it"""
+    if preset_name not in PRESETS:
+        raise ValueError(f"preset must be one of {', '.join(PRESETS)}")
+    preset = PRESETS[preset_name]
+    booth_type, bw, bh = preset['booth']
+    aisle = preset['aisle']
+    W, H = float(hall_width), float(hall_height)
+    if not (0 < W <= MAX_HALL_SIDE and 0 < H <= MAX_HALL_SIDE):
+        raise ValueError(f'hall_width and hall_height must be between 0 and {MAX_HALL_SIDE:g} metres')
+
+    area_x0, area_x1 = PERIMETER, W - PERIMETER
+    area_y0 = PERIMETER + RESTROOM_SIZE[1] + aisle
+    area_y1 = H - LOBBY_DEPTH - PERIMETER
+    if area_x1 - area_x0 < bw or area_y1 - area_y0 < 2 * bh:
+        raise ValueError('hall is too small for this preset')
+
+    items = []
+
+    # ---- Double rows (back to back) separated by aisles
+    pitch = 2 * bh + aisle
+    n_double = int((area_y1 - area_y0 + aisle) // pitch)
+    row_y = area_y0 + np.arange(n_double) * pitch
+    cols = row_columns(area_x0, area_x1, bw, aisle, preset['cross_every'])
+    # (row, col) grid of top-left corners, two booth rows per double row
+    ys = (row_y[:, None] + np.array([0.0, bh])[None, :]).ravel()
+    gx, gy = np.meshgrid(cols, ys)
+    gx, gy = gx.ravel(), gy.ravel()
+    grid_row = np.repeat(np.arange(len(ys)), len(cols))
+
+    # ---- Island block in the middle replaces the booths under it
+    islands = []
+    if preset['islands']:
+        size, icols, irows = preset['islands']['size'], preset['islands']['cols'], preset['islands']['rows']
+        block_w = icols * size + (icols - 1) * aisle
+        block_h = irows * size + (irows - 1) * aisle
+        if block_w <= area_x1 - area_x0 and block_h <= area_y1 - area_y0:
+            bx0 = (W - block_w) / 2
+            by0 = area_y0 + ((area_y1 - area_y0) - block_h) / 2
+            ix, iy = np.meshgrid(bx0 + np.arange(icols) * (size + aisle), by0 + np.arange(irows) * (size + aisle))
+            islands = list(zip(ix.ravel(), iy.ravel()))
+            # Drop booths within an aisle's width of the block
+            clear = ((gx + bw <= bx0 - aisle) | (gx >= bx0 + block_w + aisle)
+                     | (gy + bh <= by0 - aisle) | (gy >= by0 + block_h + aisle))
+            gx, gy, grid_row = gx[clear], gy[clear], grid_row[clear]
+
+    if len(gx) + len(islands) > MAX_PRESET_BOOTHS:
+        raise ValueError(f'this preset would place more than {MAX_PRESET_BOOTHS} booths; use a smaller hall')
+
+    front_row = grid_row.max() if len(grid_row) else -1
+    for r in np.unique(grid_row):
+        in_row = grid_row == r
+        for n, (x, y) in enumerate(zip(gx[in_row], gy[in_row]), start=1):
+            kind = 'booth_premium' if preset.get('premium_front_row') and r == front_row else booth_type
+            items.append(item(kind, f'{row_label(int(r))}{n:02d}', x, y, bw, bh))
+    for n, (x, y) in enumerate(islands, start=1):
+        items.append(item('booth_island', f'I{n}', x, y, size, size))
+
+    # ---- Aisles: between double rows and down every cross aisle
+    n = 0
+    for y in row_y[:-1] + 2 * bh:
+        n += 1
+        items.append(item('aisle', f'Aisle {n}', area_x0, y, area_x1 - area_x0, aisle))
+    if len(cols):
+        block_ends = cols[preset['cross_every'] - 1::preset['cross_every']] + bw
+        for x in block_ends[block_ends + aisle <= cols[-1] + 1e-9]:
+            n += 1
+            items.append(item('aisle', f'Aisle {n}', x, area_y0, aisle, area_y1 - area_y0))
+
+    # ---- Facilities: restrooms in the back corners, lobby with info desk and doors along the front
+    rw, rh = RESTROOM_SIZE
+    items.append(item('restroom', 'Restroom 1', PERIMETER, PERIMETER, rw, rh))
+    items.append(item('restroom', 'Restroom 2', W - PERIMETER - rw, PERIMETER, rw, rh))
+    lobby_y = H - LOBBY_DEPTH
+    items.append(item('waiting_area', 'Lobby', PERIMETER, lobby_y, W - 2 * PERIMETER, LOBBY_DEPTH - PERIMETER / 2))
+    items.append(item('info_desk', 'Info Desk', (W - INFO_DESK_SIZE[0]) / 2, lobby_y + 1.0, *INFO_DESK_SIZE))
+
+    dw, dh = DOOR_SIZE
+    n_doors = max(1, int(W // DOOR_SPACING))
+    door_x = (np.arange(n_doors) + 0.5) * W / n_doors - dw / 2
+    for n, x in enumerate(door_x, start=1):
+        items.append(item('door1', f'Entrance {n}', x, H - dh, dw, dh))
+    # Emergency exits on the side walls
+    items.append(item('door2', 'Exit West', 0.0, H / 2 - dw / 2, dh, dw))
+    items.append(item('door2', 'Exit East', W - dh, H / 2 - dw / 2, dh, dw))
+    return items
@@ -0,0 +1,167 @@
+"""
+Design archives
+Moves designs with their whole version history between environments as gzip-compressed NDJSON:
+
+    {"type": "archive", "format": 1, "exported_at": ...}
+    {"type": "design", "name": ..., "kind": ..., "versions": n}
+    {"type": "version", "version": ..., "note": ..., "created_at": ..., "content_hash": ..., "data" | "delta": ...}
+    ...
+
+Version lines carry what is stored (see design_store): the full JSON for keyframes, otherwise a
+delta against the version line before it. Export streams rows straight from the database and
+import replays them one at a time and inserts in batches, so neither side holds more than one
+version's JSON and one batch in memory. Import re-chains versions with this environment's
+keyframe settings and checks every content hash.
+"""
+
+import gzip
+import io
+import json
+import zlib
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .design_store import decode, encode, make_blob, store_blobs, stored_fields
+from .json_delta import dumps, patch
+from .models import Design, DesignVersion
+
+FORMAT = 1
+BATCH_SIZE = 200
+NAME_LENGTH = Design._meta.get_field('name').max_length
+
+
+def export_archive(designs):
+    """Gzip-compressed NDJSON chunks of `designs` with all their versions"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def lines():
+        yield {'type': 'archive', 'format': FORMAT, 'exported_at': timezone.now().isoformat()}
+        for design in designs.iterator():
+            yield {'type': 'design', 'name': design.name, 'kind': design.kind, 'versions': design.versions.count()}
+            rows = (DesignVersion.objects.filter(design=design).order_by('version')
+                    .values_list('version', 'keyframe_version', 'note', 'created_at', 'content_hash', 'blob__payload'))
+            for version, keyframe_version, note, created_at, content_hash, payload in rows.iterator(chunk_size=BATCH_SIZE):
+                yield {
+                    'type': 'version', 'version': version, 'note': note,
+                    'created_at': created_at.isoformat(), 'content_hash': content_hash,
+                    'data' if keyframe_version == version else 'delta': decode(payload),
+                }
+
+    for line in lines():
+        chunk = compressor.compress(dumps(line).encode() + b'\n')
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+class ArchiveError(ValueError):
+    """A malformed archive, with a message for the client"""
+
+
+def import_archive(user, fileobj):
+    """Create `user`'s designs from an archive file; returns them. Raises ArchiveError (a ValueError) if it is malformed."""
+    try:
+        stream = io.TextIOWrapper(gzip.GzipFile(fileobj=fileobj), encoding='utf-8')
+        with transaction.atomic():
+            return _import_lines(user, stream)
+    except ArchiveError:
+        raise
+    except (OSError, EOFError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ArchiveError(f'unreadable archive: {exc}') from exc
+    except (KeyError, IndexError, TypeError, AttributeError, ValueError) as exc:
+        # A delta that does not fit the version before it
+        raise ArchiveError(f'inconsistent archive: {exc!r}') from exc
+
+
+def _import_lines(user, stream):
+    designs, writer = [], None
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        kind = entry.get('type') if isinstance(entry, dict) else None
+        if number == 1:
+            if kind != 'archive' or entry.get('format') != FORMAT:
+                raise ArchiveError('not a design archive')
+        elif kind == 'design':
+            if writer is not None:
+                writer.finish()
+            writer = _DesignWriter(user, entry)
+            designs.append(writer.design)
+        elif kind == 'version' and writer is not None:
+            writer.add(entry, number)
+        else:
+            raise ArchiveError(f'line {number}: unexpected entry')
+    if writer is not None:
+        writer.finish()
+    return designs
+
+
+class _DesignWriter:
+    """Replays one design's version lines and inserts them in batches"""
+
+    def __init__(self, user, entry):
+        name = str(entry.get('name') or 'Imported design')[:NAME_LENGTH]
+        kind = entry.get('kind') if entry.get('kind') in dict(Design.KIND_CHOICES) else 'custom'
+        self.design = Design.objects.create(user=user, name=_free_name(user, name), kind=kind)
+        self.data, self.base, self.last = None, None, 0
+        self.batch, self.blobs = [], {}
+
+    def add(self, entry, number):
+        version = entry.get('version')
+        if not isinstance(version, int) or version <= self.last:
+            raise ArchiveError(f'line {number}: versions must be increasing integers')
+        if 'data' in entry:
+            self.data = entry['data']
+        elif 'delta' in entry and self.data is not None:
+            self.data = patch(self.data, entry['delta'])
+        else:
+            raise ArchiveError(f'line {number}: version has no data')
+        content_hash, raw = encode(self.data)
+        if content_hash != entry.get('content_hash'):
+            raise ArchiveError(f'line {number}: content hash mismatch')
+
+        fields = stored_fields(version, self.data, self.base)
+        blob = make_blob(fields['data'] if fields['delta'] is None else fields['delta'])
+        self.blobs[blob.digest] = blob
+        self.batch.append(DesignVersion(
+            design=self.design, version=version, blob_id=blob.digest, keyframe_version=fields['keyframe_version'],
+            content_hash=content_hash, size=len(raw), note=str(entry.get('note') or '')[:255],
+            created_at=parse_datetime(entry.get('created_at') or '') or timezone.now(),
+        ))
+        self.base, self.last = (version, fields['keyframe_version'], self.data), version
+        if len(self.batch) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        created_at = [row.created_at for row in self.batch]
+        store_blobs(self.blobs.values())
+        rows = DesignVersion.objects.bulk_create(self.batch)
+        # auto_now_add overwrote the exported timestamps on insert
+        for row, value in zip(rows, created_at):
+            row.created_at = value
+        DesignVersion.objects.bulk_update(rows, ['created_at'])
+        self.head, self.batch, self.blobs = rows[-1], [], {}
+
+    def finish(self):
+        self.flush()
+        if self.last:
+            Design.objects.filter(pk=self.design.pk).update(latest_version=self.last, head=self.head)
+            self.design.latest_version, self.design.head = self.last, self.head
+
+
+def _free_name(user, name):
+    """`name`, or `name (n)` when the user already has a design called that; the name is cut
+    short to leave room for the suffix"""
+    prefix = name[:NAME_LENGTH - 12]  # room for ' (n)' up to 9 digits
+    taken = set(Design.objects.filter(user=user, name__startswith=prefix).values_list('name', flat=True))
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        suffix = f' ({n})'
+        candidate = name[:NAME_LENGTH - len(suffix)] + suffix
+    return candidate
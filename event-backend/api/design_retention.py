@@ -0,0 +1,119 @@
+"""
+Design version retention
+Autosave leaves many versions per hour, so old ones are thinned by age: by default every version
+from the last day, the newest per hour for a week, then the newest per day. A design's newest
+version and versions saved with a note are always kept.
+
+Dropping a version breaks the delta chain of the versions stored after it (see design_store), so
+each affected chain is re-encoded from its surviving members before the rows are deleted. Work is
+done one chain per transaction, under the same design row lock saves take, so neither a save nor
+a reader ever waits on more than one short chain.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .design_store import decode, delete_orphan_blobs, store_blob, stored_fields
+from .json_delta import patch
+from .models import Design, DesignVersion
+
+DEFAULTS = {
+    # (max age in hours or None, keep the newest version per this many hours or None for all)
+    'TIERS': [(24, None), (24 * 7, 1), (None, 24)],
+    'KEEP_NOTED': True,
+}
+
+
+def get_retention_settings():
+    return {**DEFAULTS, **getattr(settings, 'DESIGN_RETENTION', {})}
+
+
+class RetentionPolicy:
+    """Age tiers, each keeping every version or the newest one per fixed-length bucket"""
+
+    def __init__(self, tiers=None, keep_noted=None):
+        config = get_retention_settings()
+        self.tiers = tiers if tiers is not None else config['TIERS']
+        self.keep_noted = config['KEEP_NOTED'] if keep_noted is None else keep_noted
+
+    @property
+    def keep_all_for(self):
+        """Age below which nothing is ever dropped"""
+        first_age, first_every = self.tiers[0]
+        return timedelta(hours=first_age) if first_every is None and first_age is not None else timedelta(0)
+
+    def bucket_hours(self, age):
+        for max_age, every in self.tiers:
+            if max_age is None or age < timedelta(hours=max_age):
+                return every
+        return self.tiers[-1][1]
+
+    def expired(self, versions, now):
+        """Ids the policy drops from `versions`, given as (id, created_at, note) newest first"""
+        seen, expired = set(), []
+        for version_id, created_at, note in versions:
+            every = self.bucket_hours(now - created_at)
+            if every is None:
+                continue
+            bucket = (every, int(created_at.timestamp() // (every * 3600)))
+            if bucket not in seen:
+                seen.add(bucket)  # the newest version of each bucket stays
+            elif not (self.keep_noted and note):
+                expired.append(version_id)
+        return expired
+
+
+def candidate_designs(policy, now):
+    """Ids of designs with versions old enough for the policy to drop"""
+    return (Design.objects.filter(versions__created_at__lt=now - policy.keep_all_for)
+            .order_by().values_list('id', flat=True).distinct())
+
+
+def compact_design(design_id, policy, now, dry_run=False):
+    """Apply the policy to one design; returns the number of versions dropped"""
+    versions = (DesignVersion.objects.filter(design_id=design_id).order_by('-version')
+                .values_list('id', 'created_at', 'note', 'keyframe_version'))
+    rows = list(versions)
+    expired = set(policy.expired([row[:3] for row in rows], now))
+    if dry_run or not expired:
+        return len(expired)
+    dropped = 0
+    for keyframe_version in sorted({row[3] for row in rows if row[0] in expired}):
+        dropped += rechain(design_id, keyframe_version, expired)
+    return dropped
+
+
+def rechain(design_id, keyframe_version, expired):
+    """Drop the expired members of one chain, re-encoding the survivors stored after the first of them"""
+    with transaction.atomic():
+        # Same lock as design_store.create_version: no save extends this chain meanwhile
+        list(Design.objects.select_for_update().filter(pk=design_id).values_list('pk'))
+        members = list(DesignVersion.objects.filter(design_id=design_id, keyframe_version=keyframe_version)
+                       .order_by('version').values_list('id', 'version', 'keyframe_version', 'blob_id', 'blob__payload'))
+        data, base, intact = None, None, True
+        rewritten, dropped, old_blobs = [], [], set()
+        for version_id, version, stored_keyframe, blob_id, payload in members:
+            stored = decode(payload)
+            data = stored if stored_keyframe == version else patch(data, stored)
+            if version_id in expired:
+                dropped.append(version_id)
+                old_blobs.add(blob_id)
+                intact = False
+                continue
+            if not intact:
+                # Re-encode against the previous survivor (a keyframe if there is none yet)
+                fields = stored_fields(version, data, base)
+                row = DesignVersion(id=version_id, keyframe_version=fields['keyframe_version'])
+                row.blob_id = store_blob(fields['data'] if fields['delta'] is None else fields['delta'])
+                rewritten.append(row)
+                old_blobs.add(blob_id)
+                stored_keyframe = fields['keyframe_version']
+            base = (version, stored_keyframe, data)
+
+        DesignVersion.objects.bulk_update(rewritten, ['blob', 'keyframe_version'])
+        DesignVersion.objects.filter(id__in=dropped).delete()
+        # Blobs this chain no longer uses, unless another version shares them
+        delete_orphan_blobs(old_blobs)
+    return len(dropped)
@@ -0,0 +1,221 @@
+"""
+Design version storage
+Versions are stored as keyframes (the full editor JSON) followed by structural deltas against the
+version before them (see json_delta). A new keyframe starts every KEYFRAME_INTERVAL versions, or
+sooner when a delta would not be clearly smaller than the snapshot, so reading any version replays
+a short chain. Reconstructed snapshots are kept in a per-process LRU; a version never changes once
+written, so its entries never go stale.
+
+Keyframes and deltas live in DesignBlob rows addressed by the hash of their canonical JSON and
+compressed with zlib, so identical payloads are stored once and versions are small pointers.
+Saving the same content as the latest version writes nothing.
+"""
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .json_delta import diff, dumps, patch
+from .models import Design, DesignBlob, DesignVersion
+
+DEFAULTS = {
+    'KEYFRAME_INTERVAL': 20,   # longest chain of deltas after a keyframe
+    'KEYFRAME_RATIO': 0.5,     # a delta larger than this share of the snapshot is stored as a keyframe
+    'CACHE_SIZE': 128,         # reconstructed snapshots kept per process
+}
+
+
+def get_store_settings():
+    return {**DEFAULTS, **getattr(settings, 'DESIGN_VERSIONS', {})}
+
+
+class SnapshotCache:
+    """Small LRU of {(design_id, version): data}"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, design_id, version):
+        with self._lock:
+            data = self._entries.get((design_id, version))
+            if data is not None:
+                self._entries.move_to_end((design_id, version))
+            return data
+
+    def put(self, design_id, version, data):
+        with self._lock:
+            self._entries[(design_id, version)] = data
+            self._entries.move_to_end((design_id, version))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+snapshots = SnapshotCache(maxsize=get_store_settings()['CACHE_SIZE'])
+
+
+def encode(value):
+    """(digest, canonical JSON bytes) of a JSON value"""
+    raw = dumps(value).encode()
+    return hashlib.blake2b(raw, digest_size=32).hexdigest(), raw
+
+
+def decode(payload):
+    return json.loads(zlib.decompress(bytes(payload)))
+
+
+def make_blob(value):
+    """Unsaved DesignBlob holding `value`"""
+    digest, raw = encode(value)
+    compressed = zlib.compress(raw, 6)
+    return DesignBlob(digest=digest, payload=compressed, size=len(raw), stored_size=len(compressed))
+
+
+def store_blobs(blobs):
+    """Insert unsaved DesignBlobs unless already stored, then lock them until the transaction ends.
+
+    The lock keeps delete_orphan_blobs from removing a blob that was found already stored before
+    the version pointing to it commits; one deleted just before the lock is inserted again.
+    """
+    pending = {blob.digest: blob for blob in blobs}
+    while pending:
+        # ON CONFLICT DO NOTHING: concurrent writers of the same payload both succeed
+        DesignBlob.objects.bulk_create(pending.values(), ignore_conflicts=True)
+        locked = set(DesignBlob.objects.select_for_update().filter(digest__in=list(pending))
+                     .order_by('digest').values_list('digest', flat=True))
+        pending = {digest: blob for digest, blob in pending.items() if digest not in locked}
+
+
+def store_blob(value):
+    """Digest of the blob holding `value`, inserting it unless it is already stored"""
+    blob = make_blob(value)
+    store_blobs([blob])
+    return blob.digest
+
+
+def delete_orphan_blobs(digests):
+    """Delete the blobs among `digests` that no version points to.
+
+    Candidates are locked before the check, so a writer that found one of them already stored
+    (store_blobs) either commits its version first, keeping the blob, or waits and inserts it again.
+    """
+    digests = sorted(set(digests))
+    for start in range(0, len(digests), 500):
+        locked = list(DesignBlob.objects.select_for_update().filter(digest__in=digests[start:start + 500])
+                      .order_by('digest').values_list('digest', flat=True))
+        DesignBlob.objects.filter(digest__in=locked, versions__isnull=True).delete()
+
+
+def stored_fields(version, data, base=None):
+    """Field values storing `data` as `version`.
+
+    `base` is (version, keyframe_version, data) of the design's previous version, or None. The new
+    version extends that chain unless the chain is full or the delta is not worth storing.
+    """
+    config = get_store_settings()
+    if base is not None:
+        _, keyframe_version, base_data = base
+        if keyframe_version is not None and version - keyframe_version < config['KEYFRAME_INTERVAL']:
+            delta = diff(base_data, data)
+            if len(dumps(delta)) <= config['KEYFRAME_RATIO'] * len(dumps(data)):
+                return {'data': None, 'delta': delta, 'keyframe_version': keyframe_version}
+    return {'data': data, 'delta': None, 'keyframe_version': version}
+
+
+def replay(rows, data=None):
+    """Snapshot after applying chain rows (version, keyframe_version, payload) in order to `data`"""
+    for version, keyframe_version, payload in rows:
+        stored = decode(payload)
+        data = stored if keyframe_version == version else patch(data, stored)
+    return data
+
+
+def snapshot(row):
+    """Full editor JSON of a DesignVersion"""
+    data = snapshots.get(row.design_id, row.version)
+    if data is not None:
+        return data
+    for attempt in range(2):
+        # Replay from the newest cached version of the chain, or from its keyframe
+        start, base = row.keyframe_version - 1, None
+        for version in range(row.version - 1, row.keyframe_version - 1, -1):
+            base = snapshots.get(row.design_id, version)
+            if base is not None:
+                start = version
+                break
+        chain = list(DesignVersion.objects.filter(
+            design_id=row.design_id, keyframe_version=row.keyframe_version,
+            version__gt=start, version__lte=row.version,
+        ).order_by('version').values_list('version', 'keyframe_version', 'blob__payload'))
+        if chain and chain[-1][0] == row.version and (base is not None or chain[0][0] == chain[0][1]):
+            break
+        # Retention re-chained this version after it was loaded (see design_retention)
+        row = DesignVersion.objects.get(pk=row.pk)
+    data = replay(chain, base)
+    snapshots.put(row.design_id, row.version, data)
+    return data
+
+
+def create_version(design, data, note=''):
+    """Store `data` as the design's next version; returns (DesignVersion, created).
+
+    When `data` is identical to the latest version nothing is written and that version is returned.
+    """
+    content_hash, raw = encode(data)
+    with transaction.atomic():
+        # Locking the design row queues concurrent saves of one design, so each reads the head the
+        # previous one wrote and numbers never collide; the head is then a primary-key lookup
+        locked = Design.objects.select_for_update().only('latest_version', 'head').get(pk=design.pk)
+        previous = DesignVersion.objects.get(pk=locked.head_id) if locked.head_id is not None else None
+        if previous is not None and previous.content_hash == content_hash:
+            return previous, False
+        version = locked.latest_version + 1
+        base = (previous.version, previous.keyframe_version, snapshot(previous)) if previous is not None else None
+        fields = stored_fields(version, data, base)
+        row = DesignVersion.objects.create(
+            design=design, version=version, note=note, keyframe_version=fields['keyframe_version'],
+            blob_id=store_blob(fields['data'] if fields['delta'] is None else fields['delta']),
+            content_hash=content_hash, size=len(raw),
+        )
+        Design.objects.filter(pk=design.pk).update(latest_version=version, head=row, updated_at=row.created_at)
+        design.latest_version, design.head, design.updated_at = version, row, row.created_at
+        # Only cache what committed - a rolled back number may be reused for other data
+        transaction.on_commit(lambda: snapshots.put(design.id, version, data))
+    return row, True
+
+
+def storage_report(design):
+    """Bytes the design's versions would take as full snapshots vs. the distinct blobs they use"""
+    versions = design.versions.all()
+    totals = versions.aggregate(count=Count('id'), logical=Sum('size'))
+    stored = DesignBlob.objects.filter(digest__in=versions.values('blob_id')).aggregate(
+        stored=Sum('stored_size'), blobs=Count('digest'),
+    )
+    logical, stored_bytes = totals['logical'] or 0, stored['stored'] or 0
+    return {
+        'versions': totals['count'],
+        'blobs': stored['blobs'],
+        'logical_bytes': logical,
+        'stored_bytes': stored_bytes,
+        'saved_bytes': logical - stored_bytes,
+        'ratio': round(stored_bytes / logical, 4) if logical else None,
+    }
+
+
+def delete_design(design):
+    """Delete a design with its versions, then the blobs no other version points to"""
+    with transaction.atomic():
+        digests = list(design.versions.order_by().values_list('blob_id', flat=True).distinct())
+        design.delete()
+        delete_orphan_blobs(digests)
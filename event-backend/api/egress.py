@@ -0,0 +1,185 @@
+"""
+Egress distance analysis for conference rooms
+The room is rasterized into an occupancy grid (tables, stages and podiums block) and walking
+distances to the nearest door are propagated from every door cell at once with a multi-source
+8-connected Dijkstra, then read off at every seat position. Reports are cached per event
+layout_version.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+from .geometry import Footprints, cell_masks, grid_shape, rasterize
+from .layout_cache import LayoutCache
+from .models import ConferenceElement
+from .seat_geometry import SeatMap
+
+CELL_SIZE = 0.25         # metres per grid cell
+MAX_CELLS = 250_000      # cell size is coarsened for very large rooms
+SEAT_DEPTH = 0.6         # band around a table without seats where chairs would stand
+OBSTACLE_TYPES = (*ConferenceElement.TABLE_TYPES, 'stage', 'podium')
+
+SQRT2 = math.sqrt(2)
+NEIGHBOURS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+              (-1, -1, SQRT2), (-1, 1, SQRT2), (1, -1, SQRT2), (1, 1, SQRT2)]
+
+
+def shifted(array, dr, dc, fill):
+    """out[r, c] = array[r + dr, c + dc], with `fill` outside the grid"""
+    rows, cols = array.shape
+    padded = np.full((rows + 2, cols + 2), fill, dtype=array.dtype)
+    padded[1:-1, 1:-1] = array
+    return padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+
+
+def distance_transform(free, sources):
+    """Walking distance (in cells) from the nearest source cell, plus the index of that source.
+
+    free: (rows, cols) bool, sources: list of (rows, cols) bool masks. One Dijkstra search from
+    all sources at once (diagonals may not cut blocked corners), so the cost is O(cells log cells)
+    however winding the free space is.
+    """
+    rows, cols = free.shape
+    open_cells = free.ravel().tolist()
+    dist = [math.inf] * (rows * cols)
+    nearest = [-1] * (rows * cols)
+    heap = []
+    for i, mask in enumerate(sources):
+        for idx in np.flatnonzero(mask.ravel()).tolist():
+            if dist[idx] > 0:
+                dist[idx] = 0.0
+                nearest[idx] = i
+                heap.append((0.0, idx))
+    heapq.heapify(heap)
+
+    while heap:
+        d, idx = heapq.heappop(heap)
+        if d > dist[idx]:
+            continue
+        r, c = divmod(idx, cols)
+        for dr, dc, step in NEIGHBOURS:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            nidx = nr * cols + nc
+            if not open_cells[nidx] or (dr and dc and not (open_cells[r * cols + nc] and open_cells[nr * cols + c])):
+                continue
+            if d + step < dist[nidx] - 1e-9:
+                dist[nidx] = d + step
+                nearest[nidx] = nearest[idx]
+                heapq.heappush(heap, (d + step, nidx))
+    return np.array(dist).reshape(rows, cols), np.array(nearest).reshape(rows, cols)
+
+
+class EgressReport:
+    """Distance-to-nearest-door field for one layout version"""
+
+    def __init__(self, width, height, elements):
+        self.rows, self.cols, self.cell = grid_shape(width, height, CELL_SIZE, MAX_CELLS)
+        shape = (self.rows, self.cols)
+        doors = [e for e in elements if e.element_type == 'door']
+        self.tables = [e for e in elements if e.element_type in ConferenceElement.TABLE_TYPES]
+        self.doors = doors
+
+        blocked = np.zeros(shape, dtype=bool)
+        rasterize(Footprints.from_rows([e for e in elements if e.element_type in OBSTACLE_TYPES]),
+                  blocked, self.cell, True)
+
+        # Door cells - doors drawn on or just outside the wall snap to the nearest edge cell
+        door_footprints = Footprints.from_rows(doors)
+        sources = [np.zeros(shape, dtype=bool) for _ in doors]
+        for k, (r0, r1, c0, c1), inside in cell_masks(door_footprints, shape, self.cell):
+            sources[k][r0:r1, c0:c1] |= inside
+        for k, (cx, cy) in enumerate(door_footprints.centers()):
+            if not sources[k].any():
+                sources[k][self.to_cell(cx, cy)] = True
+            blocked[sources[k]] = False
+        self.blocked = blocked
+
+        dist, self.nearest = distance_transform(~blocked, sources)
+        self.distance = dist * self.cell
+
+    def to_cell(self, x, y):
+        return (min(max(int(y / self.cell), 0), self.rows - 1),
+                min(max(int(x / self.cell), 0), self.cols - 1))
+
+    def seat_distances(self, seats):
+        """Egress distance per seat; seats whose cell is blocked use the best neighbouring cell"""
+        rows = np.clip((seats.y / self.cell).astype(int), 0, self.rows - 1)
+        cols = np.clip((seats.x / self.cell).astype(int), 0, self.cols - 1)
+        around = np.min([shifted(self.distance, dr, dc, np.inf) + step * self.cell
+                         for dr, dc, step in NEIGHBOURS], axis=0)
+        distance = np.where(np.isfinite(self.distance), self.distance, around)[rows, cols]
+        nearest = self.nearest[rows, cols]
+        return distance, nearest
+
+    def table_distances(self):
+        """Worst-seat egress distance per table.
+
+        Tables with seats use the computed seat positions; tables without seats fall back to the
+        farthest reachable cell of the band where chairs would stand.
+        """
+        worst = {}
+        seats = SeatMap(self.tables)
+        if len(seats):
+            distance, nearest = self.seat_distances(seats)
+            for i, element_id in enumerate(seats.element_ids):
+                if np.isfinite(distance[i]) and distance[i] > worst.get(element_id, (-1.0,))[0]:
+                    worst[element_id] = (float(distance[i]), int(nearest[i]), int(seats.seat_numbers[i]))
+
+        bands = Footprints.from_rows(self.tables).grown(SEAT_DEPTH)
+        for k, (r0, r1, c0, c1), inside in cell_masks(bands, self.blocked.shape, self.cell):
+            element_id = str(self.tables[k].id)
+            if element_id in worst or (self.tables[k].seats or 0) > 0:
+                continue
+            window = self.distance[r0:r1, c0:c1]
+            reachable = inside & np.isfinite(window)
+            if reachable.any():
+                flat = np.flatnonzero(reachable.ravel())
+                best = flat[np.argmax(window.ravel()[flat])]
+                worst[element_id] = (float(window.ravel()[best]), int(self.nearest[r0:r1, c0:c1].ravel()[best]), None)
+
+        results = []
+        for table in self.tables:
+            distance, door, seat_number = worst.get(str(table.id), (None, -1, None))
+            results.append({
+                'element_id': str(table.id),
+                'label': table.label,
+                'distance': round(distance, 2) if distance is not None else None,
+                'worst_seat': seat_number,
+                'nearest_door': str(self.doors[door].id) if door >= 0 else None,
+            })
+        return results
+
+    def heatmap(self):
+        """Distances per cell in metres (row-major), None for blocked or unreachable cells"""
+        values = np.round(self.distance, 1)
+        return [[v if math.isfinite(v) else None for v in row] for row in values.tolist()]
+
+    def as_dict(self, include_heatmap=True):
+        tables = self.table_distances()
+        measured = [t for t in tables if t['distance'] is not None]
+        worst = max(measured, key=lambda t: t['distance']) if measured else None
+        report = {
+            'door_count': len(self.doors),
+            'worst_case': worst,
+            'tables': tables,
+            'unreachable_tables': [t['element_id'] for t in tables if t['distance'] is None],
+            'grid': {'cell_size': self.cell, 'rows': self.rows, 'cols': self.cols},
+        }
+        if include_heatmap:
+            report['grid']['heatmap'] = self.heatmap()
+        return report
+
+
+egress_reports = LayoutCache(maxsize=8)
+
+
+def egress_report(event, include_heatmap=True):
+    """Egress analysis for a conference event, reusing the cached distance field when the layout is unchanged"""
+    report = egress_reports.get(event, lambda: EgressReport(
+        float(event.room_width), float(event.room_height), list(ConferenceElement.objects.filter(event=event))
+    ))
+    return report.as_dict(include_heatmap=include_heatmap)
@@ -0,0 +1,108 @@
+"""
+Event cloning
+Copies an event with its layout and related rows so last year's event can be reused as a template.
+Each table is read once and written with one bulk_create; new UUIDs are assigned in memory and
+foreign keys (and route booth orders) are remapped through old -> new id maps, so the number of
+queries does not grow with the size of the event. Everything runs in one transaction.
+
+Copies start fresh: private, no share token, empty operation log, row versions reset and nobody
+checked in.
+"""
+
+import uuid
+
+from django.db import transaction
+
+from .models import (
+    ConferenceElement, ConferenceEvent, ConferenceGroup, ConferenceGuest, ConferenceSeatAssignment,
+    EventSession, TradeshowBooth, TradeshowBoothAssignment, TradeshowEvent, TradeshowRoute, TradeshowVendor,
+)
+
+# Reset on the copy of the event
+EVENT_RESET = {
+    'share_token': None, 'is_public': False, 'layout_version': 0, 'op_seq': 0, 'ops_compacted_seq': 0,
+}
+# Reset on every copied row that has them (auto timestamps are set again by bulk_create)
+ROW_RESET = {'version': 1, 'checked_in': False, 'check_in_time': None}
+
+
+def parse_clone_name(data, model):
+    """(name or None, error) from a clone request body; the name must fit the event's name column"""
+    name = data.get('name')
+    if name is None:
+        return None, None
+    if not isinstance(name, str):
+        return None, 'name must be a string'
+    max_length = model._meta.get_field('name').max_length
+    if len(name.strip()) > max_length:
+        return None, f'name must be at most {max_length} characters'
+    return name.strip() or None, None
+
+
+def clone_conference_event(event, user, name=None, include_guests=False):
+    """Copy of a conference event with elements, groups and sessions, plus guests and seat
+    assignments when include_guests. Returns (event, {table: rows copied})."""
+    with transaction.atomic():
+        copy = _copy_event(ConferenceEvent, event, user, name)
+        ids, counts = {}, {}
+        counts['elements'] = _copy_rows(ConferenceElement, event, copy, ids)
+        counts['groups'] = _copy_rows(ConferenceGroup, event, copy, ids)
+        if include_guests:
+            counts['guests'] = _copy_rows(ConferenceGuest, event, copy, ids, ('group_id',))
+            counts['seat_assignments'] = _copy_rows(
+                ConferenceSeatAssignment, event, copy, ids, ('element_id', 'guest_id'),
+            )
+        counts['sessions'] = _copy_rows(EventSession, event, copy, ids, event_field='conference_event_id')
+    return copy, counts
+
+
+def clone_tradeshow_event(event, user, name=None):
+    """Copy of a tradeshow event with booths, vendors, booth assignments, routes and sessions.
+    Returns (event, {table: rows copied})."""
+    with transaction.atomic():
+        copy = _copy_event(TradeshowEvent, event, user, name)
+        ids, counts = {}, {}
+        counts['booths'] = _copy_rows(TradeshowBooth, event, copy, ids)
+        counts['vendors'] = _copy_rows(TradeshowVendor, event, copy, ids)
+        counts['booth_assignments'] = _copy_rows(
+            TradeshowBoothAssignment, event, copy, ids, ('booth_id', 'vendor_id'),
+        )
+        booth_ids = {str(old): str(new) for old, new in ids.items()}
+
+        def remap_route(row):
+            row['booth_order'] = [booth_ids[str(b)] for b in row['booth_order'] or [] if str(b) in booth_ids]
+
+        counts['routes'] = _copy_rows(TradeshowRoute, event, copy, ids, prepare=remap_route)
+        counts['sessions'] = _copy_rows(EventSession, event, copy, ids, event_field='tradeshow_event_id')
+    return copy, counts
+
+
+def _copy_event(model, event, user, name):
+    row = model.objects.filter(pk=event.pk).values().get()
+    if not name:
+        # Cut the original name short so the suffix still fits the column
+        name = f"{event.name[:model._meta.get_field('name').max_length - len(' (copy)')]} (copy)"
+    row.update(EVENT_RESET, id=uuid.uuid4(), user_id=user.pk, name=name)
+    del row['created_at'], row['updated_at']
+    return model.objects.create(**row)
+
+
+def _copy_rows(model, event, copy, ids, foreign_keys=(), event_field='event_id', prepare=None):
+    """bulk_create copies of the event's `model` rows under `copy`; records old -> new ids in `ids`
+    and maps `foreign_keys` through it. Returns the number of rows copied."""
+    names = {field.attname for field in model._meta.concrete_fields}
+    reset = {key: value for key, value in ROW_RESET.items() if key in names}
+    copies = []
+    for row in model.objects.filter(**{event_field: event.pk}).order_by().values():
+        new_id = uuid.uuid4()
+        ids[row['id']] = new_id
+        row.update(reset, id=new_id, **{event_field: copy.pk})
+        for field in foreign_keys:
+            if row[field] is not None:
+                row[field] = ids[row[field]]
+        if prepare is not None:
+            prepare(row)
+        del row['created_at'], row['updated_at']
+        copies.append(model(**row))
+    model.objects.bulk_create(copies)
+    return len(copies)
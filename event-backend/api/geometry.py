@@ -0,0 +1,249 @@
+"""
+Vectorized layout geometry
+Elements and booths share the canvas convention: (position_x, position_y) is the top-left corner in
+metres, the footprint is width*scale_x by height*scale_y, rotated by `rotation` degrees (clockwise
+on screen) about that corner.
+"""
+
+import numpy as np
+
+GEOMETRY_FIELDS = ('position_x', 'position_y', 'width', 'height', 'rotation', 'scale_x', 'scale_y')
+
+
+class Footprints:
+    """Struct-of-arrays view of n rotated rectangles"""
+
+    def __init__(self, x, y, w, h, theta):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.w = np.asarray(w, dtype=float)
+        self.h = np.asarray(h, dtype=float)
+        self.theta = np.asarray(theta, dtype=float)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from model instances or dicts carrying the GEOMETRY_FIELDS"""
+        rows = list(rows)
+        if not rows:
+            return cls(*([np.empty(0)] * 5))
+        get = (lambda r, f: r[f]) if isinstance(rows[0], dict) else getattr
+        data = np.array([[float(get(r, f) or 0) for f in GEOMETRY_FIELDS] for r in rows], dtype=float)
+        x, y, w, h, rotation, sx, sy = data.T
+        sx = np.where(sx == 0, 1.0, sx)
+        sy = np.where(sy == 0, 1.0, sy)
+        return cls(x, y, w * sx, h * sy, np.radians(rotation))
+
+    def __len__(self):
+        return len(self.x)
+
+    def centers(self):
+        """(n, 2) array of rectangle centres"""
+        cos, sin = np.cos(self.theta), np.sin(self.theta)
+        hw, hh = self.w / 2, self.h / 2
+        return np.stack([self.x + hw * cos - hh * sin, self.y + hw * sin + hh * cos], axis=1)
+
+    def corners(self):
+        """(n, 4, 2) array of corners in drawing order: top-left, top-right, bottom-right, bottom-left"""
+        cos, sin = np.cos(self.theta)[:, None], np.sin(self.theta)[:, None]
+        u = np.array([0.0, 1.0, 1.0, 0.0])[None, :] * self.w[:, None]
+        v = np.array([0.0, 0.0, 1.0, 1.0])[None, :] * self.h[:, None]
+        xs = self.x[:, None] + u * cos - v * sin
+        ys = self.y[:, None] + u * sin + v * cos
+        return np.stack([xs, ys], axis=2)
+
+    def bounds(self):
+        """(n, 4) axis-aligned bounding boxes as min_x, min_y, max_x, max_y"""
+        corners = self.corners()
+        return np.concatenate([corners.min(axis=1), corners.max(axis=1)], axis=1)
+
+    def distance_to(self, x, y):
+        """(n,) distance from point (x, y) to each rectangle (0 inside)"""
+        cos, sin = np.cos(self.theta), np.sin(self.theta)
+        px, py = x - self.x, y - self.y
+        u = px * cos + py * sin
+        v = -px * sin + py * cos
+        du = np.maximum(np.maximum(-u, u - self.w), 0.0)
+        dv = np.maximum(np.maximum(-v, v - self.h), 0.0)
+        return np.hypot(du, dv)
+
+    def grown(self, margin):
+        """Rectangles expanded by `margin` on every side (same rotation and centre)"""
+        cos, sin = np.cos(self.theta), np.sin(self.theta)
+        return Footprints(self.x - margin * cos + margin * sin, self.y - margin * sin - margin * cos,
+                          self.w + 2 * margin, self.h + 2 * margin, self.theta)
+
+
+def cell_masks(footprints, shape, cell_size):
+    """Yield (k, (r0, r1, c0, c1), inside) for every rectangle overlapping a (rows, cols) grid.
+
+    Cell (r, c) has its centre at ((c+.5)*cell, (r+.5)*cell); `inside` is the boolean mask of
+    cells in the window [r0:r1, c0:c1] whose centre lies inside rectangle k.
+    """
+    rows, cols = shape
+    boxes = footprints.bounds()
+    cos, sin = np.cos(footprints.theta), np.sin(footprints.theta)
+    for k in range(len(footprints)):
+        c0 = max(int(np.floor(boxes[k, 0] / cell_size)), 0)
+        r0 = max(int(np.floor(boxes[k, 1] / cell_size)), 0)
+        c1 = min(int(np.ceil(boxes[k, 2] / cell_size)), cols)
+        r1 = min(int(np.ceil(boxes[k, 3] / cell_size)), rows)
+        if c0 >= c1 or r0 >= r1:
+            continue
+        px = (np.arange(c0, c1) + 0.5) * cell_size - footprints.x[k]
+        py = (np.arange(r0, r1) + 0.5) * cell_size - footprints.y[k]
+        # Cell centres in the rectangle's local frame
+        u = px[None, :] * cos[k] + py[:, None] * sin[k]
+        v = -px[None, :] * sin[k] + py[:, None] * cos[k]
+        inside = (u >= 0) & (u <= footprints.w[k]) & (v >= 0) & (v <= footprints.h[k])
+        yield k, (r0, r1, c0, c1), inside
+
+
+def rasterize(footprints, mask, cell_size, value=True):
+    """Paint rotated rectangles onto a (rows, cols) grid"""
+    for _, (r0, r1, c0, c1), inside in cell_masks(footprints, mask.shape, cell_size):
+        mask[r0:r1, c0:c1][inside] = value
+    return mask
+
+
+def grid_shape(width, height, cell_size, max_cells):
+    """Grid dimensions for a width x height area, coarsening cell_size until it fits max_cells"""
+    while (width / cell_size) * (height / cell_size) > max_cells:
+        cell_size *= 2
+    return max(int(np.ceil(height / cell_size)), 1), max(int(np.ceil(width / cell_size)), 1), cell_size
+
+
+class GridIndex:
+    """Uniform-grid spatial index over axis-aligned bounding boxes"""
+    # Boxes covering more cells than this skip the grid and are checked against every box directly,
+    # so one hall-sized element cannot blow up the per-cell entries
+    max_cells_per_box = 64
+
+    def __init__(self, bounds, cell_size=None):
+        self.bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        if cell_size is None:
+            extents = self.bounds[:, 2:] - self.bounds[:, :2]
+            cell_size = float(np.median(extents.max(axis=1))) * 2 if len(extents) else 1.0
+        self.cell_size = max(cell_size, 0.5)
+
+    def cell_range(self, bounds):
+        """(n, 4) inclusive cell ranges: col0, row0, col1, row1"""
+        return np.floor(np.asarray(bounds, dtype=float) / self.cell_size).astype(np.int64)
+
+    def pairs(self, margin=0.0):
+        """(i, j) index arrays, i < j, of boxes whose bounding boxes lie within `margin` of each other.
+
+        Boxes are bucketed with margin/2 padding so every such pair shares at least one cell; pairs
+        are generated per cell with array arithmetic and de-duplicated. Oversized boxes are paired
+        with every other box instead, O(n) each.
+        """
+        n = len(self.bounds)
+        empty = np.empty(0, dtype=np.int64)
+        if n < 2:
+            return empty, empty
+        pad = margin / 2
+        ranges = self.cell_range(self.bounds + [-pad, -pad, pad, pad])
+        counts = (ranges[:, 2] - ranges[:, 0] + 1) * (ranges[:, 3] - ranges[:, 1] + 1)
+        oversized = counts > self.max_cells_per_box
+        regular = np.flatnonzero(~oversized)
+        firsts, seconds = [], []
+        if len(regular) > 1:
+            a, b = self.bucket_pairs(ranges[regular])
+            firsts.append(regular[a])
+            seconds.append(regular[b])
+        for k in np.flatnonzero(oversized):
+            # Every regular box, and the oversized boxes after k so each pair is listed once
+            partners = np.flatnonzero(~oversized | (np.arange(n) > k))
+            partners = partners[partners != k]
+            firsts.append(np.full(len(partners), k, dtype=np.int64))
+            seconds.append(partners)
+        if not firsts:
+            return empty, empty
+        a, b = np.concatenate(firsts), np.concatenate(seconds)
+        i, j = np.minimum(a, b), np.maximum(a, b)
+        codes = np.unique(i * n + j)
+        i, j = codes // n, codes % n
+
+        gap_x = np.maximum(self.bounds[i, 0], self.bounds[j, 0]) - np.minimum(self.bounds[i, 2], self.bounds[j, 2])
+        gap_y = np.maximum(self.bounds[i, 1], self.bounds[j, 1]) - np.minimum(self.bounds[i, 3], self.bounds[j, 3])
+        close = (gap_x <= margin) & (gap_y <= margin)
+        return i[close], j[close]
+
+    @staticmethod
+    def bucket_pairs(ranges):
+        """(a, b) positions in `ranges` of entries sharing at least one cell, possibly repeated"""
+        spans_x = ranges[:, 2] - ranges[:, 0] + 1
+        spans_y = ranges[:, 3] - ranges[:, 1] + 1
+        counts = spans_x * spans_y
+        # One (cell key, item) entry per covered cell
+        items = np.repeat(np.arange(len(ranges)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = ranges[items, 0] + offsets % spans_x[items]
+        cy = ranges[items, 1] + offsets // spans_x[items]
+        keys = (cy - cy.min()) * (cx.max() - cx.min() + 1) + (cx - cx.min())
+        order = np.argsort(keys, kind='stable')
+        keys, items = keys[order], items[order]
+
+        # Every entry pairs with the entries after it in the same cell
+        group_end = np.searchsorted(keys, keys, side='right')
+        partners = group_end - np.arange(len(keys)) - 1
+        first = np.repeat(np.arange(len(keys)), partners)
+        step = np.arange(partners.sum()) - np.repeat(np.cumsum(partners) - partners, partners)
+        return items[first], items[first + 1 + step]
+
+
+def separation(a, b):
+    """Overlap depth and gap between pairs of convex quads.
+
+    a, b: (p, 4, 2) corner arrays. Returns (depth, gap): depth > 0 is the minimum penetration along
+    the separating-axis candidates (0 when apart); gap is the shortest distance between outlines
+    when the quads do not overlap (0 otherwise).
+    """
+    if not len(a):
+        return np.empty(0), np.empty(0)
+    edges = np.concatenate([np.roll(a, -1, axis=1) - a, np.roll(b, -1, axis=1) - b], axis=1)[:, [0, 1, 4, 5]]
+    axes = edges / np.maximum(np.linalg.norm(edges, axis=2, keepdims=True), 1e-12)
+    proj_a = np.einsum('pkd,pcd->pkc', axes, a)
+    proj_b = np.einsum('pkd,pcd->pkc', axes, b)
+    overlap = np.minimum(proj_a.max(axis=2), proj_b.max(axis=2)) - np.maximum(proj_a.min(axis=2), proj_b.min(axis=2))
+    depth = np.maximum(overlap.min(axis=1), 0.0)
+
+    def point_edge_distance(points, quads):
+        start = quads[:, None, :, :]
+        seg = (np.roll(quads, -1, axis=1) - quads)[:, None, :, :]
+        rel = points[:, :, None, :] - start
+        t = np.clip((rel * seg).sum(axis=3) / np.maximum((seg ** 2).sum(axis=3), 1e-12), 0.0, 1.0)
+        return np.linalg.norm(rel - t[..., None] * seg, axis=3).min(axis=(1, 2))
+
+    gap = np.minimum(point_edge_distance(a, b), point_edge_distance(b, a))
+    gap = np.where(depth > 0, 0.0, gap)
+    return depth, gap
+
+
+def affine_poses(rows, translate=(0.0, 0.0), rotate=0.0, scale=1.0, pivot=None):
+    """Rigidly transform item poses: uniform scale and rotation about `pivot`, then translate.
+
+    rows carry GEOMETRY_FIELDS; returns (pivot, dict of arrays x, y, rotation, scale_x, scale_y).
+    Rotation is in degrees, clockwise on screen like `rotation` itself; the pivot defaults to the
+    centre of the rows' combined bounding box.
+    """
+    rows = list(rows)
+    get = (lambda r, f: r[f]) if rows and isinstance(rows[0], dict) else getattr
+    data = np.array([[float(get(r, f) or 0) for f in GEOMETRY_FIELDS] for r in rows], dtype=float).reshape(-1, 7)
+    x, y, _, _, rotation, sx, sy = data.T
+    if pivot is None:
+        bounds = Footprints.from_rows(rows).bounds()
+        pivot = ((bounds[:, 0].min() + bounds[:, 2].max()) / 2, (bounds[:, 1].min() + bounds[:, 3].max()) / 2) \
+            if len(rows) else (0.0, 0.0)
+    px, py = float(pivot[0]), float(pivot[1])
+    theta = np.radians(rotate)
+    cos, sin = np.cos(theta), np.sin(theta)
+    # The top-left corner is the pose origin, so moving it and adding the angle moves the whole item
+    ux, uy = (x - px) * scale, (y - py) * scale
+    poses = {
+        'position_x': px + ux * cos - uy * sin + translate[0],
+        'position_y': py + ux * sin + uy * cos + translate[1],
+        'rotation': np.mod(rotation + rotate, 360.0),
+        'scale_x': np.where(sx == 0, 1.0, sx) * scale,
+        'scale_y': np.where(sy == 0, 1.0, sy) * scale,
+    }
+    return (px, py), poses
@@ -0,0 +1,249 @@
+"""
+Cross-process cache invalidation bus
+Every committed write to an event's data bumps that event's generation; the bus carries the bumps
+to every server worker and pod. Process-local caches of event data (ownership lookups, public
+snapshots, kiosk search results) are tagged with the generation they were built at and are
+rebuilt once it moves, so each worker keeps its caches without serving another worker's stale
+data. Caching is opt-in: with a bus that cannot see other processes' writes the caches are
+bypassed and every lookup goes to the database. Backends:
+
+- LocalBus: generations live in this process only; caches are off
+- CacheBus: counters in the shared Django cache (Redis); each process re-reads the counters it
+  depends on at most every POLL_SECONDS, so staleness is bounded by the poll interval. Caches
+  stay off while the Django cache is the process-local LocMemCache
+- PostgresBus: bumps travel by LISTEN/NOTIFY and arrive within milliseconds; a listener that
+  reconnects treats every generation as bumped, since notifications sent meanwhile are lost
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+from django.utils.module_loading import import_string
+
+from .pg_notify import Listener, notify
+
+NOTIFY_CHANNEL = 'clover_invalidate'
+CACHE_PREFIX = 'event-generation:'
+
+DEFAULTS = {
+    'BACKEND': 'api.invalidation.LocalBus',
+    'POLL_SECONDS': 1.0,
+}
+
+
+def get_bus_settings():
+    return {**DEFAULTS, **getattr(settings, 'INVALIDATION_BUS', {})}
+
+
+def event_key(event_or_model, event_id=None):
+    """'conference:<id>' / 'tradeshow:<id>' for an event instance, or an event model plus id"""
+    model = event_or_model if event_id is not None else type(event_or_model)
+    kind = 'conference' if model._meta.model_name == 'conferenceevent' else 'tradeshow'
+    return f'{kind}:{event_or_model.pk if event_id is None else event_id}'
+
+
+# ========================================== Backends ==========================================
+class LocalBus:
+    """Generation counters of this process"""
+
+    shared = False  # whether bumps from other processes arrive, which caches depend on
+
+    def __init__(self):
+        self.generations = {}
+        self._lock = threading.Lock()
+
+    def current(self, key):
+        # Record the key even at generation 0, so advance_all reaches every key a cache depends on
+        with self._lock:
+            return self.generations.setdefault(key, 0)
+
+    def advance(self, key, generation=None):
+        """Move a key forward (to `generation`, or by one); generations never go back"""
+        with self._lock:
+            current = self.generations.get(key, 0)
+            self.generations[key] = max(current, generation) if generation is not None else current + 1
+
+    def advance_all(self):
+        with self._lock:
+            for key in self.generations:
+                self.generations[key] += 1
+
+    def publish(self, keys):
+        for key in keys:
+            self.advance(key)
+
+
+class CacheBus(LocalBus):
+    """Counters in the shared Django cache, polled lazily by each process"""
+
+    def __init__(self):
+        super().__init__()
+        self.poll_seconds = get_bus_settings()['POLL_SECONDS']
+        self._polled_at = 0.0
+        self.shared = not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+    def publish(self, keys):
+        for key in keys:
+            cache_key = CACHE_PREFIX + key
+            cache.add(cache_key, 0, timeout=None)
+            try:
+                generation = cache.incr(cache_key)
+            except ValueError:
+                # Evicted between add and incr
+                cache.set(cache_key, 1, timeout=None)
+                generation = 1
+            self.advance(key, generation)
+
+    def current(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self.generations.setdefault(key, 0)
+            due = now - self._polled_at >= self.poll_seconds
+            if due:
+                self._polled_at = now
+                keys = list(self.generations)
+        if due:
+            # One round trip for every key this process depends on
+            shared = cache.get_many([CACHE_PREFIX + k for k in keys])
+            for k in keys:
+                if CACHE_PREFIX + k in shared:
+                    self.advance(k, shared[CACHE_PREFIX + k])
+        return super().current(key)
+
+
+class PostgresBus(LocalBus):
+    """Bumps sent with NOTIFY; a listener thread applies everyone's bumps to this process"""
+
+    shared = True
+
+    def __init__(self):
+        super().__init__()
+        self.listener = Listener(
+            NOTIFY_CHANNEL, lambda keys: [self.advance(key) for key in keys],
+            on_connect=self.advance_all, name='invalidation-listener',
+        )
+
+    def current(self, key):
+        self.listener.ensure_started()
+        return super().current(key)
+
+    def publish(self, keys):
+        # The listener delivers our own notification too; advancing locally as well keeps this
+        # process read-your-writes consistent before it arrives
+        super().publish(keys)
+        notify(NOTIFY_CHANNEL, list(keys))
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = import_string(get_bus_settings()['BACKEND'])()
+        return _bus
+
+
+def bump_generation(event):
+    """Mark an event's cached data stale everywhere once the current transaction commits"""
+    key = event_key(event)
+    transaction.on_commit(lambda: get_bus().publish([key]))
+
+
+def generation(event_or_key):
+    return get_bus().current(event_or_key if isinstance(event_or_key, str) else event_key(event_or_key))
+
+
+# ========================================== Caches ==========================================
+class GenerationCache:
+    """Small LRU of {(event key, key): (generation, value)}; entries die with their generation.
+    Only used when the bus is shared."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope, key, build):
+        if not get_bus().shared:
+            return build()
+        current = generation(scope)
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is not None and entry[0] == current:
+                self._entries.move_to_end((scope, key))
+                return entry[1]
+        value = build()
+        with self._lock:
+            self._entries[(scope, key)] = (current, value)
+            self._entries.move_to_end((scope, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+owned_events = GenerationCache(maxsize=1024)
+snapshots = GenerationCache(maxsize=64)
+search_results = GenerationCache(maxsize=1024)
+
+
+def owned_event_or_404(model, event_id, user):
+    """get_object_or_404(model, id=event_id, user=user) without the query while the event is unchanged.
+
+    Returns a private copy, so callers may mutate it (bump_layout_version, serializers).
+    """
+    event = owned_events.get(
+        event_key(model, event_id), user.pk,
+        lambda: model.objects.filter(id=event_id, user=user).first(),
+    )
+    if event is None:
+        raise Http404
+    return copy.copy(event)
+
+
+# ========================================== Write hooks ==========================================
+# Row saves are caught by post_save. Deletes are bumped by the views (and layout writes through
+# LayoutVersioned.bump_layout_version) rather than by post_delete, because a post_delete receiver
+# stops Django from fast-deleting the rows of large cascades and queryset deletes.
+def _bump_for_instance(sender, instance, **kwargs):
+    from . import models
+
+    if isinstance(instance, models.LayoutVersioned):
+        bump_generation(instance)
+        return
+    if isinstance(instance, models.EventSession):
+        # Sessions belong to exactly one of the two event types
+        if instance.conference_event_id is not None:
+            key = event_key(models.ConferenceEvent, instance.conference_event_id)
+        else:
+            key = event_key(models.TradeshowEvent, instance.tradeshow_event_id)
+    else:
+        key = event_key(sender._meta.get_field('event').related_model, instance.event_id)
+    transaction.on_commit(lambda: get_bus().publish([key]))
+
+
+def connect_signals():
+    from . import models
+
+    for model in (models.ConferenceEvent, models.TradeshowEvent):
+        post_delete.connect(_bump_for_instance, sender=model, dispatch_uid=f'invalidate-delete-{model.__name__}')
+    for model in (
+        models.ConferenceEvent, models.ConferenceElement, models.ConferenceGroup, models.ConferenceGuest,
+        models.ConferenceSeatAssignment, models.TradeshowEvent, models.TradeshowBooth, models.TradeshowVendor,
+        models.TradeshowBoothAssignment, models.TradeshowRoute, models.EventSession,
+    ):
+        post_save.connect(_bump_for_instance, sender=model, dispatch_uid=f'invalidate-{model.__name__}')
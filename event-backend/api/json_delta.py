@@ -0,0 +1,114 @@
+"""
+Structural JSON deltas
+diff(old, new) describes how to turn one JSON value into another by the parts that changed, and
+patch(old, delta) applies it. Deltas are plain JSON, so they are stored like any other payload.
+
+Objects are diffed key by key; lists of objects with unique ids (the editor's items) by id, so
+inserting one item does not shift every later position; other lists by position. Anything else
+is replaced whole. patch never mutates its input: unchanged subtrees are shared with it.
+"""
+
+import json
+
+REPLACE = '='   # ['=', value]
+OBJECT = '{}'   # ['{}', {'set': {key: value}, 'del': [key], 'sub': {key: delta}}]
+KEYED = 'id[]'  # ['id[]', {'order': [id], 'set': [[id, item]], 'sub': [[id, delta]]}]
+LIST = '[]'     # ['[]', {'len': n, 'sub': [[index, delta]], 'tail': [value]}]
+
+
+def dumps(value):
+    """Canonical JSON: key order and whitespace never make two equal values differ"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def _same(old, new):
+    # Compare the encodings rather than with ==, which treats 1, 1.0 and True as equal
+    if isinstance(old, (dict, list)) or isinstance(new, (dict, list)):
+        return type(old) is type(new) and dumps(old) == dumps(new)
+    return type(old) is type(new) and old == new
+
+
+def _ids(items):
+    """Item ids if every item is an object with a distinct scalar id, else None"""
+    ids = []
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('id'), (str, int)) or isinstance(item['id'], bool):
+            return None
+        ids.append(item['id'])
+    return ids if len(set(ids)) == len(ids) else None
+
+
+def _prune(body):
+    return {key: value for key, value in body.items() if value or value == 0}
+
+
+def diff(old, new):
+    """Delta turning `old` into `new`, or None when they are equal"""
+    if _same(old, new):
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        sub = {}
+        for key in old.keys() & new.keys():
+            delta = diff(old[key], new[key])
+            if delta is not None:
+                sub[key] = delta
+        return [OBJECT, _prune({
+            'set': {key: new[key] for key in new if key not in old},
+            'del': [key for key in old if key not in new],
+            'sub': sub,
+        })]
+    if isinstance(old, list) and isinstance(new, list):
+        old_ids, new_ids = _ids(old), _ids(new)
+        if old_ids is not None and new_ids is not None:
+            before = dict(zip(old_ids, old))
+            sub, added = [], []
+            for item_id, item in zip(new_ids, new):
+                if item_id not in before:
+                    added.append([item_id, item])
+                    continue
+                delta = diff(before[item_id], item)
+                if delta is not None:
+                    sub.append([item_id, delta])
+            body = _prune({'set': added, 'sub': sub})
+            if new_ids != old_ids:
+                body['order'] = new_ids
+            return [KEYED, body]
+        common = min(len(old), len(new))
+        sub = []
+        for index in range(common):
+            delta = diff(old[index], new[index])
+            if delta is not None:
+                sub.append([index, delta])
+        return [LIST, _prune({'len': len(new), 'sub': sub, 'tail': new[common:]})]
+    return [REPLACE, new]
+
+
+def patch(value, delta):
+    """Apply a delta produced by diff() to the value it was computed from"""
+    if delta is None:
+        return value
+    tag, body = delta
+    if tag == REPLACE:
+        return body
+    if tag == OBJECT:
+        removed = set(body.get('del', ()))
+        result = {key: item for key, item in value.items() if key not in removed}
+        for key, sub in body.get('sub', {}).items():
+            result[key] = patch(result[key], sub)
+        result.update(body.get('set', {}))
+        return result
+    if tag == KEYED:
+        by_id = {item['id']: item for item in value}
+        for item_id, sub in body.get('sub', ()):
+            by_id[item_id] = patch(by_id[item_id], sub)
+        for item_id, item in body.get('set', ()):
+            by_id[item_id] = item
+        order = body['order'] if 'order' in body else [item['id'] for item in value]
+        return [by_id[item_id] for item_id in order]
+    if tag == LIST:
+        result = list(value[:body['len']])
+        for index, sub in body.get('sub', ()):
+            result[index] = patch(result[index], sub)
+        result.extend(body.get('tail', ()))
+        return result
+    raise ValueError(f'unknown delta tag {tag!r}')
@@ -0,0 +1,48 @@
+"""
+In-process caches for layout-derived data (distance matrices, grids, indexes)
+Entries are keyed by event id and tagged with the event's layout_version, so a bumped
+version makes the cached value stale without any explicit invalidation.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LayoutCache:
+    """Small LRU of {event_id: (layout_version, value)}"""
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def peek(self, event_id):
+        """Return (layout_version, value) regardless of freshness, or None"""
+        with self._lock:
+            return self._entries.get(event_id)
+
+    def get(self, event, build):
+        """Return the cached value for event.layout_version, calling build() on a miss"""
+        with self._lock:
+            entry = self._entries.get(event.pk)
+            if entry is not None and entry[0] == event.layout_version:
+                self._entries.move_to_end(event.pk)
+                return entry[1]
+        value = build()
+        self.put(event.pk, event.layout_version, value)
+        return value
+
+    def put(self, event_id, layout_version, value):
+        with self._lock:
+            self._entries[event_id] = (layout_version, value)
+            self._entries.move_to_end(event_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, event_id):
+        with self._lock:
+            self._entries.pop(event_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,354 @@
+"""
+Set-based layout edits shared by conference elements and tradeshow booths
+Each edit loads the affected rows once, computes the new state in memory and writes it back with
+one bulk statement per kind of change inside a single transaction.
+"""
+
+import functools
+import hashlib
+import json
+import math
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .geometry import affine_poses
+from .utils import parse_uuid
+
+POSE_FIELDS = ('position_x', 'position_y', 'rotation', 'scale_x', 'scale_y')
+MAX_TRANSFORM_VALUE = 1e6  # bound on translate / pivot / rotate / scale inputs
+MIN_POSE_SCALE = 0.01      # smallest stored scale_x / scale_y; 0.00 would read back as unscaled
+
+
+def parse_transform(data):
+    """Validate {ids, translate?, rotate?, scale?, pivot?}; returns (ids, kwargs) or raises ValueError"""
+    ids = [parse_uuid(item_id) for item_id in data.get('ids', [])]
+    if not ids or None in ids:
+        raise ValueError('ids must be a non-empty list of UUIDs')
+
+    def number(value, name):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = math.nan
+        if not math.isfinite(value) or abs(value) > MAX_TRANSFORM_VALUE:
+            raise ValueError(f'{name} must be a finite number of magnitude at most {MAX_TRANSFORM_VALUE:g}')
+        return value
+
+    def point(value, name):
+        try:
+            x, y = value
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be [x, y]')
+        return number(x, name), number(y, name)
+
+    kwargs = {
+        'translate': point(data.get('translate', (0, 0)), 'translate'),
+        'rotate': number(data.get('rotate', 0) or 0, 'rotate'),
+        'scale': number(data.get('scale', 1) or 1, 'scale'),
+        'pivot': point(data['pivot'], 'pivot') if data.get('pivot') is not None else None,
+    }
+    if kwargs['scale'] <= 0:
+        raise ValueError('scale must be positive')
+    return list(dict.fromkeys(ids)), kwargs
+
+
+def to_decimal(value):
+    return Decimal(f'{value:.2f}')
+
+
+def field_limit(model, name):
+    """Largest magnitude a DecimalField can store"""
+    field = model._meta.get_field(name)
+    return Decimal(10) ** (field.max_digits - field.decimal_places) - Decimal('0.01')
+
+
+def check_poses(model, poses, bounds):
+    """Raise ValueError unless every new origin lies in the (width, height) room and every value fits its column"""
+    width, height = bounds
+    x, y = poses['position_x'], poses['position_y']
+    if not (np.all((x >= 0) & (x <= width)) and np.all((y >= 0) & (y <= height))):
+        raise ValueError('transform would move items outside the room')
+    for name in POSE_FIELDS:
+        if not np.all(np.abs(poses[name]) <= float(field_limit(model, name))):
+            raise ValueError(f'transform would make {name} too large')
+
+
+def apply_transform(queryset, ids, translate, rotate, scale, pivot, bounds):
+    """Transform the rows of `queryset` with the given ids; returns (pivot, changed items, missing ids).
+
+    The rows are locked from the read to the write, so a concurrent edit is never overwritten with
+    poses computed from the old state. Nothing is written when any id is missing. Raises ValueError
+    when a result would leave the (width, height) `bounds` or not fit the pose columns.
+    """
+    with transaction.atomic():
+        items = list(queryset.select_for_update().filter(id__in=ids))
+        found = {item.id for item in items}
+        missing = [str(item_id) for item_id in ids if item_id not in found]
+        if missing:
+            return pivot, [], missing
+
+        pivot, poses = affine_poses(items, translate=translate, rotate=rotate, scale=scale, pivot=pivot)
+        # Repeated down-scales must not round to a stored 0.00, keep the sign of mirrored items
+        for field in ('scale_x', 'scale_y'):
+            poses[field] = np.copysign(np.maximum(np.abs(poses[field]), MIN_POSE_SCALE), poses[field])
+        check_poses(queryset.model, poses, bounds)
+        now = timezone.now()
+        changed = []
+        for k, item in enumerate(items):
+            new = {field: to_decimal(poses[field][k]) for field in POSE_FIELDS}
+            if any(getattr(item, field) != value for field, value in new.items()):
+                for field, value in new.items():
+                    setattr(item, field, value)
+                item.updated_at = now
+                changed.append(item)
+        versioned_bulk_update(queryset.model, changed, [*POSE_FIELDS, 'updated_at'])
+    return pivot, changed, missing
+
+
+def pose_data(item, type_field):
+    """Geometry-only representation returned to the canvas (and fed to the spatial index)"""
+    return {
+        'id': str(item.id),
+        type_field: getattr(item, type_field),
+        'width': str(item.width),
+        'height': str(item.height),
+        **{field: str(getattr(item, field)) for field in POSE_FIELDS},
+    }
+
+
+# ========================================== Row versions ==========================================
+def expected_version(request, data=None):
+    """Row version the client last saw: the If-Match header (ETag "<n>") or a `version` field.
+
+    Returns None when the client sent neither (or If-Match: *), which writes unconditionally.
+    """
+    header = request.headers.get('If-Match', '').strip()
+    if header == '*':
+        return None
+    return parse_version(header.removeprefix('W/').strip('"') if header else (data or {}).get('version'))
+
+
+def parse_version(raw):
+    """A submitted row version (None if absent); raises ValueError if it is not one"""
+    if raw is None:
+        return None
+    try:
+        version = int(raw)
+    except (TypeError, ValueError):
+        version = 0
+    if version < 1 or isinstance(raw, bool):
+        raise ValueError('If-Match / version must be a row version number')
+    return version
+
+
+def version_conflict(index, row_id, current):
+    """Per-item 409 entry for a row whose version moved on since the client read it"""
+    return {'index': index, 'id': str(row_id), 'version': current,
+            'errors': ['changed by another edit; reload and retry']}
+
+
+def version_headers(instance):
+    return {'ETag': f'"{instance.version}"'}
+
+
+def conditional_update(instance, values, expected=None):
+    """UPDATE one row with `values` and version + 1, only while its version is still `expected`.
+
+    A single statement, so it needs no row lock. Returns False (nothing written) on a mismatch or
+    when the row is gone; otherwise `instance` is updated in place.
+    """
+    values = {**values, 'updated_at': timezone.now()}
+    rows = type(instance).objects.filter(pk=instance.pk)
+    if expected is not None:
+        rows = rows.filter(version=expected)
+    if not rows.update(version=F('version') + 1, **values):
+        return False
+    for name, value in values.items():
+        setattr(instance, name, value)
+    if expected is not None:
+        instance.version = expected + 1
+    else:
+        instance.refresh_from_db(fields=['version'])
+    return True
+
+
+def versioned_bulk_update(model, instances, fields, batch_size=500):
+    """bulk_update that increments each row's version in the same statement, so a client still
+    holding the old version gets a conflict on its next conditional write"""
+    versions = [instance.version for instance in instances]
+    for instance in instances:
+        instance.version = F('version') + 1
+    model.objects.bulk_update(instances, [*fields, 'version'], batch_size=batch_size)
+    for instance, version in zip(instances, versions):
+        instance.version = version + 1
+
+
+# ========================================== Full-state sync ==========================================
+SYNC_EXCLUDED_FIELDS = ('id', 'event', 'version', 'created_at', 'updated_at')
+
+
+def canonical_value(field, value):
+    """Representation used for hashing, so '1.50', 1.5 and Decimal('1.5') compare equal"""
+    if value is None:
+        return None
+    if isinstance(field, models.DecimalField):
+        try:
+            return str(Decimal(str(value)).normalize())
+        except (InvalidOperation, ValueError):
+            return repr(value)  # never equal to a stored value, so the serializer reports it
+    if isinstance(field, models.IntegerField):
+        try:
+            return int(value) if int(value) == Decimal(str(value)) else repr(value)
+        except (InvalidOperation, TypeError, ValueError):
+            return repr(value)
+    return str(value)
+
+
+@functools.lru_cache(maxsize=None)
+def event_scoped(serializer_class):
+    """Variant of a serializer with `event` read-only - the event comes from the URL, so validating
+    a row never has to look it up again"""
+    meta = type('Meta', (serializer_class.Meta,), {
+        'read_only_fields': [*serializer_class.Meta.read_only_fields, 'event'],
+    })
+    return type(serializer_class.__name__, (serializer_class,), {'Meta': meta})
+
+
+class LayoutSync:
+    """Diff a submitted full layout against the stored one and apply the difference.
+
+    Rows are compared by a hash of their canonical content, so unchanged rows never reach the
+    serializer or the database. Submitted rows without an id (or with an id that is not in this
+    layout) are created, stored rows missing from the submission are deleted, and fields left out
+    of a submitted row keep their stored values. A submitted row carrying `version` conflicts
+    unless the stored row is still at that version.
+
+    The stored layout is read with its rows locked, so it must be built inside a transaction
+    that also applies the plan.
+    """
+
+    def __init__(self, event, serializer_class):
+        self.event = event
+        self.serializer_class = event_scoped(serializer_class)
+        self.model = serializer_class.Meta.model
+        self.fields = [f for f in serializer_class.Meta.fields if f not in SYNC_EXCLUDED_FIELDS]
+        self.model_fields = {name: self.model._meta.get_field(name) for name in self.fields}
+        rows = self.model.objects.select_for_update().filter(event=event)
+        self.stored = {row['id']: row for row in rows.values('id', 'version', *self.fields)}
+        self.hashes = {item_id: self.content_hash(row) for item_id, row in self.stored.items()}
+
+    def content_hash(self, values):
+        canonical = [canonical_value(self.model_fields[name], values.get(name)) for name in self.fields]
+        payload = json.dumps(canonical, separators=(',', ':')).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    @staticmethod
+    def layout_hash(hashes):
+        """Hash of a whole layout, independent of row order"""
+        digest = hashlib.blake2b(digest_size=16)
+        for item_id, row_hash in sorted((str(k), v) for k, v in hashes.items()):
+            digest.update(f'{item_id}:{row_hash};'.encode())
+        return digest.hexdigest()
+
+    # ---------------------------------------------------------------- planning
+    def plan(self, items):
+        """Validate a submission; returns (plan, errors, conflicts). Only changed rows are validated."""
+        errors, conflicts = [], []
+        creates, updates = [], []
+        seen = set()
+        unchanged = 0
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({'index': index, 'errors': ['item must be an object']})
+                continue
+            item_id = parse_uuid(item.get('id'))
+            if item_id in seen:
+                errors.append({'index': index, 'errors': ['duplicate id in submission']})
+                continue
+            stored = self.stored.get(item_id)
+            if stored is None:
+                creates.append((index, item))
+                continue
+            seen.add(item_id)
+            try:
+                expected = parse_version(item.get('version'))
+            except ValueError as exc:
+                errors.append({'index': index, 'errors': [str(exc)]})
+                continue
+            if expected is not None and expected != stored['version']:
+                conflicts.append(version_conflict(index, item_id, stored['version']))
+                continue
+            merged = {**stored, **{name: item[name] for name in self.fields if name in item}}
+            if self.content_hash(merged) == self.hashes[item_id]:
+                unchanged += 1
+            else:
+                updates.append((index, item, stored))
+
+        to_create, to_update, update_fields = [], [], set()
+        # One list serializer per kind builds its fields once instead of once per row
+        for (_, item), data in zip(creates, self.validate([item for _, item in creates], errors, creates)):
+            to_create.append((item.get('id'), self.model(event=self.event, **data)))
+
+        valid_updates = self.validate([item for _, item, _ in updates], errors, updates, partial=True)
+        instances = {obj.id: obj for obj in self.model.objects.filter(id__in=[s['id'] for _, _, s in updates])}
+        for (_, _, stored), data in zip(updates, valid_updates):
+            instance = instances[stored['id']]
+            for name, value in data.items():
+                if canonical_value(self.model_fields[name], value) != canonical_value(self.model_fields[name], stored[name]):
+                    setattr(instance, name, value)
+                    update_fields.add(name)
+            to_update.append(instance)
+
+        to_delete = [item_id for item_id in self.stored if item_id not in seen]
+        plan = {
+            'create': to_create, 'update': to_update, 'update_fields': sorted(update_fields),
+            'delete': to_delete, 'unchanged': unchanged,
+        }
+        return plan, sorted(errors, key=lambda error: error['index']), conflicts
+
+    def validate(self, items, errors, entries, partial=False):
+        """Validated data for each item; on failure appends per-item errors and returns []"""
+        if not items:
+            return []
+        serializer = self.serializer_class(data=items, many=True, partial=partial)
+        if serializer.is_valid():
+            return serializer.validated_data
+        errors.extend({'index': entry[0], 'errors': item_errors}
+                      for entry, item_errors in zip(entries, serializer.errors) if item_errors)
+        return []
+
+    # ---------------------------------------------------------------- persistence
+    def apply(self, plan):
+        """Write a validated plan with one statement per kind of change"""
+        now = timezone.now()
+        with transaction.atomic():
+            if plan['delete']:
+                self.model.objects.filter(event=self.event, id__in=plan['delete']).delete()
+            if plan['update']:
+                for instance in plan['update']:
+                    instance.updated_at = now
+                versioned_bulk_update(self.model, plan['update'], [*plan['update_fields'], 'updated_at'])
+            if plan['create']:
+                self.model.objects.bulk_create([instance for _, instance in plan['create']], batch_size=500)
+
+    def result(self, plan):
+        """Diff returned to the client, plus the hash of the layout after the sync"""
+        deleted = set(plan['delete'])
+        hashes = {k: v for k, v in self.hashes.items() if k not in deleted}
+        created = self.serializer_class([instance for _, instance in plan['create']], many=True).data
+        created = [{**data, 'client_id': client_id} for (client_id, _), data in zip(plan['create'], created)]
+        updated = self.serializer_class(plan['update'], many=True).data
+        for data in [*created, *updated]:
+            hashes[parse_uuid(data['id'])] = self.content_hash(data)
+        return {
+            'created': created,
+            'updated': updated,
+            'deleted': [str(item_id) for item_id in plan['delete']],
+            'unchanged': plan['unchanged'],
+            'layout_hash': self.layout_hash(hashes),
+        }
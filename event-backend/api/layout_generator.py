@@ -0,0 +1,285 @@
+"""
+Automatic conference room layouts
+Tables (or theatre chairs) are packed on a regular grid. Each candidate packing - grid phase,
+staggering - is checked against a keep-out mask of walls, doors, stages, podiums and existing
+furniture with a summed-area table, so every table of a candidate is tested at once. Candidates
+are evaluated in parallel chunks and the one seating the headcount closest to the front wins.
+Pure functions over plain data so the search can run in a worker process.
+"""
+
+import math
+
+import numpy as np
+
+from .geometry import Footprints, grid_shape, rasterize
+from .workers import cpu_count, map_in_workers
+
+MASK_CELL = 0.1          # metres per keep-out mask cell
+MAX_MASK_CELLS = 1_000_000
+CHAIR_ZONE = 0.7         # depth taken by a chair and the guest sitting on it
+DOOR_CLEARANCE = 1.5     # free radius kept in front of doors
+STAGE_CLEARANCE = 2.0    # free band kept around stages and podiums
+PHASES = 4               # grid phases tried per axis
+# Rooms with fewer obstacles are searched in-process: the whole search takes ~0.1 s there, less than
+# starting and feeding pool workers
+POOL_MIN_OBSTACLES = 1000
+MAX_GRID_UNITS = 100_000  # grid positions per candidate packing; larger rooms are refused
+
+STYLES = {
+    # Round tables on a (optionally staggered) grid, chairs all around
+    'banquet': {
+        'table_type': 'table_round', 'width': 1.8, 'height': 1.8, 'seats': 8,
+        'staggers': (False, True), 'block': None, 'aisle': 0.0,
+    },
+    # Rectangle tables end to end in rows facing the front, seats on both long sides
+    'classroom': {
+        'table_type': 'table_rectangle', 'width': 2.4, 'height': 1.2, 'seats': 6,
+        'staggers': (False,), 'block': 3, 'aisle': 1.2,
+    },
+    # Rows of single chairs facing the front, cut into blocks by aisles
+    'theatre': {
+        'table_type': 'chair', 'width': 0.5, 'height': 0.5, 'seats': 1,
+        'staggers': (False,), 'block': 14, 'aisle': 1.2,
+    },
+}
+
+# Accepted ranges for per-request unit overrides
+UNIT_SIZE_RANGE = (0.3, 10.0)   # metres, table or chair width and height
+SEATS_RANGE = (1, 30)           # seats per table
+
+TABLE_DEFAULTS = {
+    'table_round': {'width': 1.8, 'height': 1.8, 'seats': 8},
+    'table_rectangle': {'width': 2.4, 'height': 1.2, 'seats': 6},
+}
+
+
+def layout_spec(style, table_type=None, seats=None, width=None, height=None):
+    """Resolve a style plus overrides into the unit being packed; raises ValueError"""
+    if style not in STYLES:
+        raise ValueError(f"style must be one of {', '.join(STYLES)}")
+    spec = dict(STYLES[style], style=style)
+    if table_type and style != 'theatre':
+        if table_type not in TABLE_DEFAULTS:
+            raise ValueError(f"table_type must be one of {', '.join(TABLE_DEFAULTS)}")
+        spec.update(TABLE_DEFAULTS[table_type], table_type=table_type)
+    for key, value in (('seats', seats), ('width', width), ('height', height)):
+        if value is None:
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{key} must be a number') from None
+        low, high = SEATS_RANGE if key == 'seats' else UNIT_SIZE_RANGE
+        # not (low <= number <= high) also rejects nan
+        if not (low <= number <= high) or (key == 'seats' and not number.is_integer()):
+            kind = 'an integer' if key == 'seats' else 'a number'
+            raise ValueError(f'{key} must be {kind} between {low} and {high}')
+        spec[key] = int(number) if key == 'seats' else number
+    return spec
+
+
+def unit_zone(spec):
+    """Half extents (x, y) of the area a unit claims: table plus the chairs around it"""
+    w, h = spec['width'] / 2, spec['height'] / 2
+    if spec['table_type'] == 'table_round':
+        return w + CHAIR_ZONE, h + CHAIR_ZONE
+    if spec['table_type'] == 'table_rectangle':
+        return w, h + CHAIR_ZONE  # chairs along the long (top and bottom) sides only
+    return w, h
+
+
+def unit_spacing(spec, clearance):
+    """Free gap between neighbouring zones along x and y"""
+    if spec['table_type'] == 'chair':
+        return 0.05, 0.45   # seat-to-seat and row-to-row legroom
+    if spec['style'] == 'classroom':
+        return 0.0, clearance  # tables touch end to end within a block
+    return clearance, clearance
+
+
+# ========================================== Keep-out mask ==========================================
+def keep_out_mask(problem):
+    """Boolean grid of cells no unit may cover, plus its summed-area table"""
+    rows, cols, cell = grid_shape(problem['room_width'], problem['room_height'], MASK_CELL, MAX_MASK_CELLS)
+    mask = np.zeros((rows, cols), dtype=bool)
+    for margin, group in problem['obstacles']:
+        rasterize(Footprints.from_rows(group).grown(margin), mask, cell, True)
+    table = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+    table[1:, 1:] = mask.cumsum(axis=0).cumsum(axis=1)
+    return table, cell
+
+
+def blocked_counts(table, cell, x0, y0, x1, y1):
+    """Number of keep-out cells overlapping each box (vectorized over boxes)"""
+    rows, cols = table.shape[0] - 1, table.shape[1] - 1
+    c0 = np.clip(np.floor(x0 / cell).astype(int), 0, cols)
+    r0 = np.clip(np.floor(y0 / cell).astype(int), 0, rows)
+    c1 = np.clip(np.ceil(x1 / cell).astype(int), 0, cols)
+    r1 = np.clip(np.ceil(y1 / cell).astype(int), 0, rows)
+    return table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+
+
+def build_problem(room_width, room_height, elements, spec, headcount, clearance):
+    """Packing problem for a room given the elements that stay (dicts with element_type + geometry).
+
+    Raises ValueError for a room that is not a finite positive size, or too large to grid at the unit size.
+    """
+    if not (0 < room_width < math.inf and 0 < room_height < math.inf):
+        raise ValueError('room_width and room_height must be positive')
+    hx, hy = unit_zone(spec)
+    gap_x, gap_y = unit_spacing(spec, clearance)
+    if (room_width / (2 * hx + gap_x)) * (room_height / (2 * hy + gap_y)) > MAX_GRID_UNITS:
+        raise ValueError(f'the room fits more than {MAX_GRID_UNITS} units; use larger tables or a smaller room')
+    groups = {}
+    for element in elements:
+        kind = element['element_type']
+        if kind == 'door':
+            margin = DOOR_CLEARANCE
+        elif kind in ('stage', 'podium'):
+            margin = STAGE_CLEARANCE
+        elif kind in ('table_round', 'table_rectangle'):
+            margin = clearance + CHAIR_ZONE
+        elif kind == 'chair':
+            margin = unit_spacing({'table_type': 'chair'}, clearance)[1]
+        elif kind == 'tactile_paving':
+            margin = clearance / 2
+        elif kind == 'custom':
+            margin = clearance
+        else:
+            continue  # windows and outlets sit on the walls
+        groups.setdefault(margin, []).append(element)
+
+    stages = [e for e in elements if e['element_type'] == 'stage'] or \
+        [e for e in elements if e['element_type'] == 'podium']
+    if stages:
+        largest = Footprints.from_rows([max(stages, key=lambda e: float(e['width']) * float(e['height']))])
+        front = tuple(float(v) for v in largest.centers()[0])
+        if spec['style'] != 'banquet':
+            # Rows are ranked from the stage's audience-facing edge
+            min_y, max_y = largest.bounds()[0, [1, 3]]
+            front = (front[0], float(max_y) if front[1] <= room_height / 2 else float(min_y))
+    elif spec['style'] == 'banquet':
+        front = (room_width / 2, room_height / 2)
+    else:
+        front = (room_width / 2, 0.0)
+
+    return {
+        'room_width': room_width,
+        'room_height': room_height,
+        'clearance': clearance,
+        'units': max(math.ceil(headcount / spec['seats']), 0),
+        'front': front,
+        'front_axis': 'point' if spec['style'] == 'banquet' else 'y',
+        'obstacles': list(groups.items()),
+    }
+
+
+# ========================================== Candidates ==========================================
+def grid_centres(problem, spec, phase_x, phase_y, stagger):
+    """Unit centres of one candidate packing as (cx, cy, row) arrays"""
+    hx, hy = unit_zone(spec)
+    gap_x, gap_y = unit_spacing(spec, problem['clearance'])
+    pitch_x, pitch_y = 2 * hx + gap_x, 2 * hy + gap_y
+    if stagger:
+        # Hexagonal packing: neighbours in adjacent rows stay exactly pitch_x apart (round tables only)
+        pitch_y *= math.sqrt(3) / 2
+    inset = problem['clearance']
+    n_cols = int((problem['room_width'] - 2 * inset) / pitch_x) + 2
+    n_rows = int((problem['room_height'] - 2 * inset) / pitch_y) + 2
+
+    k = np.arange(n_cols)
+    x = inset + hx + phase_x * pitch_x + k * pitch_x
+    if spec['block']:
+        x = x + (k // spec['block']) * max(spec['aisle'] - gap_x, 0.0)
+    r = np.arange(n_rows)
+    y = inset + hy + phase_y * pitch_y + r * pitch_y
+    cx = x[None, :] + np.where(r[:, None] % 2 == 1, pitch_x / 2 if stagger else 0.0, 0.0)
+    cy = np.broadcast_to(y[:, None], cx.shape)
+    rows = np.broadcast_to(r[:, None], cx.shape)
+    return cx.ravel(), cy.ravel(), rows.ravel()
+
+
+def evaluate(problem, spec, table, cell, candidate):
+    """Place units for one candidate; returns (score, centres) with centres sorted front first"""
+    phase_x, phase_y, stagger = candidate
+    cx, cy, rows = grid_centres(problem, spec, phase_x, phase_y, stagger)
+    hx, hy = unit_zone(spec)
+    inset = problem['clearance']
+    inside = ((cx - hx >= inset) & (cx + hx <= problem['room_width'] - inset)
+              & (cy - hy >= inset) & (cy + hy <= problem['room_height'] - inset))
+    free = inside & (blocked_counts(table, cell, cx - hx, cy - hy, cx + hx, cy + hy) == 0)
+    cx, cy, rows = cx[free], cy[free], rows[free]
+
+    fx, fy = problem['front']
+    if problem['front_axis'] == 'y':
+        # Fill whole rows nearest the front first; rows level with or behind the stage come last
+        ahead = (cy - fy) if fy <= problem['room_height'] / 2 else (fy - cy)
+        distance = np.where(ahead >= 0, ahead, problem['room_height'] - ahead) + 0.01 * np.abs(cx - fx)
+    else:
+        distance = np.hypot(cx - fx, cy - fy)
+    order = np.argsort(distance, kind='stable')[:problem['units']]
+    placed = len(order)
+    # More units first, then the tightest cluster around the front
+    score = (placed, -float(distance[order].sum()) if placed else 0.0)
+    return score, np.stack([cx[order], cy[order], rows[order]], axis=1)
+
+
+def evaluate_chunk(problem, spec, candidates):
+    table, cell = keep_out_mask(problem)
+    return max((evaluate(problem, spec, table, cell, c) for c in candidates), key=lambda result: result[0])
+
+
+def generate(problem, spec):
+    """Best packing for problem = {
+        'room_width', 'room_height', 'clearance', 'units',   # units = tables (or chairs) wanted
+        'front': (x, y), 'front_axis': 'y' | 'point',
+        'obstacles': [(margin, [geometry dicts])],
+    }
+    Returns [(cx, cy, row)] unit centres, front first.
+    """
+    phases = np.arange(PHASES) / PHASES
+    candidates = [(px, py, stagger) for stagger in spec['staggers'] for px in phases for py in phases]
+    if sum(len(geometries) for _, geometries in problem['obstacles']) < POOL_MIN_OBSTACLES:
+        results = [evaluate_chunk(problem, spec, candidates)]
+    else:
+        chunks = max(1, min(cpu_count(), 4))
+        parts = [candidates[i::chunks] for i in range(chunks)]
+        results = map_in_workers(evaluate_chunk, [problem] * chunks, [spec] * chunks, parts)
+    return max(results, key=lambda result: result[0])[1].tolist()
+
+
+def units_to_elements(centres, spec, start_number=1):
+    """Element dicts (top-left positions, canvas convention) for unit centres given front first"""
+    # Rows are labelled in order of distance from the front, units left to right within a row
+    row_rank = {}
+    for _, _, row in centres:
+        row_rank.setdefault(row, len(row_rank))
+    centres = sorted(centres, key=lambda c: (row_rank[c[2]], c[0]))
+    elements = []
+    seat_in_row = {}
+    for number, (cx, cy, row) in enumerate(centres, start=start_number):
+        if spec['table_type'] == 'chair':
+            seat_in_row[row] = seat_in_row.get(row, 0) + 1
+            label = f'{row_label(row_rank[row])}{seat_in_row[row]}'
+        else:
+            label = f'Table {number}'
+        elements.append({
+            'element_type': spec['table_type'],
+            'label': label,
+            'seats': spec['seats'],
+            'position_x': round(cx - spec['width'] / 2, 2),
+            'position_y': round(cy - spec['height'] / 2, 2),
+            'width': spec['width'],
+            'height': spec['height'],
+        })
+    return elements
+
+
+def row_label(index):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    label = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        label = chr(65 + rem) + label
+    return label
@@ -0,0 +1,255 @@
+"""
+Append-only layout operation log
+Collaborative clients send small add/move/update/delete operations instead of whole layouts.
+Each batch is applied to the element/booth table and appended to the event's log in one
+transaction, under sequence numbers allocated from the event row, so concurrent editors only
+overwrite the fields they actually touched. Reconnecting clients replay the log tail "since seq N";
+compaction trims entries every client has had time to see, since the tables already hold their
+effect.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .invalidation import bump_generation
+from .layout_edits import POSE_FIELDS, event_scoped, parse_version, version_conflict, versioned_bulk_update
+from .utils import parse_uuid
+
+OP_TYPES = ('add', 'move', 'update', 'delete')
+MOVE_FIELDS = POSE_FIELDS
+MAX_OPS_PER_BATCH = 1000
+DEFAULT_READ_LIMIT = 1000
+
+DEFAULTS = {
+    'RETAIN_OPS': 1000,       # newest entries always kept per event
+    'MIN_AGE_MINUTES': 60,    # entries younger than this are never compacted
+    'COMPACT_AT': 5000,       # uncompacted entries that trigger compaction on write
+}
+
+
+def get_ops_settings():
+    return {**DEFAULTS, **getattr(settings, 'LAYOUT_OPS', {})}
+
+
+def representation(serializer, values):
+    """JSON-safe form of validated values, as the serializer would render them"""
+    return {name: serializer.fields[name].to_representation(value) for name, value in values.items()}
+
+
+class LayoutOpLog:
+    """Operation log of one event over its element (or booth) table"""
+
+    def __init__(self, event, serializer_class, op_model):
+        self.event = event
+        self.serializer_class = event_scoped(serializer_class)
+        self.model = serializer_class.Meta.model
+        self.op_model = op_model
+
+    # ---------------------------------------------------------------- writing
+    def write(self, ops, client_id=''):
+        """Validate and apply a batch in one transaction; returns (plan, logged entries, errors, conflicts).
+
+        The event row is updated first, which locks it, so the rows the batch touches are read
+        only after every earlier batch of the event has committed; nothing is written if any op
+        is invalid or conflicts.
+        """
+        with transaction.atomic():
+            type(self.event).objects.filter(pk=self.event.pk).update(layout_version=F('layout_version') + 1)
+            plan, errors, conflicts = self.plan(ops)
+            if errors or conflicts:
+                transaction.set_rollback(True)
+                return plan, [], errors, conflicts
+            return plan, self._apply(plan, client_id), [], []
+
+    def plan(self, ops):
+        """Validate a batch against one locked fetch of the rows it touches; returns (plan, errors, conflicts).
+
+        Ops are applied in order in memory, so a batch may add an element and then move it.
+        Each updated row remembers only the fields its own ops set. An op carrying `version`
+        conflicts unless its row was at that version before the batch.
+        """
+        if len(ops) > MAX_OPS_PER_BATCH:
+            return None, [{'index': None, 'errors': [f'at most {MAX_OPS_PER_BATCH} ops per batch']}], []
+        targets = {parse_uuid(op.get('id')) for op in ops if isinstance(op, dict)} - {None}
+        rows = {row.id: row for row in self.model.objects.select_for_update().filter(id__in=targets)}
+        state = {row_id: row for row_id, row in rows.items() if row.event_id == self.event.id}
+        versions = {row_id: row.version for row_id, row in state.items()}
+
+        errors, conflicts, entries = [], [], []
+        created, updated, deleted, update_fields = {}, {}, set(), {}
+        for index, op in enumerate(ops):
+            if not isinstance(op, dict) or op.get('op') not in OP_TYPES:
+                errors.append({'index': index, 'errors': [f"op must be one of {', '.join(OP_TYPES)}"]})
+                continue
+            kind, data = op['op'], op.get('data') or {}
+            target = parse_uuid(op.get('id'))
+            if not isinstance(data, dict):
+                errors.append({'index': index, 'errors': ['data must be an object']})
+                continue
+
+            if kind == 'add':
+                if target is not None and (state.get(target) is not None or target in rows and target not in state):
+                    errors.append({'index': index, 'errors': ['id is already in use']})
+                    continue
+                serializer = self.serializer_class(data=data)
+                if not serializer.is_valid():
+                    errors.append({'index': index, 'errors': serializer.errors})
+                    continue
+                instance = self.model(event=self.event, **serializer.validated_data)
+                if target is not None:
+                    instance.id = target
+                state[instance.id] = created[instance.id] = instance
+                entries.append((kind, instance.id, representation(serializer, serializer.validated_data)))
+                continue
+
+            instance = state.get(target)
+            if instance is None:
+                errors.append({'index': index, 'errors': ['not found in this layout']})
+                continue
+            try:
+                expected = parse_version(op.get('version'))
+            except ValueError as exc:
+                errors.append({'index': index, 'errors': [str(exc)]})
+                continue
+            if expected is not None and target in versions and expected != versions[target]:
+                conflicts.append(version_conflict(index, target, versions[target]))
+                continue
+            if kind == 'delete':
+                state[target] = None
+                updated.pop(target, None)
+                update_fields.pop(target, None)
+                if created.pop(target, None) is None:
+                    deleted.add(target)
+                entries.append((kind, target, {}))
+                continue
+
+            if kind == 'move' and not set(data) <= set(MOVE_FIELDS):
+                errors.append({'index': index, 'errors': [f"move only changes {', '.join(MOVE_FIELDS)}"]})
+                continue
+            serializer = self.serializer_class(data=data, partial=True)
+            if not serializer.is_valid():
+                errors.append({'index': index, 'errors': serializer.errors})
+                continue
+            for name, value in serializer.validated_data.items():
+                setattr(instance, name, value)
+            if target not in created:
+                updated[target] = instance
+                update_fields.setdefault(target, set()).update(serializer.validated_data)
+            entries.append((kind, target, representation(serializer, serializer.validated_data)))
+
+        plan = {
+            'create': list(created.values()), 'update': list(updated.values()),
+            'update_fields': {row_id: sorted(fields) for row_id, fields in update_fields.items()}, 'delete': sorted(deleted), 'entries': entries,
+        }
+        return plan, errors, conflicts
+
+    def _apply(self, plan, client_id):
+        """Write the rows and the log entries inside write(); layout_version is already bumped
+        once for the batch. Rows updated by the same set of fields share one bulk_update, so no
+        row is written beyond what its ops changed.
+        """
+        entries = plan['entries']
+        now = timezone.now()
+        type(self.event).objects.filter(pk=self.event.pk).update(op_seq=F('op_seq') + len(entries))
+        self.event.refresh_from_db(fields=['op_seq', 'layout_version'])
+        if plan['delete']:
+            self.model.objects.filter(event=self.event, id__in=plan['delete']).delete()
+        groups = {}
+        for instance in plan['update']:
+            instance.updated_at = now
+            groups.setdefault(tuple(plan['update_fields'][instance.id]), []).append(instance)
+        for fields, instances in groups.items():
+            versioned_bulk_update(self.model, instances, [*fields, 'updated_at'])
+        if plan['create']:
+            self.model.objects.bulk_create(plan['create'], batch_size=500)
+        first = self.event.op_seq - len(entries) + 1
+        logged = self.op_model.objects.bulk_create([
+            self.op_model(
+                event=self.event, seq=first + k, op=kind, target_id=target, data=data,
+                client_id=client_id, layout_version=self.event.layout_version,
+            )
+            for k, (kind, target, data) in enumerate(entries)
+        ], batch_size=500)
+        bump_generation(self.event)
+        return logged
+
+    # ---------------------------------------------------------------- reading
+    def since(self, seq, limit=DEFAULT_READ_LIMIT):
+        """Entries after `seq`, oldest first.
+
+        Returns {'seq', 'ops', 'more', 'reset'}. `reset` means the tail cannot reproduce the
+        current layout - the entries were compacted away, or the layout was also changed by a
+        write outside the log (bulk save, sync, transform...) - and the client must reload it.
+        """
+        head, compacted, current = self.event.op_seq, self.event.ops_compacted_seq, self.event.layout_version
+        if seq > head:
+            raise ValueError(f'since must be between 0 and {head}')
+        reset = {'seq': head, 'ops': [], 'more': False, 'reset': True}
+        if seq < compacted:
+            return reset
+        log = self.op_model.objects.filter(event=self.event)
+        if seq == 0:
+            base = 0
+        else:
+            base = log.filter(seq=seq).values_list('layout_version', flat=True).first()
+            if base is None:
+                return reset
+        ops = list(log.filter(seq__gt=seq, seq__lte=head).order_by('seq')[:limit])
+        more = bool(ops) and ops[-1].seq < head
+
+        # Each batch bumps layout_version by exactly one; any gap is a write the log did not see
+        version = base
+        for op in ops:
+            if op.layout_version not in (version, version + 1):
+                return reset
+            version = op.layout_version
+        if not more and version != current:
+            return reset
+        return {'seq': head, 'ops': ops, 'more': more, 'reset': False}
+
+
+def entry_data(entry):
+    return {
+        'seq': entry.seq,
+        'op': entry.op,
+        'id': str(entry.target_id),
+        'data': entry.data,
+        'client_id': entry.client_id,
+        'created_at': entry.created_at.isoformat() if entry.created_at else None,
+    }
+
+
+def compact(event, op_model, retain_ops=None, min_age=None):
+    """Drop log entries older than the retention window; returns the number deleted.
+
+    The newest `retain_ops` entries and everything younger than `min_age` are kept. The oldest
+    surviving entry stays as the anchor clients resume from, and older sequence numbers report
+    a reset. Deletes one indexed range, so it holds no long locks.
+    """
+    config = get_ops_settings()
+    retain_ops = config['RETAIN_OPS'] if retain_ops is None else retain_ops
+    min_age = timedelta(minutes=config['MIN_AGE_MINUTES']) if min_age is None else min_age
+
+    log = op_model.objects.filter(event=event)
+    cut = event.op_seq - retain_ops
+    old_enough = (log.filter(created_at__lt=timezone.now() - min_age)
+                  .order_by('-seq').values_list('seq', flat=True).first())
+    cut = min(cut, old_enough or 0)
+    if cut <= event.ops_compacted_seq:
+        return 0
+    with transaction.atomic():
+        deleted, _ = log.filter(seq__lt=cut).delete()
+        type(event).objects.filter(pk=event.pk).update(ops_compacted_seq=cut)
+    event.ops_compacted_seq = cut
+    return deleted
+
+
+def compact_if_due(event, op_model):
+    """Inline compaction once an event's log grows past COMPACT_AT uncompacted entries"""
+    if event.op_seq - event.ops_compacted_seq > get_ops_settings()['COMPACT_AT']:
+        return compact(event, op_model)
+    return 0
@@ -0,0 +1,92 @@
+"""
+Layout validation: overlapping footprints and minimum clearance between solid items
+Candidate pairs come from a uniform-grid index over bounding boxes; exact rotated-rectangle
+overlap depth and gap are then computed for all candidates at once. Items that touch (shared
+booth walls, tables pushed together) are allowed; anything closer than the clearance is not.
+"""
+
+from django.conf import settings
+
+import numpy as np
+
+from .geometry import GEOMETRY_FIELDS, Footprints, GridIndex, separation
+from .models import ConferenceElement, TradeshowBooth
+
+DEFAULT_VALIDATION = {
+    'CLEARANCE': {'conference': 0.9, 'tradeshow': 1.2},
+}
+
+TOLERANCE = 0.01  # positions are stored with 2 decimals
+
+# Items that occupy floor space; doors, windows, outlets and floor markings never conflict
+CONFERENCE_SOLID_TYPES = {*ConferenceElement.TABLE_TYPES, 'podium', 'stage', 'custom'}
+TRADESHOW_SOLID_TYPES = {
+    'booth_standard', 'booth_large', 'booth_premium', 'booth_island', 'restroom', 'info_desk',
+}
+
+VALIDATION_MODES = ('report', 'strict', 'off')
+
+
+def get_clearance(layout):
+    config = getattr(settings, 'LAYOUT_VALIDATION', {})
+    return {**DEFAULT_VALIDATION['CLEARANCE'], **config.get('CLEARANCE', {})}[layout]
+
+
+def validate_layout(rows, clearance, focus=None):
+    """Check solid footprints for overlaps and clearance violations.
+
+    rows: dicts with 'id', 'label' and the GEOMETRY_FIELDS. With `focus` (a set of ids) only pairs
+    involving at least one of those items are reported.
+    """
+    rows = list(rows)
+    footprints = Footprints.from_rows(rows)
+    i, j = GridIndex(footprints.bounds()).pairs(margin=clearance)
+    if focus is not None:
+        ids = np.array([str(row['id']) in focus for row in rows], dtype=bool)
+        keep = ids[i] | ids[j]
+        i, j = i[keep], j[keep]
+    corners = footprints.corners()
+    depth, gap = separation(corners[i], corners[j])
+
+    def describe(k):
+        return {'id': str(rows[k]['id']), 'label': rows[k]['label']}
+
+    overlaps = [
+        {'a': describe(a), 'b': describe(b), 'depth': round(float(d), 2)}
+        for a, b, d in zip(i.tolist(), j.tolist(), depth.tolist()) if d > TOLERANCE
+    ]
+    violations = [
+        {'a': describe(a), 'b': describe(b), 'gap': round(float(g), 2)}
+        for a, b, d, g in zip(i.tolist(), j.tolist(), depth.tolist(), gap.tolist())
+        if d <= TOLERANCE and TOLERANCE < g < clearance - TOLERANCE
+    ]
+    return {
+        'checked': len(rows),
+        'clearance': clearance,
+        'overlaps': overlaps,
+        'clearance_violations': violations,
+    }
+
+
+def validate_conference_layout(event, focus=None):
+    rows = (ConferenceElement.objects.filter(event=event, element_type__in=CONFERENCE_SOLID_TYPES)
+            .values('id', 'label', *GEOMETRY_FIELDS))
+    return validate_layout(rows, get_clearance('conference'), focus=focus)
+
+
+def validate_tradeshow_layout(event, focus=None):
+    rows = (TradeshowBooth.objects.filter(event=event, booth_type__in=TRADESHOW_SOLID_TYPES)
+            .values('id', 'label', *GEOMETRY_FIELDS))
+    return validate_layout(rows, get_clearance('tradeshow'), focus=focus)
+
+
+def validation_headers(report):
+    """Summary headers attached to bulk save responses"""
+    return {
+        'X-Layout-Overlaps': str(len(report['overlaps'])),
+        'X-Layout-Clearance-Violations': str(len(report['clearance_violations'])),
+    }
+
+
+def has_violations(report):
+    return bool(report['overlaps'] or report['clearance_violations'])
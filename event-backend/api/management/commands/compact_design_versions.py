@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.design_retention import RetentionPolicy, candidate_designs, compact_design
+
+
+class Command(BaseCommand):
+    help = "Thin out old design versions per DESIGN_RETENTION (run periodically, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--design', type=int, action='append', dest='designs',
+                            help='only this design id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='report what would be removed without changing anything')
+
+    def handle(self, *args, **options):
+        policy, now = RetentionPolicy(), timezone.now()
+        designs = options['designs'] or list(candidate_designs(policy, now))
+        total = 0
+        for design_id in designs:
+            # One chain per transaction inside compact_design, so saves are never held up for long
+            total += compact_design(design_id, policy, now, dry_run=options['dry_run'])
+        verb = 'would remove' if options['dry_run'] else 'removed'
+        self.stdout.write(f'Design versions: {verb} {total} from {len(designs)} designs')
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from api.layout_ops import compact, get_ops_settings
+from api.models import (
+    ConferenceEvent, ConferenceLayoutOperation, TradeshowEvent, TradeshowLayoutOperation
+)
+
+
+class Command(BaseCommand):
+    help = "Trim layout operation logs down to the retention window (run periodically, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        config = get_ops_settings()
+        parser.add_argument('--retain', type=int, default=config['RETAIN_OPS'],
+                            help='newest entries kept per event')
+        parser.add_argument('--min-age-minutes', type=int, default=config['MIN_AGE_MINUTES'],
+                            help='entries younger than this are always kept')
+
+    def handle(self, *args, **options):
+        min_age = timedelta(minutes=options['min_age_minutes'])
+        for event_model, op_model in ((ConferenceEvent, ConferenceLayoutOperation),
+                                      (TradeshowEvent, TradeshowLayoutOperation)):
+            # Only events whose log has grown past the retention window
+            events = event_model.objects.filter(op_seq__gt=F('ops_compacted_seq') + options['retain'])
+            total = 0
+            for event in events.iterator():
+                total += compact(event, op_model, retain_ops=options['retain'], min_age=min_age)
+            self.stdout.write(f'{event_model.__name__}: removed {total} log entries')
@@ -0,0 +1,163 @@
+"""
+Priority admission control
+Requests are classified (check-in, interactive editor, bulk/export) and each class gets its own
+concurrency limit, so door check-ins keep flowing while heavy saves and imports queue or get shed.
+
+Limits are per process. Under uvicorn (ASGI) the middleware runs on the event loop, so it counts
+every request admitted into the process, including those queued for Django's single sync-view
+thread; a request waiting for a slot yields to the loop instead of blocking it. Under a WSGI
+server it falls back to blocking threads, and only bites with threaded workers (runserver).
+"""
+
+import asyncio
+import re
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+
+CHECKIN = 'checkin'
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+# Health probes, and long-lived event streams that would otherwise pin a slot
+EXEMPT_PATHS = re.compile(r'^/api/((health|ready)|.+/stream)/$')
+
+# First match wins; anything else under /api/ is interactive editor traffic
+REQUEST_CLASSES = [
+    (CHECKIN, re.compile(r'^/api/qr/')),
+    (CHECKIN, re.compile(r'^/api/.+/checkin/$')),
+    (CHECKIN, re.compile(r'^/api/.+/(guests|vendors)/search/$')),
+    (BULK, re.compile(r'^/api/.+/(bulk|sync|import|export|auto|apply_preset|clone)/$')),
+]
+
+DEFAULT_ADMISSION = {
+    'ENABLED': True,
+    # Max concurrent requests per class (None = unlimited)
+    'LIMITS': {CHECKIN: None, INTERACTIVE: 32, BULK: 4},
+    # Seconds a request may wait for a slot before being shed
+    'QUEUE_TIMEOUT': {INTERACTIVE: 2.0, BULK: 5.0},
+    # Bulk requests are shed immediately while this many check-ins are in flight
+    'CHECKIN_PRESSURE': 8,
+    'RETRY_AFTER': 5,
+}
+
+
+def classify_request(request):
+    """Return the admission class for a request, or None if it is never limited"""
+    path = request.path
+    if not path.startswith('/api/') or EXEMPT_PATHS.match(path):
+        return None
+    for request_class, pattern in REQUEST_CLASSES:
+        if pattern.match(path):
+            return request_class
+    return INTERACTIVE
+
+
+class ClassGate:
+    """Counting gate for one request class"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout):
+        with self._cond:
+            if self.limit is None:
+                self.in_flight += 1
+                return True
+            deadline = time.monotonic() + timeout
+            while self.in_flight >= self.limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    if self.in_flight >= self.limit:
+                        return False
+            self.in_flight += 1
+            return True
+
+    def try_acquire(self):
+        with self._cond:
+            if self.limit is not None and self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self, timeout, poll=0.05):
+        """acquire() for the event loop - polls instead of blocking the loop thread"""
+        deadline = time.monotonic() + timeout
+        while not self.try_acquire():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(poll, remaining))
+        return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+
+class AdmissionControlMiddleware:
+    """Enforce per-class concurrency limits, favouring check-in traffic"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.config = {**DEFAULT_ADMISSION, **getattr(settings, 'ADMISSION_CONTROL', {})}
+        limits = {**DEFAULT_ADMISSION['LIMITS'], **self.config['LIMITS']}
+        self.gates = {name: ClassGate(limit) for name, limit in limits.items()}
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request_class = self.admission_class(request)
+        if request_class is None:
+            return self.get_response(request)
+
+        gate = self.gates[request_class]
+        if self.under_checkin_pressure(request_class):
+            return self.shed(request_class)
+        if not gate.acquire(self.config['QUEUE_TIMEOUT'].get(request_class, 0)):
+            return self.shed(request_class)
+        try:
+            return self.get_response(request)
+        finally:
+            gate.release()
+
+    async def __acall__(self, request):
+        request_class = self.admission_class(request)
+        if request_class is None:
+            return await self.get_response(request)
+
+        gate = self.gates[request_class]
+        if self.under_checkin_pressure(request_class):
+            return self.shed(request_class)
+        if not await gate.acquire_async(self.config['QUEUE_TIMEOUT'].get(request_class, 0)):
+            return self.shed(request_class)
+        try:
+            return await self.get_response(request)
+        finally:
+            gate.release()
+
+    def admission_class(self, request):
+        return classify_request(request) if self.config['ENABLED'] else None
+
+    def under_checkin_pressure(self, request_class):
+        return request_class == BULK and self.gates[CHECKIN].in_flight >= self.config['CHECKIN_PRESSURE']
+
+    def shed(self, request_class):
+        response = JsonResponse(
+            {'detail': 'Server busy, please retry shortly', 'request_class': request_class},
+            status=503
+        )
+        response['Retry-After'] = str(self.config['RETRY_AFTER'])
+        return response
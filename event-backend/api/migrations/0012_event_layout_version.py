@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_alter_tradeshowevent_hall_height_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conferenceevent',
+            name='layout_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tradeshowevent',
+            name='layout_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_event_layout_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conferenceevent',
+            name='op_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conferenceevent',
+            name='ops_compacted_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tradeshowevent',
+            name='op_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tradeshowevent',
+            name='ops_compacted_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ConferenceLayoutOperation',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('seq', models.PositiveBigIntegerField()),
+                ('op', models.CharField(choices=[('add', 'Add'), ('move', 'Move'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('target_id', models.UUIDField()),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('client_id', models.CharField(blank=True, default='', max_length=64)),
+                ('layout_version', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='layout_operations', to='api.conferenceevent')),
+            ],
+            options={
+                'ordering': ['seq'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('event', 'seq'), name='unique_conference_layout_op_seq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TradeshowLayoutOperation',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('seq', models.PositiveBigIntegerField()),
+                ('op', models.CharField(choices=[('add', 'Add'), ('move', 'Move'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('target_id', models.UUIDField()),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('client_id', models.CharField(blank=True, default='', max_length=64)),
+                ('layout_version', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='layout_operations', to='api.tradeshowevent')),
+            ],
+            options={
+                'ordering': ['seq'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('event', 'seq'), name='unique_tradeshow_layout_op_seq')],
+            },
+        ),
+    ]
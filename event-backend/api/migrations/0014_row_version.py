@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_layout_operation_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conferenceelement',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='tradeshowbooth',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:55
+
+from django.db import migrations, models
+
+BATCH_SIZE = 200
+KEYFRAME_INTERVAL = 20
+KEYFRAME_RATIO = 0.5
+
+
+def stored_fields(version, data, base):
+    # Same chaining as api.design_store.stored_fields with its default settings, frozen here
+    from api.json_delta import diff, dumps
+
+    if base is not None:
+        _, keyframe_version, base_data = base
+        if keyframe_version is not None and version - keyframe_version < KEYFRAME_INTERVAL:
+            delta = diff(base_data, data)
+            if len(dumps(delta)) <= KEYFRAME_RATIO * len(dumps(data)):
+                return {'data': None, 'delta': delta, 'keyframe_version': keyframe_version}
+    return {'data': data, 'delta': None, 'keyframe_version': version}
+
+
+def to_deltas(apps, schema_editor):
+    """Re-store every design's versions as keyframes plus deltas, one design at a time"""
+    DesignVersion = apps.get_model('api', 'DesignVersion')
+    design_ids = DesignVersion.objects.order_by().values_list('design_id', flat=True).distinct()
+    for design_id in list(design_ids):
+        base, batch = None, []
+        for row in DesignVersion.objects.filter(design_id=design_id).order_by('version').iterator(chunk_size=BATCH_SIZE):
+            data = row.data if row.data is not None else {}
+            for name, value in stored_fields(row.version, data, base).items():
+                setattr(row, name, value)
+            base = (row.version, row.keyframe_version, data)
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                DesignVersion.objects.bulk_update(batch, ['data', 'delta', 'keyframe_version'])
+                batch = []
+        DesignVersion.objects.bulk_update(batch, ['data', 'delta', 'keyframe_version'])
+
+
+def to_snapshots(apps, schema_editor):
+    """Store the full JSON on every row again"""
+    from api.json_delta import patch
+
+    DesignVersion = apps.get_model('api', 'DesignVersion')
+    design_ids = DesignVersion.objects.order_by().values_list('design_id', flat=True).distinct()
+    for design_id in list(design_ids):
+        data, batch = None, []
+        for row in DesignVersion.objects.filter(design_id=design_id).order_by('version').iterator(chunk_size=BATCH_SIZE):
+            if row.keyframe_version in (None, row.version):
+                data = row.data
+            else:
+                data = patch(data, row.delta)
+            row.data, row.delta, row.keyframe_version = data, None, None
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                DesignVersion.objects.bulk_update(batch, ['data', 'delta', 'keyframe_version'])
+                batch = []
+        DesignVersion.objects.bulk_update(batch, ['data', 'delta', 'keyframe_version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_row_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='designversion',
+            name='delta',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='designversion',
+            name='keyframe_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='designversion',
+            name='data',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(to_deltas, to_snapshots),
+    ]
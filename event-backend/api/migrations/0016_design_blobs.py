@@ -0,0 +1,120 @@
+# Generated by Django 5.2.6 on 2026-10-19 05:10
+
+import hashlib
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 200
+
+
+def encode(value):
+    # Same format as api.design_store.encode, frozen here
+    raw = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+    return hashlib.blake2b(raw, digest_size=32).hexdigest(), raw
+
+
+def to_blobs(apps, schema_editor):
+    """Move each version's keyframe/delta into a shared blob and record its full-content hash"""
+    from api.json_delta import patch
+
+    DesignBlob = apps.get_model('api', 'DesignBlob')
+    DesignVersion = apps.get_model('api', 'DesignVersion')
+
+    def flush(batch, blobs):
+        DesignBlob.objects.bulk_create(blobs.values(), ignore_conflicts=True)
+        DesignVersion.objects.bulk_update(batch, ['blob', 'keyframe_version', 'content_hash', 'size'])
+
+    design_ids = DesignVersion.objects.order_by().values_list('design_id', flat=True).distinct()
+    for design_id in list(design_ids):
+        data, batch, blobs = None, [], {}
+        for row in DesignVersion.objects.filter(design_id=design_id).order_by('version').iterator(chunk_size=BATCH_SIZE):
+            if row.keyframe_version in (None, row.version):
+                row.keyframe_version = row.version
+                data = stored = row.data if row.data is not None else {}
+            else:
+                data, stored = patch(data, row.delta), row.delta
+            digest, raw = encode(stored)
+            compressed = zlib.compress(raw, 6)
+            blobs[digest] = DesignBlob(digest=digest, payload=compressed, size=len(raw), stored_size=len(compressed))
+            row.blob_id = digest
+            row.content_hash, full = encode(data)
+            row.size = len(full)
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                flush(batch, blobs)
+                batch, blobs = [], {}
+        flush(batch, blobs)
+
+
+def from_blobs(apps, schema_editor):
+    DesignVersion = apps.get_model('api', 'DesignVersion')
+    batch = []
+    for row in DesignVersion.objects.select_related('blob').iterator(chunk_size=BATCH_SIZE):
+        stored = json.loads(zlib.decompress(bytes(row.blob.payload)))
+        if row.keyframe_version == row.version:
+            row.data, row.delta = stored, None
+        else:
+            row.data, row.delta = None, stored
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            DesignVersion.objects.bulk_update(batch, ['data', 'delta'])
+            batch = []
+    DesignVersion.objects.bulk_update(batch, ['data', 'delta'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_design_version_deltas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DesignBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('payload', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+                ('stored_size', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='designversion',
+            name='blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='versions', to='api.designblob'),
+        ),
+        migrations.AddField(
+            model_name='designversion',
+            name='content_hash',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='designversion',
+            name='size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(to_blobs, from_blobs),
+        migrations.RemoveField(
+            model_name='designversion',
+            name='data',
+        ),
+        migrations.RemoveField(
+            model_name='designversion',
+            name='delta',
+        ),
+        migrations.AlterField(
+            model_name='designversion',
+            name='blob',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='versions', to='api.designblob'),
+        ),
+        migrations.AlterField(
+            model_name='designversion',
+            name='keyframe_version',
+            field=models.PositiveIntegerField(),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 04:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def set_heads(apps, schema_editor):
+    """Point every design at its newest version with one UPDATE"""
+    Design = apps.get_model('api', 'Design')
+    DesignVersion = apps.get_model('api', 'DesignVersion')
+    newest = DesignVersion.objects.filter(design=OuterRef('pk')).order_by('-version')
+    Design.objects.update(
+        latest_version=Coalesce(Subquery(newest.values('version')[:1]), 0),
+        head=Subquery(newest.values('id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_design_blobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='design',
+            name='head',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.designversion'),
+        ),
+        migrations.AddField(
+            model_name='design',
+            name='latest_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='design',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='api_design_user_id_5ea609_idx'),
+        ),
+        migrations.RunPython(set_heads, migrations.RunPython.noop),
+    ]
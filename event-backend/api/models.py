@@ -1,6 +1,7 @@
 import uuid
 import secrets
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 
 
@@ -15,22 +16,45 @@ class Design(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="designs")
     name = models.CharField(max_length=200)
     kind = models.CharField(max_length=32, choices=KIND_CHOICES, default="custom")
+    # Newest version, maintained by api.design_store.create_version under a lock on this row
+    latest_version = models.PositiveIntegerField(default=0)
+    head = models.ForeignKey("DesignVersion", null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("user", "name")
         ordering = ["-updated_at", "-id"]
+        indexes = [models.Index(fields=["user", "-updated_at", "-id"])]
 
     def __str__(self):
         return f"{self.user_id}:{self.name}"
 
 
+class DesignBlob(models.Model):
+    """Content-addressed, compressed JSON payload shared by every version that stores it."""
+    digest = models.CharField(max_length=64, primary_key=True)  # blake2b-256 of the canonical JSON
+    payload = models.BinaryField()  # zlib-compressed canonical JSON
+    size = models.PositiveIntegerField()  # canonical JSON bytes before compression
+    stored_size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.digest
+
+
 class DesignVersion(models.Model):
-    """Immutable version snapshots for a design, storing editor JSON."""
+    """Immutable version snapshots for a design, storing editor JSON.
+
+    Each version points to a blob holding either the full JSON (keyframes) or a structural delta
+    against the previous version of its chain. Read them through api.design_store.
+    """
     design = models.ForeignKey(Design, on_delete=models.CASCADE, related_name="versions")
     version = models.PositiveIntegerField()
-    data = models.JSONField(default=dict)
+    blob = models.ForeignKey(DesignBlob, on_delete=models.PROTECT, related_name="versions")
+    keyframe_version = models.PositiveIntegerField()
+    content_hash = models.CharField(max_length=64)  # digest of the full JSON, whatever the blob holds
+    size = models.PositiveIntegerField(default=0)  # canonical bytes of the full JSON
     note = models.CharField(max_length=255, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -54,8 +78,37 @@ class TimeStamped(models.Model):
         abstract = True
 
 
+class LayoutVersioned(models.Model):
+    """Abstract base class with a counter bumped on every layout (element/booth) write.
+    Layout-derived caches (distance matrices, grids, indexes) are keyed by it."""
+    layout_version = models.PositiveIntegerField(default=0)
+    # Operation log head and the oldest sequence number still replayable (see api/layout_ops.py)
+    op_seq = models.PositiveBigIntegerField(default=0)
+    ops_compacted_seq = models.PositiveBigIntegerField(default=0)
+
+    def bump_layout_version(self):
+        from .invalidation import bump_generation
+
+        type(self).objects.filter(pk=self.pk).update(layout_version=F('layout_version') + 1)
+        self.refresh_from_db(fields=['layout_version'])
+        bump_generation(self)
+
+    class Meta:
+        abstract = True
+
+
+class RowVersioned(models.Model):
+    """Abstract base class with a per-row version for optimistic concurrency.
+    Every write increments it; conditional writes only apply if the client saw the current one
+    (see api/layout_edits.py conditional_update)."""
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        abstract = True
+
+
 # ========================================== Conference Models ==========================================
-class ConferenceEvent(TimeStamped):
+class ConferenceEvent(TimeStamped, LayoutVersioned):
     """Conference event with room layout"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="conference_events")
@@ -85,7 +138,7 @@ class ConferenceEvent(TimeStamped):
         return f"{self.name} - {self.user_id}"
 
 
-class ConferenceElement(TimeStamped):
+class ConferenceElement(TimeStamped, RowVersioned):
     """Elements in conference layout (tables, chairs, doors, outlets, etc.)"""
     ELEMENT_TYPE_CHOICES = [
         ('table_round', 'Round Table'),
@@ -99,6 +152,8 @@ class ConferenceElement(TimeStamped):
         ('tactile_paving', 'Tactile Paving'),
         ('custom', 'Custom Element'),
     ]
+    # Element types guests can be seated at
+    TABLE_TYPES = ('table_round', 'table_rectangle')
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event = models.ForeignKey(ConferenceEvent, on_delete=models.CASCADE, related_name="elements")
@@ -190,7 +245,7 @@ class ConferenceSeatAssignment(TimeStamped):
 
 
 # ========================================== Tradeshow Models ==========================================
-class TradeshowEvent(TimeStamped):
+class TradeshowEvent(TimeStamped, LayoutVersioned):
     """Tradeshow event with exhibition hall"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tradeshow_events")
@@ -222,7 +277,7 @@ class TradeshowEvent(TimeStamped):
         return f"{self.name} - {self.user_id}"
 
 
-class TradeshowBooth(TimeStamped):
+class TradeshowBooth(TimeStamped, RowVersioned):
     """Booth in tradeshow layout"""
     BOOTH_TYPE_CHOICES = [
         ('booth_standard', 'Standard Booth'),
@@ -335,6 +390,53 @@ class TradeshowRoute(TimeStamped):
         return f"{self.name} - {self.event.name}"
 
 
+# ========================================== Layout Operation Log ==========================================
+class LayoutOperation(models.Model):
+    """Abstract append-only log entry for one edit of an element/booth.
+    Entries are written in sequence order per event and trimmed by compaction."""
+    OP_CHOICES = [
+        ('add', 'Add'),
+        ('move', 'Move'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    seq = models.PositiveBigIntegerField()
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    target_id = models.UUIDField()
+    data = models.JSONField(default=dict, blank=True)
+    client_id = models.CharField(max_length=64, blank=True, default="")
+    # layout_version the batch this entry belongs to produced; lets readers detect writes made outside the log
+    layout_version = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["seq"]
+
+    def __str__(self):
+        return f"{self.event_id}#{self.seq} {self.op} {self.target_id}"
+
+
+class ConferenceLayoutOperation(LayoutOperation):
+    event = models.ForeignKey(ConferenceEvent, on_delete=models.CASCADE, related_name="layout_operations")
+
+    class Meta(LayoutOperation.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=["event", "seq"], name="unique_conference_layout_op_seq"),
+        ]
+
+
+class TradeshowLayoutOperation(LayoutOperation):
+    event = models.ForeignKey(TradeshowEvent, on_delete=models.CASCADE, related_name="layout_operations")
+
+    class Meta(LayoutOperation.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=["event", "seq"], name="unique_tradeshow_layout_op_seq"),
+        ]
+
+
 # ========================================== Schedule/Session Models ==========================================
 class EventSession(TimeStamped):
     """Session/Agenda item for events (works for both Conference and Tradeshow)"""
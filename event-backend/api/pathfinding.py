@@ -0,0 +1,290 @@
+"""
+Obstacle-aware walking paths over a tradeshow hall
+The hall is rasterized into an occupancy grid (booths, facilities and structures block; aisles,
+tactile paving, doors, waiting areas and outlets are walkable). Route legs are found with A*
+(8-connected, no corner cutting) and returned as simplified polylines in metres. Grids, leg paths
+and booth-to-booth walking distances are cached per event layout_version.
+
+Walking-distance route optimization needs one Dijkstra field per stop. Fields are large (one float
+per cell) and slow in pure Python, so they are computed in the worker pool with a time limit,
+only the booth-to-booth distances read from them are kept, and the work per request is capped.
+Route legs not yet memoised are searched the same way.
+"""
+
+import heapq
+import math
+import threading
+from collections import OrderedDict
+from itertools import product
+
+import numpy as np
+
+from .geometry import Footprints, grid_shape, rasterize
+from .layout_cache import LayoutCache
+from .models import TradeshowBooth
+from .workers import run_in_worker
+
+CELL_SIZE = 0.5          # metres per grid cell
+MAX_CELLS = 400_000      # cell size is coarsened for very large halls
+# Walking-distance route optimization runs one Dijkstra field per stop, so it is capped
+WALKING_ROUTE_MAX_STOPS = 25
+WALKING_ROUTE_MAX_WORK = 1_500_000   # grid cells x stops needing a new field (~10 s of Dijkstra)
+WALKING_ROUTE_TIMEOUT = 20           # seconds a request waits for its fields
+# Route polylines run one A* search per leg not yet memoised, in the worker pool
+WALKING_PATH_MAX_LEGS = 100
+WALKING_PATH_MAX_WORK = 20_000_000   # grid cells x legs needing a search (worst case every cell per leg)
+WALKABLE_TYPES = {'aisle', 'tactile_paving', 'door1', 'door2', 'waiting_area', 'power_outlet'}
+
+SQRT2 = math.sqrt(2)
+NEIGHBOURS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+              (-1, -1, SQRT2), (-1, 1, SQRT2), (1, -1, SQRT2), (1, 1, SQRT2)]
+
+
+class WalkGrid:
+    """Occupancy grid for one layout version, plus memoised access cells, legs and distance fields"""
+    max_memo = 512
+    max_pairs = 20_000  # ~3 MB per grid
+
+    def __init__(self, width, height, booths):
+        self.rows, self.cols, self.cell = grid_shape(width, height, CELL_SIZE, MAX_CELLS)
+        blocked = np.zeros((self.rows, self.cols), dtype=bool)
+        walkable = [b for b in booths if b.booth_type in WALKABLE_TYPES]
+        obstacles = [b for b in booths if b.booth_type not in WALKABLE_TYPES]
+        rasterize(Footprints.from_rows(obstacles), blocked, self.cell, True)
+        # Aisles are painted last so they always cut through whatever lies beneath them
+        rasterize(Footprints.from_rows(walkable), blocked, self.cell, False)
+        self.blocked = blocked
+
+        footprints = Footprints.from_rows(booths)
+        self.booth_index = {str(b.id): i for i, b in enumerate(booths)}
+        self.booth_centers = footprints.centers()
+        self.booth_bounds = footprints.bounds()
+        self._access = {}
+        self._legs = OrderedDict()
+        self._pairs = OrderedDict()  # (from booth, to booth) -> walking metres, filled by distance_matrix
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_event(cls, event):
+        booths = list(TradeshowBooth.objects.filter(event=event))
+        return cls(float(event.hall_width), float(event.hall_height), booths)
+
+    # ---------------------------------------------------------------- cells
+    def to_cell(self, x, y):
+        return (min(max(int(y / self.cell), 0), self.rows - 1),
+                min(max(int(x / self.cell), 0), self.cols - 1))
+
+    def to_point(self, cell):
+        r, c = cell
+        return [round((c + 0.5) * self.cell, 2), round((r + 0.5) * self.cell, 2)]
+
+    def access_cell(self, booth_id):
+        """Nearest walkable cell to a booth's centre - where visitors stand to visit it"""
+        if booth_id in self._access:
+            return self._access[booth_id]
+        k = self.booth_index[booth_id]
+        cx, cy = self.booth_centers[k]
+        min_x, min_y, max_x, max_y = self.booth_bounds[k]
+        margin = 2 * self.cell
+        cell = None
+        while cell is None:
+            r0, c0 = self.to_cell(min_x - margin, min_y - margin)
+            r1, c1 = self.to_cell(max_x + margin, max_y + margin)
+            free = np.argwhere(~self.blocked[r0:r1 + 1, c0:c1 + 1])
+            if len(free):
+                centres = (free[:, ::-1] + [c0, r0] + 0.5) * self.cell
+                best = free[np.argmin(((centres - (cx, cy)) ** 2).sum(axis=1))]
+                cell = (int(best[0]) + r0, int(best[1]) + c0)
+            elif r0 == 0 and c0 == 0 and r1 == self.rows - 1 and c1 == self.cols - 1:
+                cell = self.to_cell(cx, cy)  # Nothing walkable at all - fall back to the centre
+            margin *= 2
+        self._access[booth_id] = cell
+        return cell
+
+    # ---------------------------------------------------------------- legs
+    def simplify(self, cells):
+        """Keep only the cells where the walking direction changes"""
+        if len(cells) < 3:
+            return cells
+        kept = [cells[0]]
+        for prev, cur, nxt in zip(cells, cells[1:], cells[2:]):
+            if (cur[0] - prev[0], cur[1] - prev[1]) != (nxt[0] - cur[0], nxt[1] - cur[1]):
+                kept.append(cur)
+        kept.append(cells[-1])
+        return kept
+
+    def leg_result(self, from_booth, to_booth, cells, length):
+        return {
+            'from': from_booth,
+            'to': to_booth,
+            'distance': round(length * self.cell, 2) if cells else None,
+            'points': [self.to_point(cell) for cell in self.simplify(cells)] if cells else [],
+        }
+
+    def legs(self, pairs, timeout=WALKING_ROUTE_TIMEOUT):
+        """Walking legs between (from, to) booth pairs: [{'from', 'to', 'distance', 'points'}] (distance None if unreachable).
+
+        Memoised legs are reused; the missing ones are searched in the worker pool. Raises
+        ValueError if that is more work than a request may do and
+        concurrent.futures.TimeoutError if it does not finish in time.
+        """
+        with self._lock:
+            known = {key: self._legs[key] for key in pairs if key in self._legs}
+            for key in known:
+                self._legs.move_to_end(key)
+        missing = [key for key in dict.fromkeys(pairs) if key not in known]
+        if len(missing) * self.rows * self.cols > WALKING_PATH_MAX_WORK:
+            raise ValueError(
+                f'walking paths for {len(missing)} legs exceed the limit for this hall size; use a shorter route'
+            )
+        if missing:
+            searches = [(self.access_cell(a), self.access_cell(b)) for a, b in missing]
+            found = run_in_worker(search_paths, self.blocked, searches, timeout=timeout)
+            measured = {(a, b): self.leg_result(a, b, cells, length) for (a, b), (cells, length) in zip(missing, found)}
+            known.update(measured)
+            with self._lock:
+                self._legs.update(measured)
+                while len(self._legs) > self.max_memo:
+                    self._legs.popitem(last=False)
+        return [known[key] for key in pairs]
+
+    def distance_matrix(self, booth_ids, timeout=WALKING_ROUTE_TIMEOUT):
+        """All-pairs walking distances between booths.
+
+        Pairs already measured are reused; the missing rows are computed in the worker pool, one
+        distance field per source booth. Raises ValueError if that is more work than a request may
+        do and concurrent.futures.TimeoutError if it does not finish in time.
+        """
+        cells = [self.access_cell(booth_id) for booth_id in booth_ids]
+        with self._lock:
+            known = {key: self._pairs[key] for key in product(booth_ids, repeat=2) if key in self._pairs}
+            for key in known:
+                self._pairs.move_to_end(key)
+        sources = [i for i, a in enumerate(booth_ids) if any((a, b) not in known for b in booth_ids)]
+        if len(sources) * self.rows * self.cols > WALKING_ROUTE_MAX_WORK:
+            raise ValueError(
+                f'walking distances for {len(sources)} booths exceed the limit for this hall size; '
+                'use fewer booths or the straight metric'
+            )
+        if sources:
+            rows = run_in_worker(walking_rows, self.blocked, self.cell, [cells[i] for i in sources], cells,
+                                 timeout=timeout)
+            measured = {(booth_ids[i], b): distance for i, row in zip(sources, rows) for b, distance in zip(booth_ids, row)}
+            known.update(measured)
+            with self._lock:
+                self._pairs.update(measured)
+                while len(self._pairs) > self.max_pairs:
+                    self._pairs.popitem(last=False)
+        matrix = np.array([[known[(a, b)] for b in booth_ids] for a in booth_ids], dtype=float).reshape(len(booth_ids), len(booth_ids))
+        # Unreachable pairs get a large finite penalty so tour heuristics still work
+        finite = matrix[np.isfinite(matrix)]
+        penalty = (finite.max() if len(finite) else 0.0) * 10 + 1000
+        return np.minimum(np.where(np.isfinite(matrix), matrix, penalty), np.where(np.isfinite(matrix.T), matrix.T, penalty))
+
+
+def astar(blocked, start, goal):
+    """Shortest 8-connected path between two cells; returns (cells, length in cells) or (None, inf)"""
+    rows, cols = blocked.shape
+    blocked = blocked.ravel().tolist()
+    s, g = start[0] * cols + start[1], goal[0] * cols + goal[1]
+    gr, gc = goal
+
+    def h(r, c):
+        dr, dc = abs(r - gr), abs(c - gc)
+        return max(dr, dc) + (SQRT2 - 1) * min(dr, dc)
+
+    best = {s: 0.0}
+    parent = {s: -1}
+    heap = [(h(*start), 0.0, s)]
+    while heap:
+        _, dist, idx = heapq.heappop(heap)
+        if idx == g:
+            break
+        if dist > best[idx]:
+            continue
+        r, c = divmod(idx, cols)
+        for dr, dc, step in NEIGHBOURS:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            nidx = nr * cols + nc
+            if blocked[nidx] and nidx != g:
+                continue
+            if dr and dc and (blocked[r * cols + nc] or blocked[nr * cols + c]):
+                continue
+            nd = dist + step
+            if nd < best.get(nidx, math.inf):
+                best[nidx] = nd
+                parent[nidx] = idx
+                heapq.heappush(heap, (nd + h(nr, nc), nd, nidx))
+    if g not in parent:
+        return None, math.inf
+    path = []
+    idx = g
+    while idx != -1:
+        path.append(divmod(idx, cols))
+        idx = parent[idx]
+    return path[::-1], best[g]
+
+
+def search_paths(blocked, searches):
+    """A* path for each (start, goal) cell pair - runs in a worker"""
+    return [astar(blocked, start, goal) for start, goal in searches]
+
+
+def distance_field(blocked, start):
+    """Dijkstra distances (in cells) from one cell to every walkable cell; unreachable cells are inf"""
+    rows, cols = blocked.shape
+    blocked = blocked.ravel().tolist()
+    dist = [math.inf] * (rows * cols)
+    s = start[0] * cols + start[1]
+    dist[s] = 0.0
+    heap = [(0.0, s)]
+    while heap:
+        d, idx = heapq.heappop(heap)
+        if d > dist[idx]:
+            continue
+        r, c = divmod(idx, cols)
+        for dr, dc, step in NEIGHBOURS:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            nidx = nr * cols + nc
+            if blocked[nidx] or (dr and dc and (blocked[r * cols + nc] or blocked[nr * cols + c])):
+                continue
+            if d + step < dist[nidx]:
+                dist[nidx] = d + step
+                heapq.heappush(heap, (d + step, nidx))
+    return np.array(dist).reshape(rows, cols)
+
+
+def walking_rows(blocked, cell, sources, targets):
+    """Walking distances (metres) from each source cell to every target cell - runs in a worker.
+    Only these rows go back to the web process; the fields themselves are dropped."""
+    rows, cols = np.array(targets, dtype=int).reshape(-1, 2).T
+    return [(distance_field(blocked, source)[rows, cols] * cell).tolist() for source in sources]
+
+
+walk_grids = LayoutCache(maxsize=8)
+
+
+def get_walk_grid(event):
+    return walk_grids.get(event, lambda: WalkGrid.for_event(event))
+
+
+def route_paths(event, booth_order):
+    """Polyline legs for consecutive booths of a route; unknown booth ids are skipped.
+
+    Raises ValueError past WALKING_PATH_MAX_LEGS legs, see WalkGrid.legs for the other limits.
+    """
+    grid = get_walk_grid(event)
+    stops = [str(booth_id) for booth_id in booth_order if str(booth_id) in grid.booth_index]
+    if len(stops) - 1 > WALKING_PATH_MAX_LEGS:
+        raise ValueError(f'walking paths support at most {WALKING_PATH_MAX_LEGS + 1} stops')
+    legs = grid.legs(list(zip(stops, stops[1:])))
+    return {
+        'cell_size': grid.cell,
+        'legs': legs,
+        'total_distance': round(sum(leg['distance'] or 0 for leg in legs), 2),
+        'unreachable': [i for i, leg in enumerate(legs) if leg['distance'] is None],
+    }
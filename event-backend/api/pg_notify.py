@@ -0,0 +1,87 @@
+"""
+PostgreSQL LISTEN/NOTIFY plumbing shared by the cross-process backends
+(realtime broadcast and cache invalidation).
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+MAX_PAYLOAD_BYTES = 7900  # PostgreSQL rejects NOTIFY payloads from 8000 bytes
+
+
+def notify(channel, payload):
+    """NOTIFY on the current database connection; payload is JSON-encoded"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [channel, json.dumps(payload, separators=(',', ':'), default=str)])
+
+
+def payload_fits(payload):
+    return len(json.dumps(payload, separators=(',', ':'), default=str).encode()) <= MAX_PAYLOAD_BYTES
+
+
+class Listener:
+    """Background thread holding its own connection that LISTENs on one channel.
+
+    `on_message(payload)` gets each decoded payload; `on_connect()` runs after every
+    (re)connect, since notifications sent while disconnected are lost.
+    """
+
+    def __init__(self, channel, on_message, on_connect=None, name='pg-listener'):
+        self.channel = channel
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.name = name
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _connect(self):
+        import psycopg2
+
+        db = settings.DATABASES['default']
+        conn = psycopg2.connect(
+            dbname=db['NAME'], user=db.get('USER'), password=db.get('PASSWORD'),
+            host=db.get('HOST') or None, port=db.get('PORT') or None,
+        )
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.channel}')
+        return conn
+
+    def _run(self):
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                if self.on_connect is not None:
+                    self.on_connect()
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        try:
+                            payload = json.loads(notification.payload)
+                        except ValueError:
+                            continue
+                        self.on_message(payload)
+            except Exception:
+                logger.exception('%s lost its connection; reconnecting', self.name)
+                time.sleep(1)
+            finally:
+                if conn is not None:
+                    conn.close()
@@ -0,0 +1,283 @@
+"""
+Real-time layout change broadcast
+Writes publish small messages on a per-event channel after their transaction commits; every
+WebSocket/SSE connection watching that event receives them through a broker. The in-memory
+broker fans out inside one process; PostgresBroker relays through LISTEN/NOTIFY so every pod
+sees every write, and is required whenever more than one server process or replica runs.
+Connections coalesce bursts (a drag produces dozens of moves per second) into one frame per
+interval that carries only the latest state of each element.
+"""
+
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .pg_notify import Listener, notify, payload_fits
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_TYPES = ('elements', 'booths')
+NOTIFY_CHANNEL = 'clover_realtime'
+
+DEFAULTS = {
+    'BACKEND': 'api.realtime.InMemoryBroker',
+    'COALESCE_MS': 50,      # frames per connection are sent at most this often
+    'QUEUE_SIZE': 1000,     # pending messages per connection before it is told to resync
+    'HEARTBEAT_SECONDS': 20,
+}
+
+
+def get_realtime_settings():
+    return {**DEFAULTS, **getattr(settings, 'REALTIME', {})}
+
+
+def channel_name(event):
+    kind = 'conference' if event._meta.model_name == 'conferenceevent' else 'tradeshow'
+    return f'{kind}:{event.pk}'
+
+
+# ========================================== Brokers ==========================================
+class Subscription:
+    """One connection's mailbox; filled from any thread, drained by the connection's event loop"""
+
+    def __init__(self, broker, channel, loop, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, message):
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A stalled client gets one resync instead of an unbounded backlog
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+    async def get(self, timeout=None):
+        message = await asyncio.wait_for(self.queue.get(), timeout)
+        if message.get('type') == 'resync':
+            self.overflowed = False
+        return message
+
+    def get_nowait(self):
+        return self.queue.get_nowait()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """Fan-out to the subscriptions of this process"""
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, loop=None):
+        subscription = Subscription(self, channel, loop or asyncio.get_running_loop(),
+                                    get_realtime_settings()['QUEUE_SIZE'])
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._channels.get(channel, ()))
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.deliver(message)
+            except RuntimeError:
+                # The connection's loop has closed - it will unsubscribe itself
+                pass
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+
+class PostgresBroker(InMemoryBroker):
+    """Relays messages between pods with PostgreSQL LISTEN/NOTIFY.
+
+    Publishing sends a NOTIFY on the request's connection; one listener thread per process holds
+    its own connection and hands notifications to the local subscriptions (including the
+    publisher's own). Messages too large for a NOTIFY payload are replaced by a reload hint.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.listener = Listener(
+            NOTIFY_CHANNEL, lambda envelope: self.deliver(envelope['channel'], envelope['message']),
+            name='realtime-listener',
+        )
+
+    def subscribe(self, channel, loop=None):
+        self.listener.ensure_started()
+        return super().subscribe(channel, loop)
+
+    def publish(self, channel, message):
+        envelope = {'channel': channel, 'message': message}
+        if not payload_fits(envelope):
+            envelope['message'] = reload_message(message)
+        notify(NOTIFY_CHANNEL, envelope)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(get_realtime_settings()['BACKEND'])()
+        return _broker
+
+
+# ========================================== Publishing ==========================================
+def reload_message(message):
+    """Stand-in for a message that cannot be delivered in full: tells clients to refetch"""
+    return {'type': message['type'], 'layout_version': message.get('layout_version'), 'reload': True}
+
+
+def publish(event, message):
+    """Broadcast once the current transaction commits (immediately outside one)"""
+    channel = channel_name(event)
+    transaction.on_commit(lambda: _send(channel, message))
+
+
+def _send(channel, message):
+    try:
+        get_broker().publish(channel, message)
+    except Exception:
+        # Broadcast is best effort - the write itself has already committed
+        logger.exception('Failed to publish realtime message on %s', channel)
+
+
+def publish_layout(event, upserts=(), deletes=()):
+    """Element (conference) or booth (tradeshow) rows created/changed and ids deleted"""
+    kind = 'elements' if event._meta.model_name == 'conferenceevent' else 'booths'
+    publish(event, {
+        'type': kind,
+        'layout_version': event.layout_version,
+        'upserts': [dict(row) for row in upserts],
+        'deletes': [str(item_id) for item_id in deletes],
+    })
+
+
+def publish_assignments(event, upserts=(), deletes=(), reload=False):
+    """Seat (conference) or booth (tradeshow) assignments created/moved and ids deleted"""
+    message = {'type': 'assignments'}
+    if reload:
+        message['reload'] = True
+    else:
+        message.update(upserts=[dict(row) for row in upserts], deletes=[str(item_id) for item_id in deletes])
+    publish(event, message)
+
+
+def publish_checkin(event, data):
+    """A guest (conference) or vendor (tradeshow) was checked in"""
+    publish(event, {'type': 'checkin', 'data': dict(data)})
+
+
+# ========================================== Coalescing ==========================================
+class Coalescer:
+    """Merges the messages of one interval into frames.
+
+    Layout and assignment upserts keep only the latest row per id, a delete drops pending upserts
+    of that id, and a reload hint replaces everything pending of its type. Check-ins pass through
+    in order.
+    """
+
+    def __init__(self):
+        self.pending = {}   # type -> {'upserts': {id: row}, 'deletes': set(), 'reload': bool, ...}
+        self.passthrough = []
+
+    def add(self, message):
+        kind = message.get('type')
+        if kind == 'resync':
+            self.pending.clear()
+            self.passthrough = [message]
+            return
+        if kind not in (*LAYOUT_TYPES, 'assignments'):
+            self.passthrough.append(message)
+            return
+        entry = self.pending.setdefault(kind, {'upserts': {}, 'deletes': set(), 'reload': False})
+        if 'layout_version' in message:
+            entry['layout_version'] = max(entry.get('layout_version') or 0, message['layout_version'] or 0)
+        if message.get('reload'):
+            entry.update(upserts={}, deletes=set(), reload=True)
+            return
+        if entry['reload']:
+            return
+        for item_id in message.get('deletes', ()):
+            entry['upserts'].pop(item_id, None)
+            entry['deletes'].add(item_id)
+        for row in message.get('upserts', ()):
+            item_id = str(row.get('id'))
+            entry['deletes'].discard(item_id)
+            # Partial rows (pose-only updates) merge into what is already pending
+            entry['upserts'][item_id] = {**entry['upserts'].get(item_id, {}), **row}
+
+    def frames(self):
+        frames = list(self.passthrough)
+        for kind, entry in self.pending.items():
+            frame = {'type': kind}
+            if 'layout_version' in entry:
+                frame['layout_version'] = entry['layout_version']
+            if entry['reload']:
+                frame['reload'] = True
+            else:
+                frame.update(upserts=list(entry['upserts'].values()), deletes=sorted(entry['deletes']))
+            frames.append(frame)
+        self.pending.clear()
+        self.passthrough = []
+        return frames
+
+
+async def frame_stream(subscription):
+    """Async iterator of coalesced frames; yields None on heartbeat timeouts"""
+    config = get_realtime_settings()
+    interval = config['COALESCE_MS'] / 1000
+    while True:
+        try:
+            first = await subscription.get(timeout=config['HEARTBEAT_SECONDS'])
+        except asyncio.TimeoutError:
+            yield None
+            continue
+        coalescer = Coalescer()
+        coalescer.add(first)
+        deadline = asyncio.get_running_loop().time() + interval
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                coalescer.add(await subscription.get(timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        for frame in coalescer.frames():
+            yield frame
@@ -0,0 +1,170 @@
+"""
+Tradeshow route optimization for route_type "auto"
+Orders a set of booths into a short walking route: nearest-neighbour construction, then vectorized
+2-opt and Or-opt improvement over a numpy distance matrix. Distances between booth centres are
+cached per event layout_version.
+"""
+
+import numpy as np
+
+from .geometry import GEOMETRY_FIELDS, Footprints
+from .layout_cache import LayoutCache
+from .models import TradeshowBooth
+from .pathfinding import get_walk_grid
+
+EPS = 1e-7
+
+
+# ========================================== Distance matrices ==========================================
+class BoothDistances:
+    """Straight-line distances between the centres of every booth in an event"""
+
+    def __init__(self, booth_ids, centers):
+        self.index = {booth_id: i for i, booth_id in enumerate(booth_ids)}
+        self.centers = centers
+        diff = centers[:, None, :] - centers[None, :, :]
+        self.matrix = np.sqrt((diff ** 2).sum(axis=2)).astype(np.float32)
+
+    @classmethod
+    def for_event(cls, event):
+        booths = list(TradeshowBooth.objects.filter(event=event).only('id', *GEOMETRY_FIELDS))
+        return cls([str(b.id) for b in booths], Footprints.from_rows(booths).centers())
+
+    def submatrix(self, booth_ids):
+        rows = [self.index[booth_id] for booth_id in booth_ids]
+        return self.matrix[np.ix_(rows, rows)].astype(float)
+
+
+booth_distances = LayoutCache(maxsize=8)
+
+
+def get_booth_distances(event):
+    return booth_distances.get(event, lambda: BoothDistances.for_event(event))
+
+
+# ========================================== Tour construction / improvement ==========================================
+def nearest_neighbor(dist, start=0):
+    n = len(dist)
+    tour = [start]
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[tour[-1]])
+        nxt = int(np.argmin(row))
+        tour.append(nxt)
+        visited[nxt] = True
+    return np.array(tour)
+
+
+def two_opt(dist, tour, max_rounds=200):
+    """Closed-tour 2-opt. Each round scores every edge pair at once and applies the best disjoint reversals."""
+    m = len(tour)
+    if m < 4:
+        return tour
+    idx = np.arange(m)
+    valid = (idx[None, :] > idx[:, None] + 1)
+    valid[0, m - 1] = False
+    for _ in range(max_rounds):
+        nxt = np.roll(tour, -1)
+        own = dist[tour, nxt]
+        gain = own[:, None] + own[None, :] - dist[np.ix_(tour, tour)] - dist[np.ix_(nxt, nxt)]
+        gain = np.where(valid, gain, 0.0)
+        candidates = np.argwhere(gain > EPS)
+        if not len(candidates):
+            break
+        order = np.argsort(-gain[candidates[:, 0], candidates[:, 1]])
+        taken = np.zeros(m, dtype=bool)
+        for i, j in candidates[order]:
+            # Moves touching disjoint position ranges stay valid after each other is applied
+            if taken[i:j + 2].any():
+                continue
+            tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+            taken[i:j + 2] = True
+    return tour
+
+
+def or_opt(dist, tour, max_passes=3):
+    """Closed-tour Or-opt: relocate segments of 1-3 stops (optionally reversed) to their cheapest slot"""
+    m = len(tour)
+    if m < 5:
+        return tour
+    for _ in range(max_passes):
+        improved = False
+        for length in (1, 2, 3):
+            for i in range(m):
+                # Rotate so the segment sits at the end: rest = q ... p, segment = s0 ... se
+                rotated = np.roll(tour, -(i + length))
+                rest, segment = rotated[:m - length], rotated[m - length:]
+                s0, se, p, q = segment[0], segment[-1], rest[-1], rest[0]
+                removal = dist[p, s0] + dist[se, q] - dist[p, q]
+                a, b = rest[:-1], rest[1:]
+                base = dist[a, b]
+                forward = dist[a, s0] + dist[se, b] - base
+                backward = dist[a, se] + dist[s0, b] - base
+                k_f, k_b = int(np.argmin(forward)), int(np.argmin(backward))
+                if forward[k_f] <= backward[k_b]:
+                    k, insert_cost, piece = k_f, forward[k_f], segment
+                else:
+                    k, insert_cost, piece = k_b, backward[k_b], segment[::-1]
+                if removal - insert_cost > EPS:
+                    tour = np.concatenate([rest[:k + 1], piece, rest[k + 1:]])
+                    improved = True
+        if not improved:
+            break
+    return tour
+
+
+def optimize_order(dist, start=None):
+    """Near-optimal open walking order over a distance matrix.
+
+    A dummy node closes the path into a tour (zero distance to every stop, or to `start` only when the
+    first stop is fixed), so the closed-tour heuristics apply unchanged. Returns (order, length).
+    """
+    n = len(dist)
+    if n <= 2:
+        order = list(range(n)) if start in (None, 0) else [start] + [i for i in range(n) if i != start]
+        return order, float(sum(dist[a, b] for a, b in zip(order, order[1:])))
+
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = dist
+    if start is not None:
+        penalty = dist.max() * 2 + 1
+        padded[n, :n] = penalty
+        padded[:n, n] = penalty
+        padded[n, start] = padded[start, n] = 0.0
+
+    tour = nearest_neighbor(padded, start=n)
+    tour = two_opt(padded, tour)
+    tour = or_opt(padded, tour)
+    tour = two_opt(padded, tour)
+
+    cut = int(np.where(tour == n)[0][0])
+    path = np.concatenate([tour[cut + 1:], tour[:cut]])
+    if start is not None and path[0] != start:
+        path = path[::-1]
+    return path.tolist(), float(dist[path[:-1], path[1:]].sum())
+
+
+def optimize_booth_route(event, booth_ids, start=None, metric='straight'):
+    """Order booth ids (strings) for an event; returns (booth_order, length).
+
+    Raises ValueError naming any id that is not a booth of the event (unknown or deleted), so a
+    saved route never silently loses stops. metric='walking' uses obstacle-aware distances from
+    the hall grid instead of straight lines.
+    """
+    if not isinstance(booth_ids, list):
+        raise ValueError('booth_order must be a list of booth ids')
+    distances = get_booth_distances(event)
+    booth_ids = list(dict.fromkeys(map(str, booth_ids)))
+    unknown = [booth_id for booth_id in booth_ids if booth_id not in distances.index]
+    if unknown:
+        raise ValueError(f"unknown booth ids: {', '.join(unknown)}")
+    if start is not None and str(start) not in booth_ids:
+        raise ValueError('start must be one of the booth ids')
+    start_index = booth_ids.index(str(start)) if start is not None else None
+    if metric == 'walking':
+        matrix = get_walk_grid(event).distance_matrix(booth_ids)
+    else:
+        matrix = distances.submatrix(booth_ids)
+    order, length = optimize_order(matrix, start=start_index)
+    return [booth_ids[i] for i in order], length
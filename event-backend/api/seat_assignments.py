@@ -0,0 +1,195 @@
+"""
+Batched seat assignment changes
+Validates creates/moves/deletes in memory against one prefetch of the event's seating state,
+then applies them with a constant number of queries.
+"""
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import ConferenceElement, ConferenceEvent, ConferenceGuest, ConferenceSeatAssignment
+from .utils import parse_uuid
+
+# Reported when a write outside the batch took a seat or guest between planning and applying
+CONCURRENT_CONFLICT = {'op': None, 'index': None, 'errors': ['seat assignments changed concurrently, reload and retry']}
+
+
+def parse_seat_number(value):
+    """Return (seat_number, error) - seat numbers are optional, 1-based integers"""
+    if value in (None, ''):
+        return None, None
+    try:
+        return int(value), None
+    except (TypeError, ValueError):
+        return None, 'seat_number must be an integer'
+
+
+def lock_seating(event):
+    """Serialise seat assignment writers of one event - call inside a transaction.
+
+    FOR NO KEY UPDATE, so inserts referencing the event from other transactions do not wait.
+    """
+    list(ConferenceEvent.objects.select_for_update(no_key=True).filter(pk=event.pk).values_list('pk'))
+
+
+def seat_occupants(event):
+    """{(element_id, seat_number): guest_id} for every numbered seat assignment in an event"""
+    rows = (ConferenceSeatAssignment.objects.filter(event=event, seat_number__isnull=False)
+            .values_list('element_id', 'seat_number', 'guest_id'))
+    return {(str(element_id), seat_number): str(guest_id) for element_id, seat_number, guest_id in rows}
+
+
+class SeatAssignmentBatch:
+    """In-memory view of an event's seat assignments used to validate a batch of changes.
+
+    Mirrors the `unique_guest_per_event` / `unique_seat_per_element_event` constraints
+    and the `seat_number <= element.seats` capacity rule.
+    """
+
+    def __init__(self, event, guest_ids=()):
+        self.event = event
+        self.elements = {e.id: e for e in ConferenceElement.objects.filter(event=event)}
+        self.guests = {
+            g.id: g for g in ConferenceGuest.objects.filter(event=event, id__in=set(guest_ids))
+        }
+        self.assignments = {
+            a.id: a for a in ConferenceSeatAssignment.objects.filter(event=event).select_related('guest')
+        }
+        self.guest_taken = {a.guest_id: a.id for a in self.assignments.values()}
+        self.seat_taken = {
+            (a.element_id, a.seat_number): a.id
+            for a in self.assignments.values() if a.seat_number is not None
+        }
+
+    # ---------------------------------------------------------------- state helpers
+    def release(self, assignment):
+        if self.guest_taken.get(assignment.guest_id) == assignment.id:
+            del self.guest_taken[assignment.guest_id]
+        key = (assignment.element_id, assignment.seat_number)
+        if self.seat_taken.get(key) == assignment.id:
+            del self.seat_taken[key]
+
+    def claim(self, assignment):
+        self.guest_taken[assignment.guest_id] = assignment.id
+        if assignment.seat_number is not None:
+            self.seat_taken[(assignment.element_id, assignment.seat_number)] = assignment.id
+
+    def seat_errors(self, element_id, seat_number):
+        errors = []
+        element = self.elements.get(element_id)
+        if element is None:
+            return ['element not found in this event']
+        if seat_number is not None:
+            if seat_number < 1 or seat_number > element.seats:
+                errors.append(f'seat_number must be between 1 and {element.seats} for {element.label}')
+            if (element_id, seat_number) in self.seat_taken:
+                errors.append(f'seat {seat_number} at {element.label} is already taken')
+        return errors
+
+    # ---------------------------------------------------------------- planning
+    def plan(self, creates=(), moves=(), deletes=()):
+        """Validate a batch; returns (plan, conflicts).
+
+        Deletes are applied first, then every moved assignment releases its seat before
+        any is re-placed (so swaps within one batch succeed), then creates.
+        """
+        conflicts = []
+        to_delete = []
+        for index, raw_id in enumerate(deletes):
+            assignment = self.assignments.get(parse_uuid(raw_id))
+            if assignment is None:
+                conflicts.append({'op': 'delete', 'index': index, 'errors': ['assignment not found']})
+                continue
+            self.release(assignment)
+            to_delete.append(assignment)
+
+        deleted_ids = {a.id for a in to_delete}
+        pending_moves = []
+        for index, item in enumerate(moves):
+            assignment = self.assignments.get(parse_uuid(item.get('id')))
+            if assignment is None or assignment.id in deleted_ids:
+                conflicts.append({'op': 'move', 'index': index, 'errors': ['assignment not found']})
+                continue
+            self.release(assignment)
+            pending_moves.append((index, item, assignment))
+
+        to_move = []
+        for index, item, assignment in pending_moves:
+            element_id = parse_uuid(item['element']) if 'element' in item else assignment.element_id
+            seat_number, error = (
+                parse_seat_number(item['seat_number']) if 'seat_number' in item
+                else (assignment.seat_number, None)
+            )
+            errors = [error] if error else self.seat_errors(element_id, seat_number)
+            if errors:
+                conflicts.append({'op': 'move', 'index': index, 'errors': errors})
+                self.claim(assignment)
+                continue
+            assignment.element = self.elements[element_id]
+            assignment.seat_number = seat_number
+            self.claim(assignment)
+            to_move.append(assignment)
+
+        to_create = []
+        for index, item in enumerate(creates):
+            guest_id = parse_uuid(item.get('guest'))
+            element_id = parse_uuid(item.get('element'))
+            seat_number, error = parse_seat_number(item.get('seat_number'))
+            errors = [error] if error else []
+            if guest_id not in self.guests:
+                errors.append('guest not found in this event')
+            elif guest_id in self.guest_taken:
+                errors.append(f'{self.guests[guest_id].name} already has a seat assignment')
+            errors.extend(self.seat_errors(element_id, seat_number))
+            if errors:
+                conflicts.append({'op': 'create', 'index': index, 'errors': errors})
+                continue
+            assignment = ConferenceSeatAssignment(
+                event=self.event,
+                guest=self.guests[guest_id],
+                element=self.elements[element_id],
+                seat_number=seat_number,
+            )
+            self.claim(assignment)
+            to_create.append(assignment)
+
+        return {'create': to_create, 'move': to_move, 'delete': to_delete}, conflicts
+
+    # ---------------------------------------------------------------- persistence
+    @classmethod
+    def write(cls, event, guest_ids=(), creates=(), moves=(), deletes=()):
+        """Plan and apply a batch in one transaction under the event's seating lock; returns (plan, conflicts).
+
+        The seating state is read only after the lock is held, so concurrent batches of an
+        event never plan against the same snapshot. A unique constraint tripped by a writer
+        outside the lock is reported as a conflict and nothing is written.
+        """
+        try:
+            with transaction.atomic():
+                lock_seating(event)
+                plan, conflicts = cls(event, guest_ids=guest_ids).plan(creates=creates, moves=moves, deletes=deletes)
+                if not conflicts:
+                    cls.apply(plan)
+                return plan, conflicts
+        except IntegrityError:
+            return None, [CONCURRENT_CONFLICT]
+
+    @staticmethod
+    def apply(plan):
+        """Write a validated plan in one transaction"""
+        now = timezone.now()
+        with transaction.atomic():
+            if plan['delete']:
+                ConferenceSeatAssignment.objects.filter(id__in=[a.id for a in plan['delete']]).delete()
+            if plan['move']:
+                # Clear seat numbers first so swaps never trip the unique seat constraint mid-update
+                ConferenceSeatAssignment.objects.filter(
+                    id__in=[a.id for a in plan['move']]
+                ).update(seat_number=None)
+                for assignment in plan['move']:
+                    assignment.updated_at = now
+                ConferenceSeatAssignment.objects.bulk_update(
+                    plan['move'], ['element', 'seat_number', 'updated_at']
+                )
+            if plan['create']:
+                ConferenceSeatAssignment.objects.bulk_create(plan['create'])
@@ -0,0 +1,104 @@
+"""
+Per-seat coordinates for conference layouts
+Seats follow the planner canvas: round tables seat guests evenly around the rim starting at the
+top (12 o'clock, clockwise), rectangle tables fill the top side then the bottom side, and a chair
+is a single seat at its own centre. Seat centres sit SEAT_OFFSET outside the table edge, and
+`rotation` is the chair's canvas rotation (0 = above the table, facing down onto it).
+All seats of an event are computed in one vectorized pass and cached per layout_version.
+"""
+
+import numpy as np
+
+from .geometry import Footprints
+from .layout_cache import LayoutCache
+from .models import ConferenceElement
+
+SEAT_OFFSET = 0.375  # metres from table edge to seat centre (15px at 40px/m on the canvas)
+SEATED_TYPES = (*ConferenceElement.TABLE_TYPES, 'chair')
+
+
+class SeatMap:
+    """Struct-of-arrays of every seat in a layout, in (element, seat_number) order"""
+
+    def __init__(self, rows):
+        rows = [r for r in rows if r.element_type in SEATED_TYPES and (r.seats or 0) > 0]
+        footprints = Footprints.from_rows(rows)
+        kinds = np.array([r.element_type for r in rows], dtype=object)
+        counts = np.array([1 if r.element_type == 'chair' else r.seats for r in rows], dtype=int)
+
+        owner = np.repeat(np.arange(len(rows)), counts)
+        number = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        n = counts[owner].astype(float)
+        w, h = footprints.w[owner], footprints.h[owner]
+
+        # Round tables: ellipse through the rim pushed out by SEAT_OFFSET, angle 0 at the top
+        angle = number / np.maximum(n, 1) * 2 * np.pi - np.pi / 2
+        round_u = w / 2 + (w / 2 + SEAT_OFFSET) * np.cos(angle)
+        round_v = h / 2 + (h / 2 + SEAT_OFFSET) * np.sin(angle)
+        round_facing = np.degrees(angle) + 90
+
+        # Rectangle tables: floor(n/2) seats on top, the rest on the bottom, evenly spaced along the width
+        top = number < n // 2
+        per_side = np.ceil(n / 2)
+        slot = np.where(top, number, number - n // 2)
+        rect_u = w / (per_side + 1) * (slot + 1)
+        rect_v = np.where(top, -SEAT_OFFSET, h + SEAT_OFFSET)
+        rect_facing = np.where(top, 0.0, 180.0)
+
+        kind = kinds[owner] if len(owner) else np.empty(0, dtype=object)
+        is_round = kind == 'table_round'
+        is_rect = kind == 'table_rectangle'
+        u = np.where(is_round, round_u, np.where(is_rect, rect_u, w / 2))
+        v = np.where(is_round, round_v, np.where(is_rect, rect_v, h / 2))
+        facing = np.where(is_round, round_facing, np.where(is_rect, rect_facing, 0.0))
+
+        theta = footprints.theta[owner]
+        cos, sin = np.cos(theta), np.sin(theta)
+        self.x = footprints.x[owner] + u * cos - v * sin
+        self.y = footprints.y[owner] + u * sin + v * cos
+        self.rotation = (np.degrees(theta) + facing) % 360
+        self.element_ids = [str(rows[k].id) for k in owner]
+        self.seat_numbers = number + 1
+        self._position = {(eid, int(s)): i for i, (eid, s) in enumerate(zip(self.element_ids, self.seat_numbers))}
+
+    @classmethod
+    def for_event(cls, event):
+        return cls(ConferenceElement.objects.filter(event=event, element_type__in=SEATED_TYPES))
+
+    def __len__(self):
+        return len(self.element_ids)
+
+    def position(self, element_id, seat_number):
+        """(x, y) of one seat, or None"""
+        i = self._position.get((str(element_id), int(seat_number)))
+        return None if i is None else (float(self.x[i]), float(self.y[i]))
+
+    def seat(self, i):
+        return {
+            'element_id': self.element_ids[i],
+            'seat_number': int(self.seat_numbers[i]),
+            'x': round(float(self.x[i]), 3),
+            'y': round(float(self.y[i]), 3),
+            'rotation': round(float(self.rotation[i]), 1),
+        }
+
+    def as_list(self):
+        return [self.seat(i) for i in range(len(self))]
+
+    def nearest(self, x, y, k=1, exclude=()):
+        """Up to k (seat index, distance) pairs closest to (x, y), skipping (element_id, seat_number) in exclude"""
+        if not len(self):
+            return []
+        distances = np.hypot(self.x - x, self.y - y)
+        if exclude:
+            skip = [self._position[key] for key in exclude if key in self._position]
+            distances[skip] = np.inf
+        order = np.argsort(distances, kind='stable')[:k]
+        return [(int(i), float(distances[i])) for i in order if np.isfinite(distances[i])]
+
+
+seat_maps = LayoutCache(maxsize=16)
+
+
+def get_seat_map(event):
+    return seat_maps.get(event, lambda: SeatMap.for_event(event))
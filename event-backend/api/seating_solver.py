@@ -0,0 +1,216 @@
+"""
+Automatic seating solver for conference events
+Pure-python (no ORM) so it can run inside a process pool. Guests are placed on tables by
+worst-fit-decreasing over group units (keeps groups together, balances fill), refined by a
+swap-based local search that consolidates split groups, then given seat numbers.
+"""
+
+import heapq
+import random
+from collections import Counter, defaultdict
+
+from .workers import map_in_workers
+
+# Problems smaller than this are solved inline - pool start-up would cost more than the solve
+POOL_THRESHOLD = 2000
+
+
+# ========================================== Problem / Solution ==========================================
+def build_units(guests, max_table):
+    """Split unseated guests into placement units: one per group (chunked to max table size) plus singletons"""
+    by_group = defaultdict(list)
+    units = []
+    for guest_id, group_id in guests:
+        if group_id is None:
+            units.append((None, [guest_id]))
+        else:
+            by_group[group_id].append(guest_id)
+    for group_id, members in by_group.items():
+        for start in range(0, len(members), max_table):
+            units.append((group_id, members[start:start + max_table]))
+    return units
+
+
+def split_cost(table_of, group_of):
+    """Number of extra tables each group is spread over, summed over groups"""
+    tables_per_group = defaultdict(set)
+    for guest_id, table_id in table_of.items():
+        group_id = group_of.get(guest_id)
+        if group_id is not None:
+            tables_per_group[group_id].add(table_id)
+    return sum(len(tables) - 1 for tables in tables_per_group.values())
+
+
+def place_units(units, free, affinity, rng):
+    """Worst-fit decreasing: each unit goes to the emptiest table that holds it whole.
+
+    `affinity[group]` lists tables already used by that group (e.g. pinned members) - those win if they fit.
+    Units that fit nowhere whole are spread over the emptiest tables.
+    """
+    table_of = {}
+    heap = [(-capacity, rng.random(), table_id) for table_id, capacity in free.items() if capacity > 0]
+    heapq.heapify(heap)
+
+    rng.shuffle(units)
+    units.sort(key=lambda unit: len(unit[1]), reverse=True)
+    for group_id, members in units:
+        pending = list(members)
+        for table_id in affinity.get(group_id, ()):
+            if free[table_id] >= len(pending):
+                for guest_id in pending:
+                    table_of[guest_id] = table_id
+                free[table_id] -= len(pending)
+                pending = []
+                break
+        while pending and heap:
+            neg_capacity, tie, table_id = heapq.heappop(heap)
+            if -neg_capacity != free[table_id]:
+                # Stale entry - capacity changed via affinity placement
+                if free[table_id] > 0:
+                    heapq.heappush(heap, (-free[table_id], tie, table_id))
+                continue
+            take = pending[:free[table_id]]
+            pending = pending[len(take):]
+            for guest_id in take:
+                table_of[guest_id] = table_id
+            free[table_id] -= len(take)
+            if group_id is not None:
+                affinity.setdefault(group_id, []).append(table_id)
+            if free[table_id] > 0:
+                heapq.heappush(heap, (-free[table_id], tie, table_id))
+        # Anything still pending is left unseated - the room is out of seats
+    return table_of
+
+
+def consolidate(table_of, group_of, pinned, free, max_rounds=3):
+    """Local search: pull split-group members to their group's main table by free-seat moves or swaps"""
+    count = defaultdict(Counter)  # group -> table -> members seated there
+    seated_at = defaultdict(set)  # table -> movable guests
+    for guest_id, table_id in table_of.items():
+        group_id = group_of.get(guest_id)
+        if group_id is not None:
+            count[group_id][table_id] += 1
+        if guest_id not in pinned:
+            seated_at[table_id].add(guest_id)
+
+    def swap_gain(guest_id, src, dst):
+        group_id = group_of.get(guest_id)
+        if group_id is None:
+            return 0
+        # Reduction in member pairs sat at different tables
+        return count[group_id][dst] - count[group_id][src] + 1
+
+    def move(guest_id, src, dst):
+        group_id = group_of.get(guest_id)
+        if group_id is not None:
+            count[group_id][src] -= 1
+            if not count[group_id][src]:
+                del count[group_id][src]
+            count[group_id][dst] += 1
+        seated_at[src].discard(guest_id)
+        seated_at[dst].add(guest_id)
+        table_of[guest_id] = dst
+
+    for _ in range(max_rounds):
+        improved = False
+        for group_id in list(count):
+            tables = count[group_id]
+            if len(tables) < 2:
+                continue
+            home = max(tables, key=tables.get)
+            for guest_id in [g for t in list(tables) if t != home for g in seated_at[t] if group_of.get(g) == group_id]:
+                src = table_of[guest_id]
+                if free.get(home, 0) > 0:
+                    if swap_gain(guest_id, src, home) > 0:
+                        move(guest_id, src, home)
+                        free[home] -= 1
+                        free[src] += 1
+                        improved = True
+                    continue
+                for other in list(seated_at[home]):
+                    if group_of.get(other) == group_id:
+                        continue
+                    gain = swap_gain(guest_id, src, home) + swap_gain(other, home, src)
+                    if gain > 0:
+                        move(guest_id, src, home)
+                        move(other, home, src)
+                        improved = True
+                        break
+        if not improved:
+            break
+    return table_of
+
+
+def number_seats(table_of, group_of, capacities, taken_seats):
+    """Give every placed guest a free 1-based seat number, group members side by side"""
+    by_table = defaultdict(list)
+    for guest_id, table_id in table_of.items():
+        by_table[table_id].append(guest_id)
+    seats = {}
+    for table_id, guest_ids in by_table.items():
+        guest_ids.sort(key=lambda g: (str(group_of.get(g) or ''), str(g)))
+        taken = taken_seats.get(table_id, set())
+        free_numbers = (n for n in range(1, capacities[table_id] + 1) if n not in taken)
+        for guest_id in guest_ids:
+            seats[guest_id] = next(free_numbers)
+    return seats
+
+
+def solve(problem, seed=0):
+    """Solve one randomized restart.
+
+    problem = {
+        'tables': [(table_id, capacity)],
+        'guests': [(guest_id, group_id)],            # guests to place
+        'pinned': {guest_id: (table_id, seat_number)},
+        'groups': {guest_id: group_id},              # group of every guest incl. pinned
+    }
+    Returns {'cost', 'assignments': {guest_id: (table_id, seat_number)}, 'unseated': [guest_id]}
+    """
+    rng = random.Random(seed)
+    capacities = dict(problem['tables'])
+    group_of = problem['groups']
+    pinned = problem['pinned']
+
+    free = dict(capacities)
+    taken_seats = defaultdict(set)
+    affinity = defaultdict(list)
+    for guest_id, (table_id, seat_number) in pinned.items():
+        if table_id in free:
+            free[table_id] -= 1
+            if seat_number is not None:
+                taken_seats[table_id].add(seat_number)
+        group_id = group_of.get(guest_id)
+        if group_id is not None and table_id in free and table_id not in affinity[group_id]:
+            affinity[group_id].append(table_id)
+
+    max_table = max(capacities.values(), default=1) or 1
+    units = build_units(problem['guests'], max_table)
+    table_of = place_units(units, free, affinity, rng)
+
+    combined = {guest_id: table_id for guest_id, (table_id, _) in pinned.items()}
+    combined.update(table_of)
+    consolidate(combined, group_of, set(pinned), free)
+    table_of = {g: t for g, t in combined.items() if g not in pinned}
+
+    seats = number_seats(table_of, group_of, capacities, taken_seats)
+    fill = [(capacities[t] - free[t]) / capacities[t] for t in capacities if capacities[t]]
+    mean = sum(fill) / len(fill) if fill else 0
+    imbalance = sum((f - mean) ** 2 for f in fill) / len(fill) if fill else 0
+    unseated = [guest_id for guest_id, _ in problem['guests'] if guest_id not in table_of]
+    return {
+        'cost': split_cost(combined, group_of) * 10 + imbalance + len(unseated) * 100,
+        'assignments': {g: (t, seats[g]) for g, t in table_of.items()},
+        'unseated': unseated,
+        'split_groups': split_cost(combined, group_of),
+        'imbalance': imbalance,
+    }
+
+
+def solve_best(problem, restarts=4):
+    """Run several randomized restarts (in the process pool for large events) and keep the cheapest"""
+    if len(problem['guests']) < POOL_THRESHOLD:
+        results = [solve(problem, seed) for seed in range(restarts)]
+    else:
+        results = map_in_workers(solve, [problem] * restarts, range(restarts))
+    return min(results, key=lambda result: result['cost'])
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from .design_store import snapshot
 from .models import (
     Design, DesignVersion,
     ConferenceEvent, ConferenceElement, ConferenceGroup,
@@ -23,11 +24,17 @@ class DesignSerializer(serializers.ModelSerializer):
 
 
 class DesignVersionSerializer(serializers.ModelSerializer):
+    # Versions may be stored as deltas - always expose the reconstructed JSON
+    data = serializers.SerializerMethodField()
+
     class Meta:
         model = DesignVersion
         fields = ['version', 'data', 'note', 'created_at']
         read_only_fields = ['version', 'created_at']
 
+    def get_data(self, obj):
+        return snapshot(obj)
+
 
 # ========================================== Conference Serializers ==========================================
 class ConferenceEventSerializer(serializers.ModelSerializer):
@@ -36,9 +43,9 @@ class ConferenceEventSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'description', 'event_date',
             'room_width', 'room_height', 'is_public',
-            'share_token', 'metadata', 'created_at', 'updated_at'
+            'share_token', 'metadata', 'layout_version', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'share_token', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'share_token', 'layout_version', 'created_at', 'updated_at']
 
 
 class ConferenceEventListSerializer(serializers.ModelSerializer):
@@ -62,9 +69,9 @@ class ConferenceElementSerializer(serializers.ModelSerializer):
             'position_x', 'position_y', 'width', 'height',
             'rotation', 'scale_x', 'scale_y',
             'door_width', 'door_swing', 'outlet_type',
-            'created_at', 'updated_at'
+            'version', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'version', 'created_at', 'updated_at']
 
 
 class ConferenceGroupSerializer(serializers.ModelSerializer):
@@ -124,9 +131,9 @@ class TradeshowEventSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'description', 'event_date_start', 'event_date_end',
             'hall_width', 'hall_height', 'preset_layout', 'is_public',
-            'share_token', 'metadata', 'created_at', 'updated_at'
+            'share_token', 'metadata', 'layout_version', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'share_token', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'share_token', 'layout_version', 'created_at', 'updated_at']
 
 
 class TradeshowEventListSerializer(serializers.ModelSerializer):
@@ -149,9 +156,9 @@ class TradeshowBoothSerializer(serializers.ModelSerializer):
             'id', 'event', 'booth_type', 'category', 'label',
             'position_x', 'position_y', 'width', 'height',
             'rotation', 'scale_x', 'scale_y',
-            'created_at', 'updated_at'
+            'version', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'version', 'created_at', 'updated_at']
 
 
 class TradeshowVendorSerializer(serializers.ModelSerializer):
@@ -0,0 +1,197 @@
+"""
+Event-scoped spatial indexes for viewport and nearest-element queries
+Each layout gets a uniform grid over item bounding boxes. Indexes are cached per event
+layout_version; single and bulk writes patch the cached index in place and re-tag it with the
+new version, so only cold starts and missed writes (other processes) trigger a full rebuild.
+"""
+
+import math
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from .geometry import GEOMETRY_FIELDS, Footprints
+from .layout_cache import LayoutCache
+from .models import ConferenceElement, TradeshowBooth
+
+MIN_CELL_SIZE = 1.0  # metres
+# Items covering more grid cells than this are kept in a side set that every query scans,
+# so one hall-sized item cannot fill millions of buckets
+MAX_CELLS_PER_ITEM = 64
+
+
+def parse_bbox(value):
+    """'min_x,min_y,max_x,max_y' -> tuple of floats; raises ValueError"""
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4 or not all(map(math.isfinite, parts)) or parts[0] > parts[2] or parts[1] > parts[3]:
+        raise ValueError('bbox must be min_x,min_y,max_x,max_y')
+    return tuple(parts)
+
+
+def parse_point(params):
+    """Finite (x, y) from query params; raises KeyError if missing, ValueError if not numbers"""
+    x, y = float(params['x']), float(params['y'])
+    if not (math.isfinite(x) and math.isfinite(y)):
+        raise ValueError('x and y must be finite')
+    return x, y
+
+
+class SpatialIndex:
+    """Uniform grid of item ids keyed by the cells their bounding boxes cover, plus oversized items"""
+
+    def __init__(self, rows, type_field, cell_size=None):
+        rows = list(rows)
+        self.type_field = type_field
+        footprints = Footprints.from_rows(rows)
+        bounds = footprints.bounds()
+        if cell_size is None:
+            extents = (bounds[:, 2:] - bounds[:, :2]).max(axis=1) if len(rows) else np.ones(1)
+            cell_size = float(np.median(extents)) * 4
+        self.cell_size = max(cell_size, MIN_CELL_SIZE)
+        self.cells = defaultdict(set)
+        self.large = set()
+        self.items = {}  # id -> (type, (x, y, w, h, theta), bounds)
+        self.extent = [np.inf, np.inf, -np.inf, -np.inf]  # grows only; an upper bound for searches
+        self._lock = threading.RLock()
+        for k, row in enumerate(rows):
+            geometry = (footprints.x[k], footprints.y[k], footprints.w[k], footprints.h[k], footprints.theta[k])
+            self._add(str(row['id']), row[type_field], geometry, tuple(bounds[k]))
+
+    def __len__(self):
+        return len(self.items)
+
+    def _cell_range(self, bounds):
+        return tuple(int(math.floor(v / self.cell_size)) for v in bounds)
+
+    def _cell_keys(self, bounds):
+        c0, r0, c1, r1 = self._cell_range(bounds)
+        return [(c, r) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+
+    def _is_large(self, bounds):
+        c0, r0, c1, r1 = self._cell_range(bounds)
+        return (c1 - c0 + 1) * (r1 - r0 + 1) > MAX_CELLS_PER_ITEM
+
+    def _add(self, item_id, item_type, geometry, bounds):
+        self.items[item_id] = (item_type, geometry, bounds)
+        self.extent = [min(self.extent[0], bounds[0]), min(self.extent[1], bounds[1]),
+                       max(self.extent[2], bounds[2]), max(self.extent[3], bounds[3])]
+        if self._is_large(bounds):
+            self.large.add(item_id)
+            return
+        for key in self._cell_keys(bounds):
+            self.cells[key].add(item_id)
+
+    def _discard(self, item_id):
+        entry = self.items.pop(item_id, None)
+        if entry is None:
+            return
+        if item_id in self.large:
+            self.large.discard(item_id)
+            return
+        for key in self._cell_keys(entry[2]):
+            bucket = self.cells.get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self.cells[key]
+
+    # ---------------------------------------------------------------- writes
+    def upsert(self, rows):
+        """Insert or move items given as dicts/instances with id, type and geometry"""
+        rows = list(rows)
+        footprints = Footprints.from_rows(rows)
+        bounds = footprints.bounds()
+        with self._lock:
+            for k, row in enumerate(rows):
+                item_id = str(row['id'] if isinstance(row, dict) else row.id)
+                item_type = row[self.type_field] if isinstance(row, dict) else getattr(row, self.type_field)
+                self._discard(item_id)
+                geometry = (footprints.x[k], footprints.y[k], footprints.w[k], footprints.h[k], footprints.theta[k])
+                self._add(item_id, item_type, geometry, tuple(bounds[k]))
+
+    def remove(self, item_ids):
+        with self._lock:
+            for item_id in item_ids:
+                self._discard(str(item_id))
+
+    # ---------------------------------------------------------------- queries
+    def query(self, bbox):
+        """Ids of items whose bounding boxes intersect bbox (min_x, min_y, max_x, max_y)"""
+        min_x, min_y, max_x, max_y = bbox
+        with self._lock:
+            c0, r0, c1, r1 = self._cell_range(bbox)
+            if (c1 - c0 + 1) * (r1 - r0 + 1) > len(self.cells):
+                # Window wider than the occupied grid - scanning the buckets is cheaper
+                candidates = [item_id for bucket in self.cells.values() for item_id in bucket]
+            else:
+                candidates = [item_id for key in self._cell_keys(bbox) for item_id in self.cells.get(key, ())]
+            candidates.extend(self.large)
+            found = set()
+            for item_id in candidates:
+                b = self.items[item_id][2]
+                if b[0] <= max_x and b[2] >= min_x and b[1] <= max_y and b[3] >= min_y:
+                    found.add(item_id)
+        return found
+
+    def nearest(self, x, y, k=1, types=None):
+        """Up to k (id, distance) pairs closest to (x, y), measured to the rotated footprint.
+
+        Searches a growing window around the point until k items lie within its radius.
+        """
+        with self._lock:
+            if not self.items:
+                return []
+            min_x, min_y, max_x, max_y = self.extent
+            limit = max(abs(x - min_x), abs(x - max_x), abs(y - min_y), abs(y - max_y), self.cell_size)
+            radius = self.cell_size
+            while True:
+                ids = [i for i in self.query((x - radius, y - radius, x + radius, y + radius))
+                       if types is None or self.items[i][0] in types]
+                found = []
+                if ids:
+                    geometry = np.array([self.items[i][1] for i in ids]).T
+                    distances = Footprints(*geometry).distance_to(x, y)
+                    found = [(ids[j], float(distances[j])) for j in np.argsort(distances, kind='stable')[:k]]
+                # Anything farther than `radius` might be beaten by an item outside the window
+                if (len(found) == k and found[-1][1] <= radius) or radius >= limit:
+                    return found
+                radius *= 2
+
+
+class SpatialIndexCache(LayoutCache):
+    """LayoutCache of SpatialIndex per event that follows writes incrementally"""
+
+    def __init__(self, model, type_field, maxsize=16):
+        super().__init__(maxsize=maxsize)
+        self.model = model
+        self.type_field = type_field
+        self._write_lock = threading.Lock()
+
+    def build(self, event):
+        rows = self.model.objects.filter(event=event).values('id', self.type_field, *GEOMETRY_FIELDS)
+        return SpatialIndex(rows, self.type_field)
+
+    def for_event(self, event):
+        return self.get(event, lambda: self.build(event))
+
+    def apply(self, event, upserts=(), deletes=()):
+        """Carry the cached index across the layout_version bump of a write that has just happened.
+
+        If any other write slipped in between (version gap), the entry is dropped and rebuilt lazily.
+        """
+        with self._write_lock:
+            entry = self.peek(event.pk)
+            if entry is None:
+                return
+            version, index = entry
+            if version != event.layout_version - 1:
+                self.invalidate(event.pk)
+                return
+            index.remove(deletes)
+            index.upsert(upserts)
+            self.put(event.pk, event.layout_version, index)
+
+
+element_indexes = SpatialIndexCache(ConferenceElement, 'element_type')
+booth_indexes = SpatialIndexCache(TradeshowBooth, 'booth_type')
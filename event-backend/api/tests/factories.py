@@ -0,0 +1,31 @@
+"""Small builders shared by the API tests"""
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from api.authentication import create_jwt
+from api.models import ConferenceElement, TradeshowBooth
+
+
+def make_user(email='owner@example.com'):
+    return get_user_model().objects.create_user(username=email, email=email, password='x')
+
+
+def auth_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Bearer ' + create_jwt(user))
+    return client
+
+
+def make_element(event, label, x=1, y=1, element_type='chair', width=0.5, height=0.5, **fields):
+    return ConferenceElement.objects.create(
+        event=event, element_type=element_type, label=label, position_x=x, position_y=y,
+        width=width, height=height, **fields,
+    )
+
+
+def make_booth(event, label, x=1, y=1, width=3, height=3, booth_type='booth_standard', category='booth', **fields):
+    return TradeshowBooth.objects.create(
+        event=event, booth_type=booth_type, category=category, label=label, position_x=x, position_y=y,
+        width=width, height=height, **fields,
+    )
@@ -0,0 +1,87 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.middleware import BULK, CHECKIN, INTERACTIVE, AdmissionControlMiddleware, ClassGate, classify_request
+
+ADMISSION = {
+    'ENABLED': True,
+    'LIMITS': {CHECKIN: None, INTERACTIVE: 1, BULK: 1},
+    'QUEUE_TIMEOUT': {INTERACTIVE: 0.05, BULK: 0.05},
+    'CHECKIN_PRESSURE': 2,
+    'RETRY_AFTER': 7,
+}
+
+
+class ClassifyRequestTests(SimpleTestCase):
+    def classify(self, path):
+        return classify_request(RequestFactory().get(path))
+
+    def test_classes(self):
+        self.assertEqual(self.classify('/api/qr/conference/x/guest/y/checkin/'), CHECKIN)
+        self.assertEqual(self.classify('/api/conference/events/x/guests/search/'), CHECKIN)
+        self.assertEqual(self.classify('/api/conference/events/x/elements/bulk/'), BULK)
+        self.assertEqual(self.classify('/api/conference/events/x/'), INTERACTIVE)
+
+    def test_probes_streams_and_non_api_paths_are_exempt(self):
+        for path in ('/api/health/', '/api/conference/events/x/stream/', '/admin/'):
+            self.assertIsNone(self.classify(path))
+
+
+class ClassGateTests(SimpleTestCase):
+    def test_full_gate_times_out(self):
+        gate = ClassGate(1)
+        self.assertTrue(gate.acquire(0))
+        self.assertFalse(gate.acquire(0.01))
+        gate.release()
+        self.assertTrue(gate.try_acquire())
+
+    def test_unlimited_gate_counts_in_flight(self):
+        gate = ClassGate(None)
+        for _ in range(3):
+            self.assertTrue(gate.try_acquire())
+        self.assertEqual(gate.in_flight, 3)
+
+    async def test_async_acquire_waits_for_a_release(self):
+        gate = ClassGate(1)
+        gate.try_acquire()
+        self.assertFalse(await gate.acquire_async(0.01))
+        gate.release()
+        self.assertTrue(await gate.acquire_async(0.01))
+
+
+@override_settings(ADMISSION_CONTROL=ADMISSION)
+class AdmissionControlMiddlewareTests(SimpleTestCase):
+    bulk_path = '/api/conference/events/x/elements/bulk/'
+
+    def test_sync_request_is_shed_while_its_class_is_full(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse('ok'))
+        middleware.gates[BULK].try_acquire()
+        response = middleware(RequestFactory().post(self.bulk_path))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        middleware.gates[BULK].release()
+        self.assertEqual(middleware(RequestFactory().post(self.bulk_path)).status_code, 200)
+        self.assertEqual(middleware.gates[BULK].in_flight, 0)
+
+    def test_bulk_is_shed_under_checkin_pressure(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse('ok'))
+        for _ in range(2):
+            middleware.gates[CHECKIN].try_acquire()
+        self.assertEqual(middleware(RequestFactory().post(self.bulk_path)).status_code, 503)
+
+    async def test_async_stack_counts_requests_on_the_event_loop(self):
+        seen = []
+
+        async def view(request):
+            seen.append(middleware.gates[BULK].in_flight)
+            return HttpResponse('ok')
+
+        middleware = AdmissionControlMiddleware(view)
+        response = await middleware(RequestFactory().post(self.bulk_path))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(seen, [1])
+        self.assertEqual(middleware.gates[BULK].in_flight, 0)
+
+        middleware.gates[BULK].try_acquire()
+        response = await middleware(RequestFactory().post(self.bulk_path))
+        self.assertEqual(response.status_code, 503)
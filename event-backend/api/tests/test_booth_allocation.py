@@ -0,0 +1,88 @@
+from concurrent.futures import TimeoutError as FuturesTimeout
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from api import views_tradeshow
+from api.booth_allocation import allocate, nearest_neighbours, refine_clusters
+from api.models import TradeshowBoothAssignment, TradeshowEvent, TradeshowVendor
+
+from .factories import auth_client, make_booth, make_user
+
+
+class PreferenceTests(SimpleTestCase):
+    def allocate(self, booths, preferences):
+        problem = {
+            'booths': [(booth_id, booth_type, k * 4.0, 0.0, 3.0) for k, (booth_id, booth_type) in enumerate(booths)],
+            'vendors': [(f'v{k}', preference, '') for k, preference in enumerate(preferences)],
+            'anchors': [],
+        }
+        return dict(allocate(problem)['assignments'])
+
+    def test_medium_prefers_a_large_booth_over_a_standard_one(self):
+        booths = [('std', 'booth_standard'), ('big', 'booth_large')]
+        self.assertEqual(self.allocate(booths, ['Medium']), {'v0': 'big'})
+        self.assertEqual(self.allocate(booths, ['Small', 'Medium']), {'v0': 'std', 'v1': 'big'})
+
+    def test_large_outranks_medium_for_the_last_large_booth(self):
+        booths = [('std', 'booth_standard'), ('big', 'booth_large')]
+        self.assertEqual(self.allocate(booths, ['Medium', 'Large']), {'v0': 'std', 'v1': 'big'})
+
+
+class RefineClustersTests(SimpleTestCase):
+    def test_nearest_neighbours_match_brute_force(self):
+        positions = np.random.default_rng(1).random((50, 2)).astype(np.float32)
+        near = nearest_neighbours(positions, 5, block=7)
+        distances = np.linalg.norm(positions[:, None] - positions[None], axis=2)
+        np.fill_diagonal(distances, np.inf)
+        expected = np.sort(np.argsort(distances, axis=1)[:, :5], axis=1)
+        np.testing.assert_array_equal(np.sort(near, axis=1), expected)
+
+    def test_interleaved_categories_are_pulled_apart(self):
+        positions = np.array([(x, 0.0) for x in range(8)])
+        codes = np.array([0, 1, 0, 1, 0, 1, 0, 1])
+        refined = refine_clusters(positions, codes, 2, np.zeros((2, 2)), np.zeros(2), neighbours=3)
+        self.assertEqual(sorted(refined.tolist()), sorted(codes.tolist()))
+        self.assertLessEqual(np.count_nonzero(np.diff(refined)), 2)
+
+    def test_large_hall_stays_within_neighbour_arrays(self):
+        positions = np.random.default_rng(2).random((6000, 2)) * 500
+        codes = np.random.default_rng(3).integers(-1, 6, 6000)
+        refined = refine_clusters(positions, codes, 6, np.zeros((6, 2)), np.zeros(6), rounds=2)
+        self.assertEqual(np.bincount(refined + 1).tolist(), np.bincount(codes + 1).tolist())
+
+
+class AutoAllocationViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = TradeshowEvent.objects.create(user=self.user, name='Expo')
+        self.booths = [make_booth(self.event, f'B{k}', x=k * 4) for k in range(2)]
+        self.vendors = [
+            TradeshowVendor.objects.create(event=self.event, company_name=f'V{k}', contact_name='c') for k in range(2)
+        ]
+        self.url = f'/api/tradeshow/events/{self.event.id}/booth-assignments/auto/'
+
+    def test_allocates_every_vendor(self):
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TradeshowBoothAssignment.objects.filter(event=self.event).count(), 2)
+
+    def test_assignment_made_during_allocation_is_a_conflict(self):
+        def allocate_then_race(problem):
+            result = allocate(problem)
+            TradeshowBoothAssignment.objects.create(event=self.event, booth=self.booths[0], vendor=self.vendors[0])
+            return result
+
+        with mock.patch.object(views_tradeshow, 'allocate', allocate_then_race):
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(TradeshowBoothAssignment.objects.filter(event=self.event).count(), 1)
+
+    def test_worker_timeout_is_unavailable(self):
+        with mock.patch.object(views_tradeshow, 'WORKER_THRESHOLD', 0), \
+                mock.patch.object(views_tradeshow, 'run_in_worker', side_effect=FuturesTimeout):
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(TradeshowBoothAssignment.objects.exists())
@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase, TestCase
+
+from api.booth_presets import MAX_HALL_SIDE, PRESETS, generate_preset
+from api.layout_validation import validate_layout
+from api.models import TradeshowBooth, TradeshowEvent
+
+from .factories import auth_client, make_booth, make_user
+
+
+def as_rows(items):
+    return [{**entry, 'id': entry['label'], 'rotation': 0.0, 'scale_x': 1.0, 'scale_y': 1.0} for entry in items]
+
+
+class GeneratePresetTests(SimpleTestCase):
+    def test_every_preset_is_deterministic_and_booths_do_not_overlap(self):
+        for name in PRESETS:
+            with self.subTest(preset=name):
+                items = generate_preset(name, 80, 60)
+                self.assertEqual(items, generate_preset(name, 80, 60))
+                booths = [entry for entry in items if entry['category'] == 'booth']
+                self.assertTrue(booths)
+                self.assertEqual(len({entry['label'] for entry in booths}), len(booths))
+                self.assertEqual(validate_layout(as_rows(booths), clearance=0)['overlaps'], [])
+                for entry in items:
+                    self.assertGreaterEqual(entry['position_x'], 0)
+                    self.assertLessEqual(entry['position_x'] + entry['width'], 80 + 1e-6)
+                    self.assertLessEqual(entry['position_y'] + entry['height'], 60 + 1e-6)
+
+    def test_expo_has_a_premium_front_row_and_islands(self):
+        types = {entry['booth_type'] for entry in generate_preset('expo', 120, 90)}
+        self.assertLessEqual({'booth_premium', 'booth_island', 'booth_standard'}, types)
+
+    def test_invalid_presets_and_halls_are_rejected(self):
+        for args in (('nope', 80, 60), ('standard_grid', 10, 10), ('standard_grid', float('nan'), 60),
+                     ('standard_grid', float('inf'), 60), ('standard_grid', MAX_HALL_SIDE + 1, 60)):
+            with self.subTest(args=args), self.assertRaises(ValueError):
+                generate_preset(*args)
+
+
+class ApplyPresetViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = TradeshowEvent.objects.create(user=self.user, name='Expo', hall_width=80, hall_height=60)
+        make_booth(self.event, 'Old')
+        self.url = f'/api/tradeshow/events/{self.event.id}/apply_preset/'
+
+    def test_dry_run_writes_nothing(self):
+        response = self.client.post(self.url, {'preset_id': 'standard_grid', 'dry_run': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['booths'], generate_preset('standard_grid', 80, 60))
+        self.assertEqual(TradeshowBooth.objects.filter(event=self.event).count(), 1)
+
+    def test_apply_replaces_booths_and_records_the_preset(self):
+        response = self.client.post(self.url, {'preset_id': 'large_booths', 'hall_width': 100}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['removed'], 1)
+        self.assertFalse(TradeshowBooth.objects.filter(event=self.event, label='Old').exists())
+        self.assertEqual(TradeshowBooth.objects.filter(event=self.event).count(), len(response.data['booths']))
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.preset_layout, self.event.hall_width), ('large_booths', 100))
+        self.assertEqual(self.event.layout_version, 1)
+
+    def test_bad_requests_are_a_400(self):
+        for body in ({'preset_id': 'nope'}, {'preset_id': 'expo', 'hall_width': 'wide'},
+                     {'preset_id': 'expo', 'hall_width': 'nan'}, {'preset_id': 'expo', 'replace': 'maybe'}):
+            with self.subTest(**body):
+                self.assertEqual(self.client.post(self.url, body, format='json').status_code, 400)
+        self.assertEqual(TradeshowBooth.objects.filter(event=self.event).count(), 1)
@@ -0,0 +1,53 @@
+from django.test import TestCase
+
+from api.models import ConferenceEvent, TradeshowEvent
+
+from .factories import auth_client, make_booth, make_element, make_user
+
+
+class ConditionalWriteTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=60, room_height=45)
+        self.element = make_element(self.event, 'A')
+
+    def test_if_match_with_an_old_version_conflicts(self):
+        url = f'/api/conference/events/{self.event.id}/elements/{self.element.id}/'
+        response = self.client.patch(url, {'label': 'B'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        response = self.client.patch(url, {'label': 'C'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['current']['label'], 'B')
+
+    def test_bulk_items_with_an_old_version_conflict(self):
+        url = f'/api/conference/events/{self.event.id}/elements/bulk/'
+        item = {'id': str(self.element.id), 'label': 'B', 'version': 1}
+        self.assertEqual(self.client.post(url, {'elements': [item]}, format='json').status_code, 201)
+        response = self.client.post(url, {'elements': [{**item, 'label': 'C'}]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'][0]['version'], 2)
+        self.element.refresh_from_db()
+        self.assertEqual(self.element.label, 'B')
+
+    def test_ops_with_an_old_version_conflict(self):
+        url = f'/api/conference/events/{self.event.id}/ops/'
+        ops = [{'op': 'move', 'id': str(self.element.id), 'version': 1, 'data': {'position_x': 4}}]
+        self.assertEqual(self.client.post(url, {'ops': ops}, format='json').status_code, 201)
+        response = self.client.post(url, {'ops': [{**ops[0], 'data': {'position_x': 6}}]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'][0]['version'], 2)
+        self.element.refresh_from_db()
+        self.assertEqual(str(self.element.position_x), '4.00')
+
+    def test_sync_items_with_an_old_version_conflict(self):
+        event = TradeshowEvent.objects.create(user=self.user, name='Expo')
+        booth = make_booth(event, 'B1')
+        url = f'/api/tradeshow/events/{event.id}/booths/sync/'
+        response = self.client.post(url, {'booths': [{'id': str(booth.id), 'version': 9, 'label': 'Q'}]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'][0]['version'], 1)
+        response = self.client.post(url, {'booths': [{'id': str(booth.id), 'version': 1, 'label': 'Q'}]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'][0]['label'], 'Q')
@@ -0,0 +1,74 @@
+import gzip
+import io
+import json
+
+from django.test import TestCase
+
+from api.design_archive import export_archive, import_archive
+from api.design_store import create_version, encode, snapshot, snapshots
+from api.models import Design, DesignVersion
+
+from .factories import auth_client, make_user
+from .test_design_store import history
+
+
+def archive(*lines):
+    return io.BytesIO(gzip.compress('\n'.join(json.dumps(line) for line in lines).encode()))
+
+
+HEADER = {'type': 'archive', 'format': 1}
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.design = Design.objects.create(user=self.user, name='Hall', kind='tradeshow')
+        self.saved = history(25)
+        for data in self.saved:
+            create_version(self.design, data)
+        DesignVersion.objects.filter(design=self.design, version=3).update(note='approved')
+
+    def test_round_trip(self):
+        exported = b''.join(export_archive(Design.objects.filter(pk=self.design.pk)))
+        receiver = make_user('other@example.com')
+        Design.objects.create(user=receiver, name='Hall')
+        imported, = import_archive(receiver, io.BytesIO(exported))
+        self.assertEqual((imported.name, imported.kind, imported.latest_version), ('Hall (2)', 'tradeshow', 25))
+        snapshots.clear()
+        rows = DesignVersion.objects.filter(design=imported).order_by('version')
+        self.assertEqual([snapshot(row) for row in rows], self.saved)
+        self.assertEqual(rows.get(version=3).note, 'approved')
+
+    def test_views_round_trip(self):
+        client = auth_client(self.user)
+        response = client.get(f'/api/designs/export/?ids={self.design.id}')
+        self.assertEqual(response.status_code, 200)
+        upload = io.BytesIO(b''.join(response.streaming_content))
+        upload.name = 'designs.ndjson.gz'
+        response = client.post('/api/designs/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data[0]['latest_version'], 25)
+
+    def test_malformed_archives_are_rejected(self):
+        cases = [
+            [HEADER, {'type': 'design', 'name': 'Bad'}, {'type': 'version', 'version': 1, 'delta': ['{}', {}]}],
+            [HEADER, {'type': 'design', 'name': 'Bad'},
+             {'type': 'version', 'version': 1, 'data': {}, 'content_hash': encode({})[0]},
+             {'type': 'version', 'version': 2, 'delta': [1]}],
+            [HEADER, {'type': 'design', 'name': 'Bad'}, {'type': 'version', 'version': 1, 'data': {}, 'content_hash': 'x'}],
+            [{'type': 'design'}],
+        ]
+        for lines in cases:
+            with self.assertRaises(ValueError):
+                import_archive(self.user, archive(*lines))
+        with self.assertRaises(ValueError):
+            import_archive(self.user, io.BytesIO(b'not gzip'))
+        self.assertFalse(Design.objects.filter(name='Bad').exists())
+
+    def test_deduplicated_names_fit_the_column(self):
+        name = 'N' * 200
+        lines = [HEADER, {'type': 'design', 'name': name}]
+        names = {import_archive(self.user, archive(*lines))[0].name for _ in range(11)}
+        self.assertEqual(len(names), 11)
+        self.assertEqual(max(map(len, names)), 200)
+        self.assertIn('N' * 195 + ' (11)', names)
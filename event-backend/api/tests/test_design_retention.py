@@ -0,0 +1,52 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from api.design_retention import RetentionPolicy, compact_design
+from api.design_store import create_version, snapshot, snapshots
+from api.models import Design, DesignBlob, DesignVersion
+
+from .factories import make_user
+from .test_design_store import history
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.design = Design.objects.create(user=make_user(), name='Hall')
+        self.saved = history(60)
+        for data in self.saved:
+            create_version(self.design, data)
+        self.now = timezone.now()
+        # One version every three hours, the newest just saved
+        for v in range(1, 61):
+            DesignVersion.objects.filter(design=self.design, version=v).update(
+                created_at=self.now - timedelta(hours=(60 - v) * 3),
+            )
+        snapshots.clear()
+
+    def test_policy_keeps_recent_and_noted_versions(self):
+        DesignVersion.objects.filter(design=self.design, version=2).update(note='signed off')
+        dropped = compact_design(self.design.id, RetentionPolicy(), self.now)
+        kept = set(DesignVersion.objects.filter(design=self.design).values_list('version', flat=True))
+        self.assertEqual(len(kept), 60 - dropped)
+        self.assertTrue({2, 60} <= kept)
+        # Everything from the last day survives
+        self.assertTrue(set(range(53, 61)) <= kept)
+
+    def test_survivors_are_rechained(self):
+        compact_design(self.design.id, RetentionPolicy(), self.now)
+        for row in DesignVersion.objects.filter(design=self.design).order_by('version'):
+            self.assertEqual(snapshot(row), self.saved[row.version - 1])
+        self.assertFalse(DesignBlob.objects.filter(versions__isnull=True).exists())
+        # The chain keeps growing after compaction
+        row, created = create_version(self.design, {'items': []})
+        self.assertEqual((row.version, created), (61, True))
+
+    def test_dry_run_drops_nothing(self):
+        out = StringIO()
+        call_command('compact_design_versions', '--dry-run', stdout=out)
+        self.assertIn('would remove', out.getvalue())
+        self.assertEqual(DesignVersion.objects.filter(design=self.design).count(), 60)
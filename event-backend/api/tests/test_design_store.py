@@ -0,0 +1,149 @@
+import copy
+import json
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from api.design_store import create_version, delete_design, snapshot, snapshots
+from api.json_delta import diff, patch
+from api.models import Design, DesignBlob, DesignVersion
+
+from .factories import make_user
+
+
+def editor_data(n=40, **changes):
+    data = {'items': [{'id': f'e{i}', 'x': i, 'y': 0, 'props': {'label': f'L{i}'}} for i in range(n)], 'meta': {}}
+    for key, x in changes.items():
+        data['items'][int(key[1:])]['x'] = x
+    return data
+
+
+def history(count):
+    """Editor JSON of `count` versions, each moving one item"""
+    return [editor_data(**{f'e{v % 40}': 1000 + v}) for v in range(1, count + 1)]
+
+
+class JsonDeltaTests(TestCase):
+    def assertRoundTrip(self, old, new):
+        delta = diff(old, new)
+        self.assertEqual(patch(old, delta), new)
+        self.assertEqual(json.loads(json.dumps(delta)), delta)
+
+    def test_round_trips(self):
+        self.assertRoundTrip({'a': 1, 'b': [1, 2]}, {'a': 2, 'c': None, 'b': [1, 2, 3]})
+        self.assertRoundTrip([1, 2, 3], [1])
+        self.assertRoundTrip(editor_data(), editor_data(e3=99))
+        items = editor_data()
+        moved = copy.deepcopy(items)
+        moved['items'].insert(0, moved['items'].pop(10))
+        del moved['items'][5]
+        self.assertRoundTrip(items, moved)
+        self.assertRoundTrip({'a': 1}, [1])
+        self.assertRoundTrip(1, 1.0)
+
+    def test_equal_values_have_no_delta(self):
+        self.assertIsNone(diff(editor_data(), editor_data()))
+
+    def test_patch_does_not_mutate(self):
+        old = editor_data()
+        kept = copy.deepcopy(old)
+        patch(old, diff(old, editor_data(e1=5)))
+        self.assertEqual(old, kept)
+
+
+class DesignStoreTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.design = Design.objects.create(user=self.user, name='Hall')
+        snapshots.clear()
+
+    def test_versions_round_trip_through_chains(self):
+        saved = history(45)
+        for data in saved:
+            create_version(self.design, data)
+        rows = list(DesignVersion.objects.filter(design=self.design).order_by('version'))
+        self.assertEqual([row.version for row in rows if row.keyframe_version == row.version], [1, 21, 41])
+        snapshots.clear()
+        for row, data in zip(reversed(rows), reversed(saved)):
+            self.assertEqual(snapshot(row), data)
+
+    def test_versions_are_numbered_from_the_head(self):
+        for v, data in enumerate(history(3), start=1):
+            row, created = create_version(self.design, data)
+            self.assertEqual((row.version, created), (v, True))
+        self.design.refresh_from_db()
+        self.assertEqual((self.design.latest_version, self.design.head_id), (3, row.id))
+
+    def test_saving_the_latest_content_again_writes_nothing(self):
+        create_version(self.design, editor_data())
+        row, created = create_version(self.design, editor_data())
+        self.assertFalse(created)
+        self.assertEqual(row.version, 1)
+        self.assertEqual(DesignVersion.objects.filter(design=self.design).count(), 1)
+
+    def test_identical_payloads_share_a_blob(self):
+        other = Design.objects.create(user=self.user, name='Copy')
+        create_version(self.design, editor_data())
+        create_version(other, editor_data())
+        self.assertEqual(DesignBlob.objects.count(), 1)
+        delete_design(self.design)
+        self.assertEqual(DesignBlob.objects.count(), 1)
+        delete_design(other)
+        self.assertEqual(DesignBlob.objects.count(), 0)
+
+    def test_blob_deleted_before_the_lock_is_stored_again(self):
+        create_version(self.design, editor_data())
+        digest = DesignVersion.objects.get(design=self.design).blob_id
+        payload = DesignBlob.objects.get(pk=digest)
+        # What a collector committing between the insert and the lock leaves behind
+        original = DesignBlob.objects.bulk_create
+
+        def insert_then_lose(blobs, **kwargs):
+            DesignBlob.objects.filter(pk__in=[blob.pk for blob in blobs]).delete()
+            DesignBlob.objects.bulk_create = original
+            return []
+
+        other = Design.objects.create(user=self.user, name='Copy')
+        DesignVersion.objects.filter(design=self.design).delete()
+        DesignBlob.objects.bulk_create = insert_then_lose
+        try:
+            create_version(other, editor_data())
+        finally:
+            DesignBlob.objects.bulk_create = original
+        self.assertEqual(DesignBlob.objects.get(pk=digest).payload, payload.payload)
+        self.assertEqual(snapshot(DesignVersion.objects.get(design=other)), editor_data())
+
+
+class DeltaMigrationTests(TransactionTestCase):
+    """0015 turns full snapshots into keyframe chains, and back"""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        executor.loader.build_graph()
+        return executor.loader.project_state([target]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_snapshots_convert_to_chains_and_back(self):
+        apps = self.migrate(('api', '0014_row_version'))
+        user = make_user()
+        design = apps.get_model('api', 'Design').objects.create(user_id=user.pk, name='Old')
+        saved = history(30)
+        for v, data in enumerate(saved, start=1):
+            apps.get_model('api', 'DesignVersion').objects.create(design_id=design.pk, version=v, data=data)
+
+        apps = self.migrate(('api', '0015_design_version_deltas'))
+        rows = list(apps.get_model('api', 'DesignVersion').objects.filter(design_id=design.pk).order_by('version'))
+        self.assertEqual([row.version for row in rows if row.keyframe_version == row.version], [1, 21])
+        data = None
+        for row, expected in zip(rows, saved):
+            data = row.data if row.keyframe_version == row.version else patch(data, row.delta)
+            self.assertEqual(data, expected)
+
+        apps = self.migrate(('api', '0014_row_version'))
+        rows = apps.get_model('api', 'DesignVersion').objects.filter(design_id=design.pk).order_by('version')
+        self.assertEqual([row.data for row in rows], saved)
@@ -0,0 +1,63 @@
+import math
+import time
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from api.egress import distance_transform
+from api.models import ConferenceEvent
+
+from .factories import auth_client, make_element, make_user
+
+
+class DistanceTransformTests(SimpleTestCase):
+    def test_open_grid_uses_octile_distances_to_the_nearest_source(self):
+        free = np.ones((5, 5), dtype=bool)
+        left, right = np.zeros_like(free), np.zeros_like(free)
+        left[0, 0] = right[4, 4] = True
+        dist, nearest = distance_transform(free, [left, right])
+        self.assertAlmostEqual(dist[2, 1], 1 + math.sqrt(2))
+        self.assertEqual(nearest[1, 1], 0)
+        self.assertEqual(nearest[3, 3], 1)
+
+    def test_diagonals_do_not_cut_blocked_corners_and_walls_block(self):
+        free = np.ones((3, 3), dtype=bool)
+        free[0, 1] = free[1, 0] = False
+        source = np.zeros_like(free)
+        source[0, 0] = True
+        dist, _ = distance_transform(free, [source])
+        self.assertEqual(dist[1, 1], math.inf)
+
+    def test_serpentine_corridor_is_fast(self):
+        n = 500
+        free = np.ones((n, n), dtype=bool)
+        for k, r in enumerate(range(2, n, 4)):
+            free[r, :] = False
+            free[r, n - 1 if k % 2 == 0 else 0] = True
+        source = np.zeros_like(free)
+        source[0, 0] = True
+        started = time.monotonic()
+        dist, _ = distance_transform(free, [source])
+        self.assertLess(time.monotonic() - started, 30)
+        self.assertGreater(dist[n - 1, 0], n * (n // 4 - 1))
+
+
+class EgressViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=10, room_height=6)
+        make_element(self.event, 'Door', element_type='door', x=0, y=3, width=1, height=0.2)
+        make_element(self.event, 'T1', element_type='table_round', x=7, y=3, width=1.5, height=1.5, seats=6)
+        self.url = f'/api/conference/events/{self.event.id}/egress/'
+
+    def test_report_with_and_without_heatmap(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.data['worst_case']['distance'], 5)
+        self.assertIn('heatmap', response.data['grid'])
+        response = self.client.get(self.url, {'heatmap': 'off'})
+        self.assertNotIn('heatmap', response.data['grid'])
+
+    def test_heatmap_flag_must_be_a_boolean(self):
+        self.assertEqual(self.client.get(self.url, {'heatmap': 'maybe'}).status_code, 400)
@@ -0,0 +1,84 @@
+import uuid
+from datetime import date, time
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.event_clone import clone_conference_event, clone_tradeshow_event
+from api.models import (
+    ConferenceEvent, ConferenceGroup, ConferenceGuest, ConferenceSeatAssignment, EventSession, TradeshowBooth,
+    TradeshowBoothAssignment, TradeshowEvent, TradeshowRoute, TradeshowVendor,
+)
+
+from .factories import auth_client, make_booth, make_element, make_user
+
+
+class EventCloneTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def make_conference(self, guests):
+        event = ConferenceEvent.objects.create(user=self.user, name='Gala', is_public=True, share_token=uuid.uuid4().hex, op_seq=5)
+        group = ConferenceGroup.objects.create(event=event, name='VIP')
+        for n in range(guests):
+            table = make_element(event, f'T{n}', element_type='table_round', seats=8, version=4)
+            guest = ConferenceGuest.objects.create(event=event, group=group, name=f'Guest {n}', checked_in=True)
+            ConferenceSeatAssignment.objects.create(event=event, element=table, guest=guest, seat_number=1)
+        EventSession.objects.create(conference_event=event, title='Opening', session_date=date(2026, 1, 1),
+                                    start_time=time(9), end_time=time(10))
+        return event
+
+    def test_conference_clone_remaps_guests_and_seats(self):
+        event = self.make_conference(guests=1)
+        copy, counts = clone_conference_event(event, self.user, include_guests=True)
+        self.assertEqual(counts, {'elements': 1, 'groups': 1, 'guests': 1, 'seat_assignments': 1, 'sessions': 1})
+        self.assertEqual(copy.name, 'Gala (copy)')
+        self.assertEqual((copy.is_public, copy.share_token, copy.op_seq), (False, None, 0))
+        seat = ConferenceSeatAssignment.objects.get(event=copy)
+        self.assertEqual((seat.element.event_id, seat.guest.group.event_id), (copy.id, copy.id))
+        self.assertFalse(seat.guest.checked_in)
+        self.assertEqual(seat.element.version, 1)
+        self.assertEqual(ConferenceSeatAssignment.objects.filter(event=event).count(), 1)
+
+    def test_query_count_does_not_grow_with_the_event(self):
+        small, large = self.make_conference(guests=1), self.make_conference(guests=30)
+        with CaptureQueriesContext(connection) as few:
+            clone_conference_event(small, self.user, include_guests=True)
+        with CaptureQueriesContext(connection) as many:
+            clone_conference_event(large, self.user, include_guests=True)
+        self.assertEqual(len(few), len(many))
+
+    def test_conference_clone_without_guests(self):
+        event = self.make_conference(guests=1)
+        copy, counts = clone_conference_event(event, self.user, name='Next year')
+        self.assertNotIn('guests', counts)
+        self.assertEqual(copy.name, 'Next year')
+        self.assertFalse(ConferenceGuest.objects.filter(event=copy).exists())
+
+    def test_tradeshow_clone_remaps_routes(self):
+        event = TradeshowEvent.objects.create(user=self.user, name='Expo')
+        booths = [make_booth(event, f'A{n}', x=n * 4) for n in range(3)]
+        vendor = TradeshowVendor.objects.create(event=event, company_name='Acme', contact_name='Bo')
+        TradeshowBoothAssignment.objects.create(event=event, booth=booths[0], vendor=vendor)
+        TradeshowRoute.objects.create(event=event, booth_order=[str(b.id) for b in reversed(booths)] + ['gone'])
+
+        copy, counts = clone_tradeshow_event(event, self.user)
+        self.assertEqual(counts, {'booths': 3, 'vendors': 1, 'booth_assignments': 1, 'routes': 1, 'sessions': 0})
+        labels = dict(TradeshowBooth.objects.filter(event=copy).values_list('id', 'label'))
+        route = TradeshowRoute.objects.get(event=copy)
+        self.assertEqual([labels[b] for b in map(uuid.UUID, route.booth_order)], ['A2', 'A1', 'A0'])
+        assignment = TradeshowBoothAssignment.objects.get(event=copy)
+        self.assertEqual((assignment.booth.event_id, assignment.vendor.event_id), (copy.id, copy.id))
+
+    def test_clone_view_validates_input(self):
+        event = ConferenceEvent.objects.create(user=self.user, name='N' * 255)
+        client = auth_client(self.user)
+        url = f'/api/conference/events/{event.id}/clone/'
+        self.assertEqual(client.post(url, {'name': 123}, format='json').status_code, 400)
+        self.assertEqual(client.post(url, {'name': 'x' * 256}, format='json').status_code, 400)
+        self.assertEqual(client.post(url, {'include_guests': 'maybe'}, format='json').status_code, 400)
+        response = client.post(url, {}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['name']), 255)
+        self.assertTrue(response.data['name'].endswith(' (copy)'))
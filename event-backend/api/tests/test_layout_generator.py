@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase, TestCase
+
+from api.layout_generator import build_problem, generate, layout_spec
+from api.models import ConferenceElement, ConferenceEvent
+
+from .factories import auth_client, make_element, make_user
+
+
+class LayoutSpecTests(SimpleTestCase):
+    def test_overrides_are_applied(self):
+        spec = layout_spec('banquet', seats=10, width='2.0')
+        self.assertEqual((spec['seats'], spec['width'], spec['height']), (10, 2.0, 1.8))
+
+    def test_non_finite_and_out_of_range_values_are_rejected(self):
+        for overrides in ({'width': 'nan'}, {'height': 'inf'}, {'width': 0}, {'width': 500},
+                          {'seats': 10 ** 12}, {'seats': 2.5}, {'seats': 'many'}):
+            with self.subTest(**overrides), self.assertRaises(ValueError):
+                layout_spec('banquet', **overrides)
+
+    def test_huge_rooms_are_refused(self):
+        spec = layout_spec('theatre')
+        with self.assertRaises(ValueError):
+            build_problem(100000.0, 100000.0, [], spec, 100, 0.9)
+
+
+class GenerateTests(SimpleTestCase):
+    def test_banquet_keeps_clear_of_the_stage(self):
+        spec = layout_spec('banquet')
+        stage = {'element_type': 'stage', 'position_x': 5, 'position_y': 0, 'width': 10, 'height': 3,
+                 'rotation': 0, 'scale_x': 1, 'scale_y': 1}
+        problem = build_problem(20.0, 15.0, [stage], spec, 40, 0.9)
+        centres = generate(problem, spec)
+        self.assertEqual(len(centres), 5)
+        for _, y, _ in centres:
+            self.assertGreater(y - spec['height'] / 2, 3)
+
+
+class AutoLayoutViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=20, room_height=15)
+        make_element(self.event, 'Door', element_type='door', x=0, y=7, width=1, height=0.2)
+        self.url = f'/api/conference/events/{self.event.id}/elements/auto/'
+
+    def test_bad_unit_overrides_are_a_400(self):
+        for body in ({'table_width': 'nan'}, {'seats_per_table': 10 ** 12}, {'table_height': '1e999'}):
+            with self.subTest(**body):
+                response = self.client.post(self.url, {'headcount': 40, **body}, format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_dry_run_writes_nothing(self):
+        response = self.client.post(self.url, {'headcount': 40, 'dry_run': True}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['units'], 5)
+        self.assertEqual(ConferenceElement.objects.filter(event=self.event).count(), 1)
+
+    def test_generated_tables_are_saved(self):
+        response = self.client.post(self.url, {'headcount': 16, 'style': 'banquet'}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(ConferenceElement.objects.filter(event=self.event, element_type='table_round').count(), 2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.layout_version, 1)
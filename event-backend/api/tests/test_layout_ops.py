@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import TestCase
+
+from api.layout_ops import LayoutOpLog, compact
+from api.models import ConferenceElement, ConferenceEvent, ConferenceLayoutOperation
+from api.serializers import ConferenceElementSerializer
+
+from .factories import auth_client, make_element, make_user
+
+
+class LayoutOpLogTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=60, room_height=45)
+        self.url = f'/api/conference/events/{self.event.id}/ops/'
+
+    def post_ops(self, ops, **body):
+        return self.client.post(self.url, {'ops': ops, **body}, format='json')
+
+    def test_batch_applies_in_order_and_is_logged(self):
+        element_id = '6f1c3a4e-0a57-4c2b-9a51-3f0c9e0d1a11'
+        add = {'element_type': 'table_round', 'label': 'T1', 'seats': 8,
+               'position_x': 1, 'position_y': 1, 'width': 1.5, 'height': 1.5}
+        response = self.post_ops([
+            {'op': 'add', 'id': element_id, 'data': add},
+            {'op': 'move', 'id': element_id, 'data': {'position_x': '3.25'}},
+        ], client_id='tab-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['seq'], 2)
+        self.assertEqual([op['op'] for op in response.data['ops']], ['add', 'move'])
+        self.assertEqual(str(ConferenceElement.objects.get(id=element_id).position_x), '3.25')
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.op_seq, self.event.layout_version), (2, 1))
+
+    def test_invalid_batch_writes_nothing(self):
+        element = make_element(self.event, 'A')
+        response = self.post_ops([
+            {'op': 'update', 'id': str(element.id), 'data': {'label': 'B'}},
+            {'op': 'move', 'id': str(element.id), 'data': {'label': 'C'}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        element.refresh_from_db()
+        self.assertEqual(element.label, 'A')
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.op_seq, self.event.layout_version), (0, 0))
+
+    def test_rows_only_get_the_fields_their_own_ops_set(self):
+        a, b = make_element(self.event, 'A'), make_element(self.event, 'B', x=2, y=2)
+        log = LayoutOpLog(self.event, ConferenceElementSerializer, ConferenceLayoutOperation)
+        with transaction.atomic():
+            plan, errors, conflicts = log.plan([
+                {'op': 'move', 'id': str(a.id), 'data': {'position_x': 5}},
+                {'op': 'update', 'id': str(b.id), 'data': {'label': 'BB'}},
+            ])
+            self.assertEqual((errors, conflicts), ([], []))
+            # Edits the batch does not touch must survive it
+            ConferenceElement.objects.filter(pk=a.pk).update(label='edited')
+            ConferenceElement.objects.filter(pk=b.pk).update(position_x=9)
+            log._apply(plan, '')
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.label, str(a.position_x)), ('edited', '5.00'))
+        self.assertEqual((b.label, str(b.position_x)), ('BB', '9.00'))
+
+    def test_since_replays_the_tail(self):
+        element = make_element(self.event, 'A')
+        for x in range(3):
+            self.post_ops([{'op': 'move', 'id': str(element.id), 'data': {'position_x': x}}])
+        response = self.client.get(self.url + '?since=1')
+        self.assertFalse(response.data['reset'])
+        self.assertEqual([op['seq'] for op in response.data['ops']], [2, 3])
+        response = self.client.get(self.url + '?since=0&limit=1')
+        self.assertTrue(response.data['more'])
+        self.assertEqual(self.client.get(self.url + '?since=9').status_code, 400)
+
+    def test_write_outside_the_log_resets_older_clients(self):
+        element = make_element(self.event, 'A')
+        self.post_ops([{'op': 'move', 'id': str(element.id), 'data': {'position_x': 2}}])
+        self.client.patch(f'/api/conference/events/{self.event.id}/elements/{element.id}/', {'seats': 4}, format='json')
+        self.assertTrue(self.client.get(self.url + '?since=1').data['reset'])
+        self.post_ops([{'op': 'move', 'id': str(element.id), 'data': {'position_x': 3}}])
+        response = self.client.get(self.url + '?since=2')
+        self.assertFalse(response.data['reset'])
+        self.assertEqual(response.data['ops'], [])
+
+    def test_compaction_resets_clients_behind_it(self):
+        element = make_element(self.event, 'A')
+        for x in range(10):
+            self.post_ops([{'op': 'move', 'id': str(element.id), 'data': {'position_x': x}}])
+        self.event.refresh_from_db()
+        deleted = compact(self.event, ConferenceLayoutOperation, retain_ops=3, min_age=timedelta(0))
+        self.assertEqual(deleted, 6)
+        self.assertEqual(self.event.ops_compacted_seq, 7)
+        self.assertTrue(self.client.get(self.url + '?since=5').data['reset'])
+        response = self.client.get(self.url + '?since=7')
+        self.assertFalse(response.data['reset'])
+        self.assertEqual(len(response.data['ops']), 3)
@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.test import TestCase
+
+from api.layout_edits import LayoutSync
+from api.models import ConferenceElement, ConferenceEvent, TradeshowBooth, TradeshowEvent
+from api.serializers import ConferenceElementSerializer
+
+from .factories import auth_client, make_booth, make_element, make_user
+
+
+class LayoutSyncTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=20, room_height=20)
+        self.a = make_element(self.event, 'A', x=1, y=1)
+        self.b = make_element(self.event, 'B', x=5, y=1)
+
+    def plan(self, items):
+        with transaction.atomic():
+            sync = LayoutSync(self.event, ConferenceElementSerializer)
+            return sync, *sync.plan(items)
+
+    def test_equal_values_in_other_spellings_are_unchanged(self):
+        _, plan, errors, conflicts = self.plan([
+            {'id': str(self.a.id), 'position_x': '1.00', 'label': 'A'},
+            {'id': str(self.b.id), 'position_x': 5, 'width': 0.5},
+        ])
+        self.assertEqual((errors, conflicts), ([], []))
+        self.assertEqual((plan['update'], plan['create'], plan['delete'], plan['unchanged']), ([], [], [], 2))
+
+    def test_plan_creates_updates_and_deletes(self):
+        _, plan, errors, _ = self.plan([
+            {'id': str(self.a.id), 'label': 'A2'},
+            {'element_type': 'chair', 'label': 'C', 'position_x': 9, 'position_y': 9, 'width': 0.5, 'height': 0.5},
+        ])
+        self.assertEqual(errors, [])
+        self.assertEqual([item.label for item in plan['update']], ['A2'])
+        self.assertEqual(plan['update_fields'], ['label'])
+        self.assertEqual(len(plan['create']), 1)
+        self.assertEqual(plan['delete'], [self.b.id])
+
+    def test_invalid_and_duplicate_items_are_reported_by_index(self):
+        _, _, errors, _ = self.plan([
+            {'id': str(self.a.id)}, {'id': str(self.a.id)}, 'nope',
+            {'element_type': 'chair', 'label': 'bad', 'position_x': 'x', 'position_y': 0},
+        ])
+        self.assertEqual([error['index'] for error in errors], [1, 2, 3])
+
+    def test_layout_hash_matches_a_fresh_sync(self):
+        with transaction.atomic():
+            sync, plan, _, _ = self.plan([{'id': str(self.a.id), 'label': 'A2'}, {'id': str(self.b.id)}])
+            sync.apply(plan)
+            result = sync.result(plan)
+        fresh = LayoutSync(self.event, ConferenceElementSerializer)
+        self.assertEqual(result['layout_hash'], fresh.layout_hash(fresh.hashes))
+
+
+class SyncViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=20, room_height=20)
+        self.a = make_element(self.event, 'A', x=1, y=1)
+        self.b = make_element(self.event, 'B', x=5, y=1)
+        self.url = f'/api/conference/events/{self.event.id}/elements/sync/'
+
+    def test_sync_writes_only_the_difference(self):
+        response = self.client.post(self.url, {'elements': [
+            {'id': str(self.a.id), 'version': 1, 'position_x': 2},
+            {'element_type': 'chair', 'label': 'C', 'position_x': 9, 'position_y': 9, 'width': 0.5, 'height': 0.5},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((len(response.data['created']), len(response.data['updated'])), (1, 1))
+        self.assertEqual(response.data['deleted'], [str(self.b.id)])
+        self.assertEqual(response.data['created'][0]['client_id'], None)
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.version, 2)
+        self.assertEqual(set(ConferenceElement.objects.filter(event=self.event).values_list('label', flat=True)),
+                         {'A', 'C'})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.layout_version, 1)
+
+    def test_resubmitting_the_stored_layout_is_a_no_op(self):
+        rows = [{'id': str(self.a.id)}, {'id': str(self.b.id)}]
+        response = self.client.post(self.url, {'elements': rows}, format='json')
+        self.assertEqual(response.data['unchanged'], 2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.layout_version, 0)
+
+    def test_dry_run_and_stale_versions_write_nothing(self):
+        response = self.client.post(self.url, {'elements': [], 'dry_run': True}, format='json')
+        self.assertEqual(sorted(response.data['deleted']), sorted([str(self.a.id), str(self.b.id)]))
+        response = self.client.post(self.url, {'elements': [
+            {'id': str(self.a.id), 'version': 7, 'label': 'stale'}, {'id': str(self.b.id)},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'][0]['index'], 0)
+        self.assertEqual(ConferenceElement.objects.filter(event=self.event).count(), 2)
+
+    def test_strict_validation_rolls_back(self):
+        ConferenceElement.objects.filter(event=self.event).update(element_type='table_round', width=1.5, height=1.5)
+        response = self.client.post(self.url, {'validation': 'strict', 'elements': [
+            {'id': str(self.a.id)}, {'id': str(self.b.id), 'position_x': 1.1},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.b.refresh_from_db()
+        self.assertEqual((float(self.b.position_x), self.b.version), (5.0, 1))
+
+    def test_tradeshow_sync_reports_item_errors(self):
+        event = TradeshowEvent.objects.create(user=self.user, name='Expo')
+        booth = make_booth(event, 'B1')
+        url = f'/api/tradeshow/events/{event.id}/booths/sync/'
+        response = self.client.post(url, {'booths': [
+            {'id': str(booth.id), 'label': 'B1b'}, {'label': 'no type'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        booth.refresh_from_db()
+        self.assertEqual(booth.label, 'B1')
+        self.assertEqual(TradeshowBooth.objects.filter(event=event).count(), 1)
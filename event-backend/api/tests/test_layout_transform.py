@@ -0,0 +1,98 @@
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase
+
+from api.layout_edits import MIN_POSE_SCALE, apply_transform, parse_transform
+from api.models import ConferenceElement, ConferenceEvent, TradeshowEvent
+
+from .factories import auth_client, make_booth, make_element, make_user
+
+
+class ParseTransformTests(SimpleTestCase):
+    def test_defaults_and_duplicate_ids(self):
+        item_id = str(uuid.uuid4())
+        ids, params = parse_transform({'ids': [item_id, item_id], 'rotate': 90})
+        self.assertEqual(ids, [uuid.UUID(item_id)])
+        self.assertEqual(params, {'translate': (0.0, 0.0), 'rotate': 90.0, 'scale': 1.0, 'pivot': None})
+
+    def test_invalid_input_is_rejected(self):
+        item_id = str(uuid.uuid4())
+        for data in ({'ids': []}, {'ids': ['nope']}, {'ids': [item_id], 'scale': -1},
+                     {'ids': [item_id], 'rotate': 'nan'}, {'ids': [item_id], 'translate': [1]},
+                     {'ids': [item_id], 'translate': [1e9, 0]}):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                parse_transform(data)
+
+
+class ApplyTransformTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=20, room_height=20)
+        self.a = make_element(self.event, 'A', x=2, y=2)
+        self.b = make_element(self.event, 'B', x=6, y=2)
+        self.queryset = ConferenceElement.objects.filter(event=self.event)
+
+    def transform(self, *items, translate=(0, 0), rotate=0, scale=1, pivot=None):
+        return apply_transform(self.queryset, [item.id for item in items], translate=translate, rotate=rotate,
+                               scale=scale, pivot=pivot, bounds=(20.0, 20.0))
+
+    def test_translate_bumps_row_versions(self):
+        _, changed, missing = self.transform(self.a, self.b, translate=(1, 3))
+        self.assertEqual((len(changed), missing), (2, []))
+        self.a.refresh_from_db()
+        self.assertEqual((self.a.position_x, self.a.position_y, self.a.version), (Decimal('3'), Decimal('5'), 2))
+
+    def test_rows_are_locked_for_the_read(self):
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                               side_effect=QuerySet.select_for_update) as spy:
+            self.transform(self.a, translate=(1, 0))
+        spy.assert_called_once()
+
+    def test_repeated_down_scales_stop_at_the_minimum(self):
+        for _ in range(4):
+            self.transform(self.a, scale=0.1, pivot=(2, 2))
+        self.a.refresh_from_db()
+        self.assertEqual((self.a.scale_x, self.a.scale_y), (Decimal(str(MIN_POSE_SCALE)),) * 2)
+
+    def test_missing_ids_and_out_of_room_results_write_nothing(self):
+        missing_id = uuid.uuid4()
+        _, changed, missing = apply_transform(self.queryset, [self.a.id, missing_id], translate=(1, 0), rotate=0,
+                                              scale=1, pivot=None, bounds=(20.0, 20.0))
+        self.assertEqual((changed, missing), ([], [str(missing_id)]))
+        with self.assertRaises(ValueError):
+            self.transform(self.a, translate=(50, 0))
+        self.a.refresh_from_db()
+        self.assertEqual((self.a.position_x, self.a.version), (Decimal('2'), 1))
+
+
+class TransformViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+
+    def test_conference_rotation_about_a_pivot(self):
+        event = ConferenceEvent.objects.create(user=self.user, name='Gala', room_width=20, room_height=20)
+        element = make_element(event, 'A', x=6, y=5)
+        url = f'/api/conference/events/{event.id}/elements/transform/'
+        response = self.client.post(url, {'ids': [str(element.id)], 'rotate': 90, 'pivot': [5, 5]}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['pivot'], [5, 5])
+        pose = response.data['elements'][0]
+        self.assertEqual((Decimal(pose['position_x']), Decimal(pose['position_y'])), (Decimal(5), Decimal(6)))
+        self.assertEqual(Decimal(pose['rotation']), Decimal(90))
+        event.refresh_from_db()
+        self.assertEqual(event.layout_version, 1)
+
+    def test_tradeshow_errors(self):
+        event = TradeshowEvent.objects.create(user=self.user, name='Expo', hall_width=20, hall_height=20)
+        booth = make_booth(event, 'B1', x=2, y=2)
+        url = f'/api/tradeshow/events/{event.id}/booths/transform/'
+        response = self.client.post(url, {'ids': [str(booth.id), str(uuid.uuid4())], 'translate': [1, 0]},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['missing']), 1)
+        response = self.client.post(url, {'ids': [str(booth.id)], 'translate': [100, 0]}, format='json')
+        self.assertEqual(response.status_code, 400)
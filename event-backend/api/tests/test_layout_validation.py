@@ -0,0 +1,99 @@
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from api.geometry import GridIndex
+from api.layout_validation import validate_layout
+from api.models import ConferenceElement, ConferenceEvent, TradeshowBooth, TradeshowEvent
+
+from .factories import auth_client, make_booth, make_element, make_user
+
+
+def brute_force_pairs(bounds, margin):
+    found = set()
+    for a in range(len(bounds)):
+        for b in range(a + 1, len(bounds)):
+            gap_x = max(bounds[a, 0], bounds[b, 0]) - min(bounds[a, 2], bounds[b, 2])
+            gap_y = max(bounds[a, 1], bounds[b, 1]) - min(bounds[a, 3], bounds[b, 3])
+            if gap_x <= margin and gap_y <= margin:
+                found.add((a, b))
+    return found
+
+
+def random_boxes(rng, count, extent=50.0, size=3.0):
+    corners = rng.random((count, 2)) * extent
+    return np.concatenate([corners, corners + rng.random((count, 2)) * size + 0.1], axis=1)
+
+
+class GridIndexTests(SimpleTestCase):
+    def test_pairs_match_brute_force(self):
+        bounds = random_boxes(np.random.default_rng(4), 120)
+        i, j = GridIndex(bounds).pairs(margin=1.0)
+        self.assertEqual(set(zip(i.tolist(), j.tolist())), brute_force_pairs(bounds, 1.0))
+
+    def test_oversized_boxes_are_checked_directly(self):
+        bounds = random_boxes(np.random.default_rng(5), 60)
+        bounds = np.concatenate([bounds, [[-5, -5, 20000, 20000], [10, 10, 40, 40], [1000, 1000, 1001, 1001]]])
+        i, j = GridIndex(bounds).pairs(margin=0.5)
+        self.assertEqual(set(zip(i.tolist(), j.tolist())), brute_force_pairs(bounds, 0.5))
+
+    def test_one_hall_sized_box_stays_small(self):
+        bounds = np.concatenate([random_boxes(np.random.default_rng(6), 500, extent=200.0, size=1.0),
+                                 [[0, 0, 20000, 20000]]])
+        index = GridIndex(bounds)
+        self.assertLess(index.cell_size, 10)
+        i, j = index.pairs(margin=1.0)
+        self.assertEqual(np.count_nonzero(j == 500), 500)
+
+
+class ValidateLayoutTests(SimpleTestCase):
+    def row(self, label, x, y, w=2.0, h=1.0, rotation=0.0):
+        return {'id': label, 'label': label, 'position_x': x, 'position_y': y, 'width': w, 'height': h,
+                'rotation': rotation, 'scale_x': 1.0, 'scale_y': 1.0}
+
+    def test_overlaps_touching_and_clearance(self):
+        report = validate_layout([
+            self.row('a', 0, 0), self.row('b', 1, 0),      # overlap by 1 m
+            self.row('c', 10, 0), self.row('d', 12, 0),    # touching walls are allowed
+            self.row('e', 20, 0), self.row('f', 22.5, 0),  # 0.5 m gap < clearance
+        ], clearance=0.9)
+        self.assertEqual([(o['a']['id'], o['b']['id'], o['depth']) for o in report['overlaps']], [('a', 'b', 1.0)])
+        self.assertEqual([(v['a']['id'], v['b']['id'], v['gap']) for v in report['clearance_violations']],
+                         [('e', 'f', 0.5)])
+
+    def test_focus_limits_reported_pairs(self):
+        rows = [self.row('a', 0, 0), self.row('b', 1, 0), self.row('c', 10, 0), self.row('d', 11, 0)]
+        report = validate_layout(rows, clearance=0.9, focus={'c'})
+        self.assertEqual([o['a']['id'] for o in report['overlaps']], ['c'])
+
+
+class BulkRollbackTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+
+    def test_invalid_item_rolls_back_earlier_conference_items(self):
+        event = ConferenceEvent.objects.create(user=self.user, name='Gala')
+        existing = make_element(event, 'T1', element_type='table_round')
+        response = self.client.post(f'/api/conference/events/{event.id}/elements/bulk/', {'elements': [
+            {'id': str(existing.id), 'label': 'Renamed'},
+            {'element_type': 'chair', 'label': 'new', 'position_x': 5, 'position_y': 5},
+            {'element_type': 'chair', 'label': 'bad', 'position_x': 'x', 'position_y': 0},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        existing.refresh_from_db()
+        self.assertEqual(existing.label, 'T1')
+        self.assertEqual(ConferenceElement.objects.filter(event=event).count(), 1)
+        event.refresh_from_db()
+        self.assertEqual(event.layout_version, 0)
+
+    def test_invalid_version_rolls_back_earlier_tradeshow_items(self):
+        event = TradeshowEvent.objects.create(user=self.user, name='Expo')
+        make_booth(event, 'B1')
+        response = self.client.post(f'/api/tradeshow/events/{event.id}/booths/bulk/', {'booths': [
+            {'booth_type': 'booth_standard', 'category': 'booth', 'label': 'B2', 'position_x': 9, 'position_y': 9,
+             'width': 3, 'height': 3},
+            {'booth_type': 'booth_standard', 'category': 'booth', 'label': 'B3', 'version': 'old'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('version', response.data)
+        self.assertEqual(TradeshowBooth.objects.filter(event=event).count(), 1)
@@ -0,0 +1,94 @@
+import math
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeout
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from api import pathfinding
+from api.models import TradeshowEvent, TradeshowRoute
+from api.pathfinding import astar, get_walk_grid, route_paths
+
+from .factories import auth_client, make_booth, make_user
+
+
+def inline(fn, *args, timeout=None):
+    return fn(*args)
+
+
+class AStarTests(SimpleTestCase):
+    def test_path_walks_around_a_wall(self):
+        blocked = np.zeros((5, 5), dtype=bool)
+        blocked[0:4, 2] = True
+        cells, length = astar(blocked, (0, 0), (0, 4))
+        self.assertEqual(cells[0], (0, 0))
+        self.assertEqual(cells[-1], (0, 4))
+        self.assertFalse(any(blocked[r, c] for r, c in cells))
+        self.assertGreater(length, 4)
+
+    def test_enclosed_goal_is_unreachable(self):
+        blocked = np.zeros((5, 5), dtype=bool)
+        blocked[1:4, 1:4] = True
+        blocked[2, 2] = False
+        blocked[3, 2] = True
+        self.assertEqual(astar(blocked, (0, 0), (2, 2))[1], math.inf)
+
+
+class RoutePathTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = TradeshowEvent.objects.create(user=self.user, name='Expo', hall_width=20, hall_height=10)
+        self.booths = [str(make_booth(self.event, f'B{k}', x=1 + k * 6, y=2).id) for k in range(3)]
+
+    def test_legs_are_searched_once_and_memoised(self):
+        calls = []
+
+        def counting(fn, *args, timeout=None):
+            calls.append(len(args[1]))
+            return fn(*args)
+
+        with mock.patch.object(pathfinding, 'run_in_worker', counting):
+            first = route_paths(self.event, self.booths)
+            second = route_paths(self.event, self.booths)
+        self.assertEqual(calls, [2])
+        self.assertEqual(first, second)
+        self.assertEqual(len(first['legs']), 2)
+        self.assertEqual(first['unreachable'], [])
+        self.assertGreater(first['total_distance'], 0)
+
+    def test_too_many_legs_are_rejected(self):
+        with mock.patch.object(pathfinding, 'WALKING_PATH_MAX_LEGS', 1):
+            with self.assertRaises(ValueError):
+                route_paths(self.event, self.booths)
+
+    def test_view_reports_limits_and_timeouts(self):
+        route = TradeshowRoute.objects.create(event=self.event, booth_order=self.booths)
+        url = f'/api/tradeshow/events/{self.event.id}/routes/{route.id}/path/'
+        with mock.patch.object(pathfinding, 'WALKING_PATH_MAX_WORK', 1):
+            self.assertEqual(self.client.get(url).status_code, 400)
+        with mock.patch.object(pathfinding, 'run_in_worker', side_effect=FuturesTimeout):
+            self.assertEqual(self.client.get(url).status_code, 503)
+
+    def test_concurrent_requests_share_the_memo(self):
+        grid = get_walk_grid(self.event)
+        grid.max_memo = 1
+        pairs = [(a, b) for a in self.booths for b in self.booths if a != b]
+        failures = []
+
+        def walk():
+            try:
+                for _ in range(20):
+                    grid.legs(pairs)
+            except Exception as exc:  # noqa: BLE001 - any error in a thread fails the test
+                failures.append(exc)
+
+        with mock.patch.object(pathfinding, 'run_in_worker', inline):
+            threads = [threading.Thread(target=walk) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(failures, [])
+        self.assertLessEqual(len(grid._legs), 1)
@@ -0,0 +1,70 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api import views_realtime
+from api.authentication import create_jwt
+from api.models import ConferenceEvent
+from api.realtime import channel_name, get_broker
+from api.views_realtime import websocket_application
+
+from .factories import auth_client, make_user
+
+FAST = {'COALESCE_MS': 1, 'HEARTBEAT_SECONDS': 5}
+
+
+@override_settings(REALTIME=FAST)
+class RealtimeStreamTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.token = create_jwt(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala')
+        # The copy resolved before subscribing; the write below lands before the stream says hello
+        self.stale = ConferenceEvent.objects.get(pk=self.event.pk)
+        ConferenceEvent.objects.filter(pk=self.event.pk).update(layout_version=3, op_seq=7)
+        self.url = f'/api/conference/events/{self.event.id}/stream/'
+
+    def test_stream_needs_the_asgi_server(self):
+        self.assertEqual(auth_client(self.user).get(self.url).status_code, 501)
+
+    async def test_sse_hello_is_read_after_subscribing(self):
+        with mock.patch.object(views_realtime, 'resolve_event', return_value=self.stale):
+            response = await self.async_client.get(self.url, {'token': self.token})
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            stream = aiter(response.streaming_content)
+            first = await asyncio.wait_for(anext(stream), 5)
+        self.assertTrue(first.startswith(b'event: hello\n'))
+        payload = json.loads(first.split(b'data: ', 1)[1])
+        self.assertEqual(payload, {'type': 'hello', 'layout_version': 3, 'seq': 7})
+
+    async def test_sse_rejects_a_bad_token(self):
+        response = await self.async_client.get(self.url, {'token': 'nope'})
+        self.assertEqual(response.status_code, 404)
+
+    async def test_websocket_hello_then_published_frames(self):
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        await inbox.put({'type': 'websocket.connect'})
+        scope = {'type': 'websocket', 'path': f'/ws/conference/events/{self.event.id}/',
+                 'query_string': f'token={self.token}'.encode()}
+        with mock.patch.object(views_realtime, 'resolve_event', return_value=self.stale):
+            task = asyncio.ensure_future(websocket_application(scope, inbox.get, outbox.put))
+            self.assertEqual((await asyncio.wait_for(outbox.get(), 5))['type'], 'websocket.accept')
+            hello = json.loads((await asyncio.wait_for(outbox.get(), 5))['text'])
+            self.assertEqual((hello['layout_version'], hello['seq']), (3, 7))
+
+            get_broker().publish(channel_name(self.event), {'type': 'checkin', 'data': {'id': 'g1'}})
+            frame = json.loads((await asyncio.wait_for(outbox.get(), 5))['text'])
+            self.assertEqual(frame, {'type': 'checkin', 'data': {'id': 'g1'}})
+
+            await inbox.put({'type': 'websocket.disconnect'})
+            await asyncio.wait_for(task, 5)
+        self.assertEqual(get_broker().subscriber_count(channel_name(self.event)), 0)
+
+    async def test_websocket_with_a_bad_token_is_closed(self):
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        await inbox.put({'type': 'websocket.connect'})
+        scope = {'type': 'websocket', 'path': f'/ws/conference/events/{self.event.id}/', 'query_string': b''}
+        await asyncio.wait_for(websocket_application(scope, inbox.get, outbox.put), 5)
+        self.assertEqual(await outbox.get(), {'type': 'websocket.close', 'code': 4403})
@@ -0,0 +1,59 @@
+import uuid
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from api.models import TradeshowEvent, TradeshowRoute
+from api.routing import optimize_order
+
+from .factories import auth_client, make_booth, make_user
+
+
+class OptimizeOrderTests(SimpleTestCase):
+    def test_points_on_a_line_are_visited_in_order(self):
+        xs = np.array([0, 7, 2, 9, 4, 1])
+        dist = np.abs(xs[:, None] - xs[None, :]).astype(float)
+        order, length = optimize_order(dist, start=0)
+        self.assertEqual(order, [0, 5, 2, 4, 1, 3])
+        self.assertEqual(length, 9.0)
+
+
+class RouteViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = TradeshowEvent.objects.create(user=self.user, name='Expo')
+        self.booths = [str(make_booth(self.event, f'B{k}', x=x).id) for k, x in enumerate((0, 20, 10))]
+        self.url = f'/api/tradeshow/events/{self.event.id}/routes/'
+
+    def test_auto_route_is_ordered(self):
+        response = self.client.post(self.url, {'name': 'Tour', 'booth_order': self.booths}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        order = response.data['booth_order']
+        self.assertIn(order, ([self.booths[k] for k in (0, 2, 1)], [self.booths[k] for k in (1, 2, 0)]))
+
+    def test_unknown_booths_are_rejected_on_create(self):
+        missing = str(uuid.uuid4())
+        response = self.client.post(self.url, {'name': 'Tour', 'booth_order': [*self.booths, missing]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(missing, response.data['booth_order'][0])
+        self.assertFalse(TradeshowRoute.objects.exists())
+
+    def test_deleted_booth_does_not_shrink_a_saved_route(self):
+        route = TradeshowRoute.objects.create(event=self.event, booth_order=self.booths)
+        self.event.booths.filter(id=self.booths[1]).delete()
+        response = self.client.patch(f'{self.url}{route.id}/', {'route_type': 'auto'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(self.booths[1], response.data['booth_order'][0])
+        route.refresh_from_db()
+        self.assertEqual(route.booth_order, self.booths)
+
+    def test_optimize_reports_unknown_ids_and_start(self):
+        url = f'{self.url}optimize/'
+        response = self.client.post(url, {'booth_ids': [self.booths[0], 'nope']}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope', response.data['error'])
+        response = self.client.post(url, {'booth_ids': self.booths[:2], 'start': self.booths[2]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {'booth_ids': self.booths, 'start': self.booths[2]}, format='json')
+        self.assertEqual(response.data['booth_order'][0], self.booths[2])
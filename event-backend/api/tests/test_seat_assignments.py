@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from api.models import ConferenceEvent, ConferenceGuest, ConferenceSeatAssignment
+from api.seat_assignments import SeatAssignmentBatch
+from api.utils import parse_flag, parse_uuid
+
+from .factories import auth_client, make_element, make_user
+
+
+class ParseTests(SimpleTestCase):
+    def test_parse_flag(self):
+        self.assertEqual(parse_flag({'dry_run': 'false'}, 'dry_run'), (False, None))
+        self.assertEqual(parse_flag({'dry_run': ' Yes '}, 'dry_run'), (True, None))
+        self.assertEqual(parse_flag({}, 'dry_run', default=True), (True, None))
+        self.assertEqual(parse_flag({'dry_run': 'maybe'}, 'dry_run'), (False, 'dry_run must be a boolean'))
+
+    def test_parse_uuid(self):
+        self.assertIsNone(parse_uuid('not-a-uuid'))
+        self.assertIsNone(parse_uuid(None))
+
+
+class SeatAssignmentBulkTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala')
+        self.table = make_element(self.event, 'T1', element_type='table_round', seats=2)
+        self.ada, self.bob = (ConferenceGuest.objects.create(event=self.event, name=name) for name in ('Ada', 'Bob'))
+        self.url = f'/api/conference/events/{self.event.id}/seat-assignments/bulk/'
+
+    def seat(self, guest, seat_number):
+        return ConferenceSeatAssignment.objects.create(
+            event=self.event, element=self.table, guest=guest, seat_number=seat_number)
+
+    def test_swap_within_one_batch(self):
+        ada, bob = self.seat(self.ada, 1), self.seat(self.bob, 2)
+        response = self.client.post(self.url, {'move': [
+            {'id': str(ada.id), 'seat_number': 2}, {'id': str(bob.id), 'seat_number': 1},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        ada.refresh_from_db()
+        self.assertEqual(ada.seat_number, 2)
+
+    def test_taken_and_out_of_range_seats_conflict(self):
+        self.seat(self.ada, 1)
+        response = self.client.post(self.url, {'create': [
+            {'guest': str(self.bob.id), 'element': str(self.table.id), 'seat_number': 1},
+            {'guest': str(self.bob.id), 'element': str(self.table.id), 'seat_number': 3},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([c['index'] for c in response.data['conflicts']], [0, 1])
+        self.assertEqual(ConferenceSeatAssignment.objects.count(), 1)
+
+    def test_write_between_plan_and_apply_is_a_conflict(self):
+        real_plan = SeatAssignmentBatch.plan
+
+        def plan_then_race(batch, **changes):
+            result = real_plan(batch, **changes)
+            self.seat(self.ada, 2)  # another writer seats Ada before the batch is applied
+            return result
+
+        with mock.patch.object(SeatAssignmentBatch, 'plan', plan_then_race):
+            response = self.client.post(self.url, {'create': [
+                {'guest': str(self.ada.id), 'element': str(self.table.id), 'seat_number': 1},
+            ]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'][0]['index'], None)
+        self.assertEqual(ConferenceSeatAssignment.objects.count(), 0)
@@ -0,0 +1,72 @@
+from django.test import TestCase
+
+from api.models import ConferenceEvent, ConferenceGuest, ConferenceSeatAssignment
+from api.seat_geometry import SEAT_OFFSET, SeatMap
+
+from .factories import auth_client, make_element, make_user
+
+
+class SeatMapTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala')
+
+    def seats(self, element):
+        seat_map = SeatMap([element])
+        return [(round(float(x), 3), round(float(y), 3), round(float(r), 1))
+                for x, y, r in zip(seat_map.x, seat_map.y, seat_map.rotation)]
+
+    def test_round_table_starts_at_twelve_o_clock_clockwise(self):
+        table = make_element(self.event, 'T', element_type='table_round', x=0, y=0, width=2, height=2, seats=4)
+        edge = 1 + SEAT_OFFSET
+        self.assertEqual(self.seats(table), [
+            (1.0, round(1 - edge, 3), 0.0), (round(1 + edge, 3), 1.0, 90.0),
+            (1.0, round(1 + edge, 3), 180.0), (round(1 - edge, 3), 1.0, 270.0),
+        ])
+
+    def test_rectangle_table_fills_top_then_bottom(self):
+        table = make_element(self.event, 'R', element_type='table_rectangle', x=0, y=0, width=3, height=1, seats=5)
+        seats = self.seats(table)
+        self.assertEqual([y for _, y, _ in seats], [-SEAT_OFFSET] * 2 + [1 + SEAT_OFFSET] * 3)
+        self.assertEqual([x for x, _, _ in seats], [0.75, 1.5, 0.75, 1.5, 2.25])
+
+    def test_rotation_turns_seats_with_the_table_and_chairs_seat_at_their_centre(self):
+        table = make_element(self.event, 'T', element_type='table_rectangle', x=0, y=0, width=2, height=1,
+                             seats=2, rotation=90)
+        (x, y, rotation), _ = self.seats(table)
+        self.assertEqual((x, y, rotation), (SEAT_OFFSET, 1.0, 90.0))
+        chair = make_element(self.event, 'C', x=4, y=4, width=0.5, height=0.5, seats=1)
+        self.assertEqual(self.seats(chair), [(4.25, 4.25, 0.0)])
+
+    def test_nearest_skips_excluded_seats(self):
+        table = make_element(self.event, 'T', element_type='table_round', x=0, y=0, width=2, height=2, seats=4)
+        seat_map = SeatMap([table])
+        (first, _), = seat_map.nearest(1, -1, k=1)
+        self.assertEqual(seat_map.seat(first)['seat_number'], 1)
+        (second, _), = seat_map.nearest(1, -1, k=1, exclude={(str(table.id), 1)})
+        self.assertNotEqual(seat_map.seat(second)['seat_number'], 1)
+
+
+class SeatViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala')
+        self.table = make_element(self.event, 'T', element_type='table_round', x=0, y=0, width=2, height=2, seats=4)
+        guest = ConferenceGuest.objects.create(event=self.event, name='Ada')
+        ConferenceSeatAssignment.objects.create(event=self.event, element=self.table, guest=guest, seat_number=1)
+        self.guest = guest
+
+    def test_seats_list_occupants(self):
+        response = self.client.get(f'/api/conference/events/{self.event.id}/seats/')
+        self.assertEqual(len(response.data['seats']), 4)
+        self.assertEqual(response.data['seats'][0]['guest_id'], str(self.guest.id))
+
+    def test_nearest_free_seat(self):
+        url = f'/api/conference/events/{self.event.id}/seats/nearest/'
+        response = self.client.get(url, {'x': 1, 'y': -1, 'free': 'true'})
+        self.assertNotEqual(response.data[0]['seat_number'], 1)
+        response = self.client.get(url, {'x': 1, 'y': -1, 'free': 'false'})
+        self.assertEqual(response.data[0]['seat_number'], 1)
+        self.assertEqual(self.client.get(url, {'x': 1, 'y': -1, 'free': 'maybe'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'x': 'nan', 'y': 0}).status_code, 400)
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from api import views_conference
+from api.models import ConferenceEvent, ConferenceGroup, ConferenceGuest, ConferenceSeatAssignment
+from api.seating_solver import solve, solve_best
+
+from .factories import auth_client, make_element, make_user
+
+
+class SolverTests(SimpleTestCase):
+    def test_groups_stay_together_and_seats_are_unique(self):
+        problem = {
+            'tables': [('t1', 4), ('t2', 4)],
+            'guests': [(f'a{k}', 'A') for k in range(3)] + [(f'b{k}', 'B') for k in range(3)],
+            'pinned': {},
+            'groups': {**{f'a{k}': 'A' for k in range(3)}, **{f'b{k}': 'B' for k in range(3)}},
+        }
+        result = solve_best(problem)
+        self.assertEqual(result['split_groups'], 0)
+        self.assertEqual(result['unseated'], [])
+        seats = list(result['assignments'].values())
+        self.assertEqual(len(set(seats)), len(seats))
+
+    def test_pinned_seats_are_not_reused_and_overflow_is_unseated(self):
+        problem = {
+            'tables': [('t1', 2)],
+            'guests': [('g1', None), ('g2', None)],
+            'pinned': {'p': ('t1', 1)},
+            'groups': {},
+        }
+        result = solve(problem)
+        self.assertEqual(list(result['assignments'].values()), [('t1', 2)])
+        self.assertEqual(len(result['unseated']), 1)
+
+
+class AutoSeatingViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala')
+        self.table = make_element(self.event, 'T1', element_type='table_round', seats=4)
+        group = ConferenceGroup.objects.create(event=self.event, name='Team')
+        self.guests = [ConferenceGuest.objects.create(event=self.event, name=f'G{k}', group=group) for k in range(3)]
+        self.url = f'/api/conference/events/{self.event.id}/seat-assignments/auto/'
+
+    def test_dry_run_writes_nothing(self):
+        response = self.client.post(self.url, {'dry_run': 'true'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['assignments']), 3)
+        self.assertFalse(ConferenceSeatAssignment.objects.exists())
+
+    def test_invalid_pinned_ids_are_rejected(self):
+        response = self.client.post(self.url, {'reseat_all': True, 'pinned': [str(self.guests[0].id), 'nope']},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope', response.data['error'])
+
+    def test_write_during_solve_is_a_conflict(self):
+        def solve_then_race(problem):
+            result = solve_best(problem)
+            ConferenceSeatAssignment.objects.create(
+                event=self.event, element=self.table, guest=self.guests[0], seat_number=4)
+            return result
+
+        with mock.patch.object(views_conference, 'solve_best', solve_then_race):
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(ConferenceSeatAssignment.objects.exists())
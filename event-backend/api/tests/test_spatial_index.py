@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase, TestCase
+
+from api.models import ConferenceEvent
+from api.spatial_index import SpatialIndex, element_indexes, parse_bbox
+
+from .factories import auth_client, make_element, make_user
+
+
+def row(item_id, x, y, w=1.0, h=1.0, item_type='chair'):
+    return {'id': item_id, 'element_type': item_type, 'position_x': x, 'position_y': y, 'width': w, 'height': h,
+            'rotation': 0, 'scale_x': 1, 'scale_y': 1}
+
+
+class SpatialIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SpatialIndex([row(f'c{k}', k * 3, 0) for k in range(10)], 'element_type')
+
+    def test_query_and_nearest(self):
+        self.assertEqual(self.index.query((2.5, -1, 6.5, 1)), {'c1', 'c2'})
+        nearest = [(item_id, round(distance, 2)) for item_id, distance in self.index.nearest(7.2, 0.5, k=2)]
+        self.assertEqual(nearest, [('c2', 0.2), ('c3', 1.8)])
+        self.assertEqual(self.index.nearest(7.2, 0.5, types={'table_round'}), [])
+
+    def test_upsert_moves_and_remove_drops(self):
+        self.index.upsert([row('c0', 100, 100)])
+        self.index.remove(['c1'])
+        self.assertEqual(self.index.query((-1, -1, 4.5, 2)), set())
+        self.assertEqual(self.index.query((99, 99, 101, 101)), {'c0'})
+
+    def test_hall_sized_item_is_not_bucketed(self):
+        buckets = len(self.index.cells)
+        self.index.upsert([row('floor', -10000, -10000, w=20000, h=20000, item_type='custom')])
+        self.assertEqual(len(self.index.cells), buckets)
+        self.assertEqual(self.index.query((50, 50, 51, 51)), {'floor'})
+        self.assertIn('floor', self.index.query((0, 0, 1, 1)))
+        self.assertEqual(self.index.nearest(500, 500, types={'custom'}), [('floor', 0.0)])
+
+        self.index.upsert([row('floor', 40, 40)])
+        self.assertEqual(self.index.large, set())
+        self.assertEqual(self.index.query((40.5, 40.5, 40.6, 40.6)), {'floor'})
+        self.index.remove(['floor'])
+        self.assertEqual(self.index.query((40.5, 40.5, 40.6, 40.6)), set())
+
+    def test_parse_bbox(self):
+        self.assertEqual(parse_bbox('0,1,2,3'), (0.0, 1.0, 2.0, 3.0))
+        for value in ('0,1,2', '2,0,1,3', '0,0,inf,1', 'a,b,c,d'):
+            with self.assertRaises(ValueError):
+                parse_bbox(value)
+
+
+class ElementIndexCacheTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = auth_client(self.user)
+        self.event = ConferenceEvent.objects.create(user=self.user, name='Gala')
+        self.near = make_element(self.event, 'near', x=1, y=1)
+        make_element(self.event, 'far', x=50, y=50)
+
+    def test_viewport_listing(self):
+        url = f'/api/conference/events/{self.event.id}/elements/'
+        response = self.client.get(url, {'bbox': '0,0,5,5'})
+        self.assertEqual([item['label'] for item in response.data], ['near'])
+        self.assertEqual(self.client.get(url, {'bbox': '5,5,0,0'}).status_code, 400)
+
+    def test_write_with_a_version_gap_drops_the_cached_index(self):
+        element_indexes.for_event(self.event)
+        self.event.bump_layout_version()
+        self.event.bump_layout_version()
+        element_indexes.apply(self.event, deletes=[str(self.near.id)])
+        self.assertIsNone(element_indexes.peek(self.event.pk))
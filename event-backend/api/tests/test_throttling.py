@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import CacheBucketStore, InMemoryBucketStore, PublicIPThrottle, refill
+
+
+class RefillTests(SimpleTestCase):
+    def test_empty_bucket_waits_for_one_token(self):
+        allowed, tokens, wait = refill(0.0, 10.0, capacity=5, refill_rate=2.0, now=10.0)
+        self.assertFalse(allowed)
+        self.assertEqual(wait, 0.5)
+
+    def test_refill_is_capped_at_capacity(self):
+        allowed, tokens, _ = refill(0.0, 0.0, capacity=5, refill_rate=2.0, now=100.0)
+        self.assertTrue(allowed)
+        self.assertEqual(tokens, 4.0)
+
+
+class InMemoryBucketStoreTests(SimpleTestCase):
+    def test_burst_then_refill(self):
+        store = InMemoryBucketStore()
+        results = [store.take('k', 3, 1.0, now=0.0)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        self.assertTrue(store.take('k', 3, 1.0, now=1.0)[0])
+
+    def test_idle_buckets_are_evicted_when_full(self):
+        store = InMemoryBucketStore()
+        store.max_keys = 2
+        store.take('a', 3, 1.0, now=0.0)
+        store.take('b', 3, 1.0, now=0.0)
+        store.take('c', 3, 1.0, now=100.0)
+        self.assertEqual(set(store._buckets), {'c'})
+
+
+class CacheBucketStoreTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_window_admits_capacity_requests(self):
+        store = CacheBucketStore()
+        results = [store.take('k', 3, 1.0, now=0.5)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_denied_request_waits_for_the_next_window(self):
+        store = CacheBucketStore()
+        for _ in range(3):
+            store.take('k', 3, 1.0, now=0.5)
+        allowed, wait = store.take('k', 3, 1.0, now=1.0)
+        self.assertFalse(allowed)
+        self.assertEqual(wait, 2.0)
+        self.assertTrue(store.take('k', 3, 1.0, now=3.0)[0])
+
+    def test_counter_evicted_after_add_still_counts(self):
+        store = CacheBucketStore()
+        with mock.patch.object(cache, 'add', return_value=True):
+            self.assertTrue(store.take('k', 3, 1.0, now=0.5)[0])
+        self.assertEqual(cache.get('ratelimit:k:0'), 1)
+
+
+class PublicIPThrottleTests(SimpleTestCase):
+    def ident(self, **headers):
+        request = APIRequestFactory().post('/', REMOTE_ADDR='10.0.0.9', **headers)
+        return PublicIPThrottle().get_bucket_key(request, None)
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 2})
+    def test_spoofed_forwarded_for_is_ignored_behind_the_load_balancer(self):
+        key = self.ident(HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7, 130.211.0.1')
+        self.assertEqual(key, 'ip:203.0.113.7')
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 0})
+    def test_without_proxies_the_socket_address_is_used(self):
+        self.assertEqual(self.ident(HTTP_X_FORWARDED_FOR='1.2.3.4'), 'ip:10.0.0.9')
@@ -0,0 +1,148 @@
+"""
+Token-bucket rate limiting for public (unauthenticated) endpoints
+Kiosk search, QR check-in and share views are throttled per client IP and per event
+"""
+
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+DEFAULT_RATES = {
+    # capacity = burst size, refill_rate = tokens added per second
+    'ip': {'capacity': 30, 'refill_rate': 5.0},
+    'event': {'capacity': 200, 'refill_rate': 40.0},
+}
+
+
+def get_rate(scope):
+    """Return (capacity, refill_rate) for a throttle scope"""
+    rates = getattr(settings, 'PUBLIC_RATE_LIMIT', {}).get('RATES', {})
+    rate = {**DEFAULT_RATES[scope], **rates.get(scope, {})}
+    return float(rate['capacity']), float(rate['refill_rate'])
+
+
+def refill(tokens, last, capacity, refill_rate, now):
+    """Take one token from a bucket, returns (allowed, tokens_left, wait_seconds)"""
+    tokens = min(capacity, tokens + max(0.0, now - last) * refill_rate)
+    if tokens >= 1.0:
+        return True, tokens - 1.0, 0.0
+    return False, tokens, (1.0 - tokens) / refill_rate
+
+
+# ========================================== Bucket Stores ==========================================
+class InMemoryBucketStore:
+    """Buckets held in a per-process dict - cheapest, but each worker counts separately"""
+    max_keys = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.get(key, (capacity, now))
+            allowed, tokens, wait = refill(tokens, last, capacity, refill_rate, now)
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                self._evict(now)
+            self._buckets[key] = (tokens, now)
+        return allowed, wait
+
+    def _evict(self, now):
+        # Drop buckets idle long enough to have refilled completely; fall back to clearing
+        idle = [k for k, (_, last) in self._buckets.items() if now - last > 60]
+        for k in idle:
+            del self._buckets[k]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """Buckets held in the Django cache so limits are shared across server processes and pods.
+
+    Each bucket is a counter per refill window (the time an empty bucket takes to fill up),
+    taken with cache.add/incr, which are atomic on Redis and Memcached - concurrent requests
+    never consume the same token. A window admits `capacity` requests, so the sustained rate
+    matches the token bucket; a burst straddling two windows can reach twice the capacity.
+    """
+    prefix = 'ratelimit'
+
+    def take(self, key, capacity, refill_rate, now=None):
+        now = time.time() if now is None else now
+        window = capacity / refill_rate
+        start = math.floor(now / window)
+        cache_key = f'{self.prefix}:{key}:{start}'
+        # Expire once the window is over
+        cache.add(cache_key, 0, timeout=math.ceil(window) + 1)
+        try:
+            used = cache.incr(cache_key)
+        except ValueError:
+            # Evicted between add and incr
+            cache.set(cache_key, 1, timeout=math.ceil(window) + 1)
+            used = 1
+        if used <= capacity:
+            return True, 0.0
+        return False, (start + 1) * window - now
+
+
+_memory_store = InMemoryBucketStore()
+_cache_store = CacheBucketStore()
+
+
+def get_bucket_store():
+    backend = getattr(settings, 'PUBLIC_RATE_LIMIT', {}).get('BACKEND', 'cache')
+    return _memory_store if backend == 'memory' else _cache_store
+
+
+# ========================================== DRF Throttles ==========================================
+class TokenBucketThrottle(BaseThrottle):
+    """Base throttle - subclasses set `scope` and build the bucket key"""
+    scope = None
+
+    def get_bucket_key(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if not getattr(settings, 'PUBLIC_RATE_LIMIT', {}).get('ENABLED', True):
+            return True
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+        capacity, refill_rate = get_rate(self.scope)
+        allowed, self._wait = get_bucket_store().take(key, capacity, refill_rate)
+        return allowed
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class PublicIPThrottle(TokenBucketThrottle):
+    """Limit a single client (kiosk) regardless of which event it hits"""
+    scope = 'ip'
+
+    def get_bucket_key(self, request, view):
+        return f'ip:{self.get_ident(request)}'
+
+
+class PublicEventThrottle(TokenBucketThrottle):
+    """Limit total public traffic for one event or share link across all clients"""
+    scope = 'event'
+
+    def get_bucket_key(self, request, view):
+        kwargs = getattr(view, 'kwargs', {})
+        target = kwargs.get('event_id') or kwargs.get('share_token')
+        if target is None:
+            return None
+        return f'event:{target}'
+
+
+PUBLIC_THROTTLES = [PublicIPThrottle, PublicEventThrottle]
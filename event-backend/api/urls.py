@@ -1,20 +1,26 @@
 from django.urls import path
 from .views_auth import login, signup
-from .views import designs, designs_detail, design_versions, design_latest, design_version_detail
+from .views import (
+    designs, designs_detail, design_versions, design_latest, design_version_detail, design_storage,
+    designs_export, designs_import,
+)
 from .views_conference import (
-    conference_events, conference_event_detail, conference_event_share,
-    conference_elements, conference_element_detail, conference_elements_bulk,
+    conference_events, conference_event_detail, conference_event_share, conference_event_clone, conference_event_egress,
+    conference_elements, conference_element_detail, conference_elements_bulk, conference_elements_validate,
+    conference_elements_nearest, conference_elements_auto, conference_elements_transform, conference_elements_sync, conference_layout_ops, conference_seats, conference_seats_nearest,
     conference_groups, conference_group_detail,
     conference_guests, conference_guest_detail, conference_guests_import, conference_guest_checkin, conference_guest_search,
-    conference_seat_assignments, conference_seat_assignment_detail,
+    conference_seat_assignments, conference_seat_assignments_bulk, conference_seat_assignments_auto,
+    conference_seat_assignment_detail,
     conference_shared_view
 )
 from .views_tradeshow import (
-    tradeshow_events, tradeshow_event_detail, tradeshow_event_share,
-    tradeshow_booths, tradeshow_booth_detail, tradeshow_booths_bulk,
+    tradeshow_events, tradeshow_event_detail, tradeshow_event_share, tradeshow_event_clone, tradeshow_event_apply_preset,
+    tradeshow_booths, tradeshow_booth_detail, tradeshow_booths_bulk, tradeshow_booths_validate,
+    tradeshow_booths_nearest, tradeshow_booths_transform, tradeshow_booths_sync, tradeshow_layout_ops,
     tradeshow_vendors, tradeshow_vendor_detail, tradeshow_vendors_import, tradeshow_vendor_checkin, tradeshow_vendor_search,
-    tradeshow_booth_assignments, tradeshow_booth_assignment_detail,
-    tradeshow_routes, tradeshow_route_detail,
+    tradeshow_booth_assignments, tradeshow_booth_assignments_auto, tradeshow_booth_assignment_detail,
+    tradeshow_routes, tradeshow_route_optimize, tradeshow_route_detail, tradeshow_route_path,
     tradeshow_shared_view
 )
 from .views_qr_checkin import (
@@ -26,6 +32,7 @@ from .views_schedule import (
     tradeshow_event_sessions, tradeshow_session_detail
 )
 from .views_health import health_check, readiness_check
+from .views_realtime import conference_event_stream, tradeshow_event_stream
 
 urlpatterns = [
     # Health checks (for Kubernetes probes)
@@ -38,19 +45,31 @@ urlpatterns = [
 
     # Designs and versions
     path('designs/', designs, name='designs'),
+    path('designs/export/', designs_export, name='designs-export'),
+    path('designs/import/', designs_import, name='designs-import'),
     path('designs/<int:design_id>/', designs_detail, name='designs-detail'),
     path('designs/<int:design_id>/versions/', design_versions, name='design-versions'),
     path('designs/<int:design_id>/latest/', design_latest, name='design-latest'),
     path('designs/<int:design_id>/versions/<int:version>/', design_version_detail, name='design-version-detail'),
+    path('designs/<int:design_id>/storage/', design_storage, name='design-storage'),
 
     # Conference Events
     path('conference/events/', conference_events, name='conference-events'),
     path('conference/events/<uuid:event_id>/', conference_event_detail, name='conference-event-detail'),
     path('conference/events/<uuid:event_id>/share/', conference_event_share, name='conference-event-share'),
+    path('conference/events/<uuid:event_id>/clone/', conference_event_clone, name='conference-event-clone'),
 
     # Conference Elements
+    path('conference/events/<uuid:event_id>/egress/', conference_event_egress, name='conference-event-egress'),
     path('conference/events/<uuid:event_id>/elements/', conference_elements, name='conference-elements'),
     path('conference/events/<uuid:event_id>/elements/bulk/', conference_elements_bulk, name='conference-elements-bulk'),
+    path('conference/events/<uuid:event_id>/elements/auto/', conference_elements_auto, name='conference-elements-auto'),
+    path('conference/events/<uuid:event_id>/elements/transform/', conference_elements_transform, name='conference-elements-transform'),
+    path('conference/events/<uuid:event_id>/elements/sync/', conference_elements_sync, name='conference-elements-sync'),
+    path('conference/events/<uuid:event_id>/ops/', conference_layout_ops, name='conference-layout-ops'),
+    path('conference/events/<uuid:event_id>/stream/', conference_event_stream, name='conference-event-stream'),
+    path('conference/events/<uuid:event_id>/elements/validate/', conference_elements_validate, name='conference-elements-validate'),
+    path('conference/events/<uuid:event_id>/elements/nearest/', conference_elements_nearest, name='conference-elements-nearest'),
     path('conference/events/<uuid:event_id>/elements/<uuid:element_id>/', conference_element_detail, name='conference-element-detail'),
 
     # Conference Groups
@@ -65,7 +84,11 @@ urlpatterns = [
     path('conference/events/<uuid:event_id>/guests/<uuid:guest_id>/checkin/', conference_guest_checkin, name='conference-guest-checkin'),
 
     # Conference Seat Assignments
+    path('conference/events/<uuid:event_id>/seats/', conference_seats, name='conference-seats'),
+    path('conference/events/<uuid:event_id>/seats/nearest/', conference_seats_nearest, name='conference-seats-nearest'),
     path('conference/events/<uuid:event_id>/seat-assignments/', conference_seat_assignments, name='conference-seat-assignments'),
+    path('conference/events/<uuid:event_id>/seat-assignments/bulk/', conference_seat_assignments_bulk, name='conference-seat-assignments-bulk'),
+    path('conference/events/<uuid:event_id>/seat-assignments/auto/', conference_seat_assignments_auto, name='conference-seat-assignments-auto'),
     path('conference/events/<uuid:event_id>/seat-assignments/<uuid:assignment_id>/', conference_seat_assignment_detail, name='conference-seat-assignment-detail'),
 
     # Conference Sessions (Schedule/Agenda)
@@ -76,10 +99,18 @@ urlpatterns = [
     path('tradeshow/events/', tradeshow_events, name='tradeshow-events'),
     path('tradeshow/events/<uuid:event_id>/', tradeshow_event_detail, name='tradeshow-event-detail'),
     path('tradeshow/events/<uuid:event_id>/share/', tradeshow_event_share, name='tradeshow-event-share'),
+    path('tradeshow/events/<uuid:event_id>/clone/', tradeshow_event_clone, name='tradeshow-event-clone'),
+    path('tradeshow/events/<uuid:event_id>/apply_preset/', tradeshow_event_apply_preset, name='tradeshow-event-apply-preset'),
 
     # Tradeshow Booths
     path('tradeshow/events/<uuid:event_id>/booths/', tradeshow_booths, name='tradeshow-booths'),
     path('tradeshow/events/<uuid:event_id>/booths/bulk/', tradeshow_booths_bulk, name='tradeshow-booths-bulk'),
+    path('tradeshow/events/<uuid:event_id>/booths/transform/', tradeshow_booths_transform, name='tradeshow-booths-transform'),
+    path('tradeshow/events/<uuid:event_id>/booths/sync/', tradeshow_booths_sync, name='tradeshow-booths-sync'),
+    path('tradeshow/events/<uuid:event_id>/ops/', tradeshow_layout_ops, name='tradeshow-layout-ops'),
+    path('tradeshow/events/<uuid:event_id>/stream/', tradeshow_event_stream, name='tradeshow-event-stream'),
+    path('tradeshow/events/<uuid:event_id>/booths/validate/', tradeshow_booths_validate, name='tradeshow-booths-validate'),
+    path('tradeshow/events/<uuid:event_id>/booths/nearest/', tradeshow_booths_nearest, name='tradeshow-booths-nearest'),
     path('tradeshow/events/<uuid:event_id>/booths/<uuid:booth_id>/', tradeshow_booth_detail, name='tradeshow-booth-detail'),
 
     # Tradeshow Vendors
@@ -91,11 +122,14 @@ urlpatterns = [
 
     # Tradeshow Booth Assignments
     path('tradeshow/events/<uuid:event_id>/booth-assignments/', tradeshow_booth_assignments, name='tradeshow-booth-assignments'),
+    path('tradeshow/events/<uuid:event_id>/booth-assignments/auto/', tradeshow_booth_assignments_auto, name='tradeshow-booth-assignments-auto'),
     path('tradeshow/events/<uuid:event_id>/booth-assignments/<uuid:assignment_id>/', tradeshow_booth_assignment_detail, name='tradeshow-booth-assignment-detail'),
 
     # Tradeshow Routes
     path('tradeshow/events/<uuid:event_id>/routes/', tradeshow_routes, name='tradeshow-routes'),
+    path('tradeshow/events/<uuid:event_id>/routes/optimize/', tradeshow_route_optimize, name='tradeshow-route-optimize'),
     path('tradeshow/events/<uuid:event_id>/routes/<uuid:route_id>/', tradeshow_route_detail, name='tradeshow-route-detail'),
+    path('tradeshow/events/<uuid:event_id>/routes/<uuid:route_id>/path/', tradeshow_route_path, name='tradeshow-route-path'),
 
     # Tradeshow Sessions (Schedule/Agenda)
     path('tradeshow/events/<uuid:event_id>/sessions/', tradeshow_event_sessions, name='tradeshow-event-sessions'),
@@ -0,0 +1,28 @@
+"""
+Request parsing helpers shared by the API views
+"""
+
+import uuid
+
+
+def parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+TRUE_VALUES = (True, 1, 'true', '1', 'yes', 'on')
+FALSE_VALUES = (False, 0, 'false', '0', 'no', 'off', '')
+
+
+def parse_flag(data, key, default=False):
+    """Return (flag, error) for an optional boolean body field - "false" and "0" are false"""
+    value = data.get(key, default)
+    if isinstance(value, str):
+        value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True, None
+    if value in FALSE_VALUES or value is None:
+        return False, None
+    return default, f'{key} must be a boolean'
@@ -2,9 +2,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Max
+from django.utils import timezone
 from .models import Design, DesignVersion
+from .design_archive import export_archive, import_archive
+from .design_store import create_version, delete_design, snapshot, storage_report
 from django.contrib.auth import get_user_model
 import secrets
 
@@ -21,7 +24,7 @@ def designs(request):
     if request.method == "GET":
         qs = (
             Design.objects.filter(user=user)
-            .annotate(latest_version=Max("versions__version"))
+            .only("id", "name", "kind", "updated_at", "latest_version")
             .order_by("-updated_at", "-id")
         )
         data = [
@@ -30,7 +33,7 @@ def designs(request):
                 "name": d.name,
                 "kind": d.kind,
                 "updated_at": d.updated_at,
-                "latest_version": d.latest_version or 0,
+                "latest_version": d.latest_version,
             }
             for d in qs
         ]
@@ -51,7 +54,7 @@ def designs(request):
         "name": obj.name,
         "kind": obj.kind,
         "updated_at": obj.updated_at,
-        "latest_version": obj.versions.aggregate(Max("version")).get("version__max") or 0,
+        "latest_version": obj.latest_version,
     }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
 @api_view(["PATCH", "DELETE"])
@@ -79,11 +82,11 @@ def designs_detail(request, design_id):
             "name": design.name,
             "kind": design.kind,
             "updated_at": design.updated_at,
-            "latest_version": design.versions.aggregate(Max("version")).get("version__max") or 0,
+            "latest_version": design.latest_version,
         })
 
     # DELETE
-    design.delete()
+    delete_design(design)
     return Response(status=204)
 
 
@@ -115,11 +118,11 @@ def design_versions(request, design_id):
         return Response({"detail": "data required"}, status=400)
     note = (request.data.get("note") or "").strip()
 
-    latest = design.versions.aggregate(Max("version")).get("version__max") or 0
-    v = DesignVersion.objects.create(design=design, version=latest + 1, data=data, note=note)
-    # touch updated_at
-    Design.objects.filter(id=design.id).update(updated_at=v.created_at)
-
+    # Also moves the design's head and touches updated_at
+    v, created = create_version(design, data, note)
+    if not created:
+        # Same content as the latest version (autosave) - nothing was written
+        return Response({"version": v.version, "created_at": v.created_at, "note": v.note, "unchanged": True})
     return Response({"version": v.version, "created_at": v.created_at, "note": v.note}, status=201)
 
 
@@ -127,11 +130,11 @@ def design_versions(request, design_id):
 @permission_classes([IsAuthenticated])
 def design_latest(request, design_id):
     """Fetch latest version data for a design (owner only)."""
-    design = get_object_or_404(Design, id=design_id, user=request.user)
-    latest = design.versions.order_by("-version").first()
+    design = get_object_or_404(Design.objects.select_related("head"), id=design_id, user=request.user)
+    latest = design.head
     if not latest:
         return Response({"version": 0, "data": {"items": []}})
-    return Response({"version": latest.version, "data": latest.data})
+    return Response({"version": latest.version, "data": snapshot(latest)})
 
 
 @api_view(["GET"])
@@ -140,7 +143,64 @@ def design_version_detail(request, design_id, version):
     """Fetch specific version data (owner only)."""
     design = get_object_or_404(Design, id=design_id, user=request.user)
     v = get_object_or_404(DesignVersion, design=design, version=version)
-    return Response({"version": v.version, "data": v.data, "note": v.note, "created_at": v.created_at})
+    return Response({"version": v.version, "data": snapshot(v), "note": v.note, "created_at": v.created_at})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def design_storage(request, design_id):
+    """Storage used by a design's versions and how much deduplication and compression saved."""
+    design = get_object_or_404(Design, id=design_id, user=request.user)
+    return Response(storage_report(design))
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def designs_export(request):
+    """Stream designs with their full version history as a .ndjson.gz archive.
+
+    Query: ids=1,2,... (optional, defaults to all of the user's designs)
+    """
+    qs = Design.objects.filter(user=request.user).order_by("id")
+    ids = request.query_params.get("ids")
+    if ids:
+        try:
+            ids = {int(i) for i in ids.split(",") if i.strip()}
+        except ValueError:
+            return Response({"detail": "ids must be a comma-separated list of design ids"}, status=400)
+        qs = qs.filter(id__in=ids)
+        if qs.count() != len(ids):
+            return Response({"detail": "Not found."}, status=404)
+    response = StreamingHttpResponse(export_archive(qs), content_type="application/gzip")
+    filename = f"designs-{timezone.now():%Y%m%d-%H%M%S}.ndjson.gz"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def designs_import(request):
+    """Create designs from an archive produced by designs_export (multipart field "file").
+
+    Names already in use get a " (n)" suffix; nothing is created if any line is invalid.
+    """
+    archive = request.FILES.get("file")
+    if not archive:
+        return Response({"detail": "file required"}, status=400)
+    try:
+        created = import_archive(request.user, archive)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=400)
+    return Response([
+        {
+            "id": d.id,
+            "name": d.name,
+            "kind": d.kind,
+            "updated_at": d.updated_at,
+            "latest_version": d.latest_version,
+        }
+        for d in created
+    ], status=status.HTTP_201_CREATED)
 
 
 @api_view(["POST"])
@@ -1,14 +1,35 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from django.db.models import Count
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from .models import (
     ConferenceEvent, ConferenceElement, ConferenceGroup,
-    ConferenceGuest, ConferenceSeatAssignment
+    ConferenceGuest, ConferenceSeatAssignment, ConferenceLayoutOperation
 )
+from .egress import egress_report
+from .event_clone import clone_conference_event, parse_clone_name
+from .geometry import GEOMETRY_FIELDS
+from .invalidation import bump_generation, event_key, owned_event_or_404, search_results, snapshots
+from .layout_generator import build_problem, generate, layout_spec, units_to_elements
+from .layout_edits import (
+    LayoutSync, apply_transform, conditional_update, expected_version, parse_transform, parse_version, pose_data,
+    version_headers,
+)
+from .layout_ops import LayoutOpLog, compact_if_due, entry_data
+from .layout_validation import (
+    VALIDATION_MODES, get_clearance, has_violations, validation_headers, validate_conference_layout
+)
+from .realtime import publish_assignments, publish_checkin, publish_layout
+from .seat_assignments import CONCURRENT_CONFLICT, SeatAssignmentBatch, lock_seating, seat_occupants
+from .seat_geometry import SEAT_OFFSET, SEATED_TYPES, get_seat_map
+from .seating_solver import solve_best
+from .spatial_index import element_indexes, parse_bbox, parse_point
+from .throttling import PUBLIC_THROTTLES
+from .utils import parse_flag, parse_uuid
 from .serializers import (
     ConferenceEventSerializer, ConferenceEventListSerializer,
     ConferenceElementSerializer, ConferenceGroupSerializer,
@@ -53,7 +74,9 @@ def conference_event_detail(request, event_id):
         serializer = ConferenceEventSerializer(event, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            if {'room_width', 'room_height'} & set(request.data):
+                event.bump_layout_version()
+            return Response(ConferenceEventSerializer(event).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
@@ -70,26 +93,78 @@ def conference_event_share(request, event_id):
     return Response({'share_token': event.share_token})
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def conference_event_clone(request, event_id):
+    """Duplicate an event as a template: layout, groups and sessions, optionally guests and seating.
+
+    Body: {name?, include_guests?: bool (default false)}
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    name, error = parse_clone_name(request.data, ConferenceEvent)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    include_guests, error = parse_flag(request.data, 'include_guests')
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    copy, counts = clone_conference_event(event, request.user, name=name, include_guests=include_guests)
+    return Response({**ConferenceEventSerializer(copy).data, 'copied': counts}, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def conference_event_egress(request, event_id):
+    """Walking distance from every table to the nearest door, with a distance heatmap.
+
+    Query: ?heatmap=false to omit the per-cell grid
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    include_heatmap, error = parse_flag(request.query_params, 'heatmap', default=True)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(egress_report(event, include_heatmap=include_heatmap))
+
+
 # ========================================== Conference Element Views ==========================================
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def conference_elements(request, event_id):
     """List all elements for an event or create new ones"""
-    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    event = owned_event_or_404(ConferenceEvent, event_id, request.user)
 
     if request.method == 'GET':
         elements = ConferenceElement.objects.filter(event=event).order_by('created_at')
+        if 'bbox' in request.query_params:
+            # Viewport query: only elements whose bounding boxes intersect the visible area
+            try:
+                bbox = parse_bbox(request.query_params['bbox'])
+            except ValueError:
+                return Response({'error': 'bbox must be min_x,min_y,max_x,max_y'}, status=status.HTTP_400_BAD_REQUEST)
+            elements = elements.filter(id__in=element_indexes.for_event(event).query(bbox))
         serializer = ConferenceElementSerializer(elements, many=True)
-        return Response(serializer.data)
+        # Log position the listing reflects - clients resume the operation log from here
+        return Response(serializer.data, headers={'X-Layout-Seq': str(event.op_seq)})
 
     # POST - create new element
     serializer = ConferenceElementSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(event=event)
+        event.bump_layout_version()
+        element_indexes.apply(event, upserts=[serializer.data])
+        publish_layout(event, upserts=[serializer.data])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def element_conflict(event, element_id):
+    """409 for a write based on an outdated version, with the current row to merge against"""
+    current = ConferenceElement.objects.filter(id=element_id, event=event).first()
+    if current is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'error': 'Element was changed by another edit', 'current': ConferenceElementSerializer(current).data},
+                    status=status.HTTP_409_CONFLICT, headers=version_headers(current))
+
+
 @api_view(['GET', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def conference_element_detail(request, event_id, element_id):
@@ -99,33 +174,61 @@ def conference_element_detail(request, event_id, element_id):
 
     if request.method == 'GET':
         serializer = ConferenceElementSerializer(element)
-        return Response(serializer.data)
+        return Response(serializer.data, headers=version_headers(element))
 
-    elif request.method == 'PATCH':
+    # Writes are conditional when the client sends If-Match: "<version>" (or a version field)
+    try:
+        expected = expected_version(request, request.data if request.method == 'PATCH' else None)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'PATCH':
         serializer = ConferenceElementSerializer(element, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+            if not conditional_update(element, serializer.validated_data, expected):
+                return element_conflict(event, element_id)
+            event.bump_layout_version()
+            element_indexes.apply(event, upserts=[serializer.data])
+            publish_layout(event, upserts=[serializer.data])
+            return Response(serializer.data, headers=version_headers(element))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
-        element.delete()
+        rows = ConferenceElement.objects.filter(id=element_id, event=event)
+        if expected is not None:
+            rows = rows.filter(version=expected)
+        if not rows.delete()[0]:
+            return element_conflict(event, element_id)
+        event.bump_layout_version()
+        element_indexes.apply(event, deletes=[element_id])
+        publish_layout(event, deletes=[element_id])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@transaction.atomic
 def conference_elements_bulk(request, event_id):
     """Bulk create/update elements - only creates new elements, doesn't delete existing ones"""
     event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
     elements_data = request.data.get('elements', [])
+    mode = request.data.get('validation', 'report')
+    if mode not in VALIDATION_MODES:
+        return Response({'error': f"validation must be one of {', '.join(VALIDATION_MODES)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
 
     created_elements = []
-    for element_data in elements_data:
+    conflicts = []
+    for index, element_data in enumerate(elements_data):
         element_data['event'] = str(event.id)
         
         # Check if element has an ID (if it's a valid UUID, try to update; otherwise create new)
         element_id = element_data.get('id')
+        try:
+            expected = parse_version(element_data.get('version'))
+        except ValueError as exc:
+            transaction.set_rollback(True)
+            return Response({'version': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
         if element_id:
             try:
                 # Try to get existing element
@@ -133,9 +236,14 @@ def conference_elements_bulk(request, event_id):
                 # Update existing element
                 serializer = ConferenceElementSerializer(existing_element, data=element_data, partial=True)
                 if serializer.is_valid():
-                    element = serializer.save()
-                    created_elements.append(serializer.data)
+                    # Items carrying the version they were read at are only written if it is still current
+                    if conditional_update(existing_element, serializer.validated_data, expected):
+                        created_elements.append(serializer.data)
+                    else:
+                        conflicts.append({'index': index, 'id': str(element_id),
+                                          'errors': ['changed by another edit; reload and retry']})
                 else:
+                    transaction.set_rollback(True)
                     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             except (ConferenceElement.DoesNotExist, ValueError):
                 # Element doesn't exist or invalid UUID, create new one
@@ -145,6 +253,7 @@ def conference_elements_bulk(request, event_id):
                     element = serializer.save(event=event)
                     created_elements.append(serializer.data)
                 else:
+                    transaction.set_rollback(True)
                     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         else:
             # No ID provided, create new element
@@ -153,9 +262,291 @@ def conference_elements_bulk(request, event_id):
                 element = serializer.save(event=event)
                 created_elements.append(serializer.data)
             else:
+                transaction.set_rollback(True)
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    return Response(created_elements, status=status.HTTP_201_CREATED)
+    if conflicts:
+        current = dict(ConferenceElement.objects.filter(event=event, id__in=[c['id'] for c in conflicts])
+                       .values_list('id', 'version'))
+        for conflict in conflicts:
+            conflict['version'] = current.get(parse_uuid(conflict['id']))
+        transaction.set_rollback(True)
+        return Response({'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+
+    headers = {}
+    if mode != 'off':
+        # Only pairs touching the submitted items are reported, so untouched legacy layouts stay quiet
+        report = validate_conference_layout(event, focus={item['id'] for item in created_elements})
+        if mode == 'strict' and has_violations(report):
+            transaction.set_rollback(True)
+            return Response({'error': 'Layout validation failed', 'validation': report},
+                            status=status.HTTP_400_BAD_REQUEST)
+        headers = validation_headers(report)
+
+    event.bump_layout_version()
+    element_indexes.apply(event, upserts=created_elements)
+    publish_layout(event, upserts=created_elements)
+    return Response(created_elements, status=status.HTTP_201_CREATED, headers=headers)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@transaction.atomic
+def conference_elements_sync(request, event_id):
+    """Replace the stored layout with the submitted one, writing only the difference.
+
+    Body: {elements: [element], validation?: 'report' | 'strict' | 'off', dry_run?: bool}
+    Elements without a known id are created, stored elements missing from the list are deleted and
+    changed elements are updated. Unchanged elements are detected by content hash and never written.
+    Items carrying the version they were read at get 409 conflicts once the stored row moved on.
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    items = request.data.get('elements')
+    if not isinstance(items, list):
+        return Response({'error': 'elements must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+    mode = request.data.get('validation', 'report')
+    if mode not in VALIDATION_MODES:
+        return Response({'error': f"validation must be one of {', '.join(VALIDATION_MODES)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    dry_run, error = parse_flag(request.data, 'dry_run')
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    sync = LayoutSync(event, ConferenceElementSerializer)
+    plan, errors, conflicts = sync.plan(items)
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    if conflicts:
+        return Response({'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+    changed = plan['create'] or plan['update'] or plan['delete']
+    if dry_run or not changed:
+        return Response({**sync.result(plan), 'dry_run': dry_run})
+
+    sync.apply(plan)
+    result = sync.result(plan)
+    headers = {}
+    if mode != 'off':
+        touched = {item['id'] for item in result['created']} | {item['id'] for item in result['updated']}
+        report = validate_conference_layout(event, focus=touched)
+        if mode == 'strict' and has_violations(report):
+            transaction.set_rollback(True)
+            return Response({'error': 'Layout validation failed', 'validation': report},
+                            status=status.HTTP_400_BAD_REQUEST)
+        headers = validation_headers(report)
+
+    event.bump_layout_version()
+    element_indexes.apply(event, upserts=[*result['created'], *result['updated']], deletes=result['deleted'])
+    publish_layout(event, upserts=[*result['created'], *result['updated']], deletes=result['deleted'])
+    return Response({**result, 'dry_run': False}, headers=headers)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def conference_elements_validate(request, event_id):
+    """Report overlapping elements and clearance violations across the whole layout"""
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    return Response(validate_conference_layout(event))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def conference_elements_nearest(request, event_id):
+    """Closest elements to a canvas point, nearest first.
+
+    Query: ?x=&y=&k=1&type=element_type[,element_type...]
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    try:
+        x, y = parse_point(request.query_params)
+        k = min(max(int(request.query_params.get('k', 1)), 1), 100)
+    except (KeyError, ValueError):
+        return Response({'error': 'x and y are required numbers, k an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    types = set(request.query_params['type'].split(',')) if request.query_params.get('type') else None
+
+    found = element_indexes.for_event(event).nearest(x, y, k=k, types=types)
+    elements = {str(item.id): item for item in ConferenceElement.objects.filter(id__in=[item_id for item_id, _ in found])}
+    return Response([
+        {**ConferenceElementSerializer(elements[item_id]).data, 'distance': round(distance, 2)}
+        for item_id, distance in found if item_id in elements
+    ])
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def conference_seats(request, event_id):
+    """Coordinates of every seat in the layout, with the guest currently assigned to it"""
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    seat_map = get_seat_map(event)
+    occupied = seat_occupants(event)
+    seats = seat_map.as_list()
+    for seat in seats:
+        seat['guest_id'] = occupied.get((seat['element_id'], seat['seat_number']))
+    return Response({'layout_version': event.layout_version, 'seat_offset': SEAT_OFFSET, 'seats': seats})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def conference_seats_nearest(request, event_id):
+    """Closest seats to a canvas point, for snapping guests onto seats.
+
+    Query: ?x=&y=&k=1&free=true (free=true skips occupied seats)
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    try:
+        x, y = parse_point(request.query_params)
+        k = min(max(int(request.query_params.get('k', 1)), 1), 100)
+    except (KeyError, ValueError):
+        return Response({'error': 'x and y are required numbers, k an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    free_only, error = parse_flag(request.query_params, 'free')
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    seat_map = get_seat_map(event)
+    occupied = seat_occupants(event)
+    found = seat_map.nearest(x, y, k=k, exclude=occupied.keys() if free_only else ())
+    results = []
+    for i, distance in found:
+        seat = seat_map.seat(i)
+        seat['guest_id'] = occupied.get((seat['element_id'], seat['seat_number']))
+        seat['distance'] = round(distance, 3)
+        results.append(seat)
+    return Response(results)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def conference_elements_auto(request, event_id):
+    """Generate a banquet, classroom or theatre layout for a headcount around the existing room features.
+
+    Body: {style, headcount, table_type?, seats_per_table?, table_width?, table_height?,
+           replace?: bool, dry_run?: bool}
+    With replace, existing tables and chairs are removed (with their seat assignments) and re-laid.
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    dry_run, dry_run_error = parse_flag(request.data, 'dry_run')
+    replace, replace_error = parse_flag(request.data, 'replace')
+    if dry_run_error or replace_error:
+        return Response({'error': dry_run_error or replace_error}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        headcount = int(request.data.get('headcount'))
+        if headcount <= 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        return Response({'error': 'headcount must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        spec = layout_spec(
+            request.data.get('style', 'banquet'),
+            table_type=request.data.get('table_type'),
+            seats=request.data.get('seats_per_table'),
+            width=request.data.get('table_width'),
+            height=request.data.get('table_height'),
+        )
+        existing = list(ConferenceElement.objects.filter(event=event).values('id', 'element_type', *GEOMETRY_FIELDS))
+        replaced = [e['id'] for e in existing if replace and e['element_type'] in SEATED_TYPES]
+        kept = [e for e in existing if not (replace and e['element_type'] in SEATED_TYPES)]
+        problem = build_problem(float(event.room_width), float(event.room_height), kept, spec, headcount,
+                                get_clearance('conference'))
+    except (TypeError, ValueError) as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    centres = generate(problem, spec)
+    start = 1 + sum(1 for e in kept if e['element_type'] in ConferenceElement.TABLE_TYPES)
+    elements = units_to_elements(centres, spec, start_number=start)
+
+    summary = {
+        'dry_run': dry_run,
+        'style': spec['style'],
+        'units': len(elements),
+        'seats': len(elements) * spec['seats'],
+        'headcount': headcount,
+        'shortfall': max(headcount - len(elements) * spec['seats'], 0),
+        'removed': len(replaced),
+    }
+    if dry_run:
+        return Response({**summary, 'elements': elements})
+
+    with transaction.atomic():
+        if replaced:
+            ConferenceElement.objects.filter(id__in=replaced).delete()
+        created = ConferenceElement.objects.bulk_create([ConferenceElement(event=event, **e) for e in elements])
+    event.bump_layout_version()
+    data = ConferenceElementSerializer(created, many=True).data
+    element_indexes.apply(event, upserts=data, deletes=replaced)
+    publish_layout(event, upserts=data, deletes=replaced)
+    return Response({**summary, 'elements': data}, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def conference_elements_transform(request, event_id):
+    """Move, rotate and/or scale a selection of elements in one request.
+
+    Body: {ids: [id], translate?: [dx, dy], rotate?: degrees, scale?: factor, pivot?: [x, y]}
+    Rotation and scaling happen about the pivot (default: centre of the selection), then the
+    translation is applied. Only the elements whose geometry changed are returned.
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    try:
+        ids, params = parse_transform(request.data)
+    except (TypeError, ValueError) as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        pivot, changed, missing = apply_transform(
+            ConferenceElement.objects.filter(event=event), ids, **params,
+            bounds=(float(event.room_width), float(event.room_height)),
+        )
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if missing:
+        return Response({'error': 'Some elements were not found', 'missing': missing}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = [pose_data(item, 'element_type') for item in changed]
+    if changed:
+        event.bump_layout_version()
+        element_indexes.apply(event, upserts=data)
+        publish_layout(event, upserts=data)
+    return Response({'pivot': [round(pivot[0], 2), round(pivot[1], 2)], 'elements': data})
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def conference_layout_ops(request, event_id):
+    """Read or append to the event's layout operation log.
+
+    GET ?since=N&limit=M - entries after seq N; {reset: true} means reload the layout instead
+    POST {ops: [{op: add|move|update|delete, id?, data?, version?}], client_id?} - applied in order, all or
+        nothing; ops carrying the row version they were made against get 409 conflicts once it moved on
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    log = LayoutOpLog(event, ConferenceElementSerializer, ConferenceLayoutOperation)
+
+    if request.method == 'GET':
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = min(max(int(request.query_params.get('limit', 1000)), 1), 1000)
+            if since < 0:
+                raise ValueError('since must not be negative')
+            tail = log.since(since, limit)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**tail, 'ops': [entry_data(entry) for entry in tail['ops']]})
+
+    # POST - append a batch
+    ops = request.data.get('ops')
+    if not isinstance(ops, list) or not ops:
+        return Response({'error': 'ops must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    plan, logged, errors, conflicts = log.write(ops, client_id=str(request.data.get('client_id', ''))[:64])
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    if conflicts:
+        return Response({'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+
+    upserts = [pose_data(item, 'element_type') for item in [*plan['create'], *plan['update']]]
+    element_indexes.apply(event, upserts=upserts, deletes=plan['delete'])
+    publish_layout(event, upserts=ConferenceElementSerializer([*plan['create'], *plan['update']], many=True).data, deletes=plan['delete'])
+    compact_if_due(event, ConferenceLayoutOperation)
+    return Response({'seq': event.op_seq, 'ops': [entry_data(entry) for entry in logged]},
+                    status=status.HTTP_201_CREATED)
 
 
 # ========================================== Conference Group Views ==========================================
@@ -200,6 +591,7 @@ def conference_group_detail(request, event_id, group_id):
 
     elif request.method == 'DELETE':
         group.delete()
+        bump_generation(event)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -243,6 +635,7 @@ def conference_guest_detail(request, event_id, guest_id):
 
     elif request.method == 'DELETE':
         guest.delete()
+        bump_generation(event)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -310,28 +703,31 @@ def conference_guest_checkin(request, event_id, guest_id):
     guest.save()
 
     serializer = ConferenceGuestSerializer(guest)
+    publish_checkin(event, serializer.data)
     return Response(serializer.data)
 
 
 @api_view(['GET'])
+@throttle_classes(PUBLIC_THROTTLES)
 def conference_guest_search(request, event_id):
     """Public endpoint to search guests by name or email for kiosk check-in"""
     query = request.query_params.get('q', '').strip()
     if not query:
         return Response({'error': 'Query parameter required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    event = get_object_or_404(ConferenceEvent, id=event_id)
-
-    guests = ConferenceGuest.objects.filter(
-        event=event
-    ).filter(
-        name__icontains=query
-    ) | ConferenceGuest.objects.filter(
-        event=event, email__icontains=query
-    )
+    def search():
+        event = get_object_or_404(ConferenceEvent, id=event_id)
+        guests = ConferenceGuest.objects.filter(
+            event=event
+        ).filter(
+            name__icontains=query
+        ) | ConferenceGuest.objects.filter(
+            event=event, email__icontains=query
+        )
+        return ConferenceGuestSerializer(guests[:10], many=True).data
 
-    serializer = ConferenceGuestSerializer(guests[:10], many=True)
-    return Response(serializer.data)
+    # Kiosks repeat the same few prefixes; results live until the event's guests change
+    return Response(search_results.get(event_key(ConferenceEvent, event_id), query.lower(), search))
 
 
 # ========================================== Conference Seat Assignment Views ==========================================
@@ -350,6 +746,7 @@ def conference_seat_assignments(request, event_id):
     serializer = ConferenceSeatAssignmentSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(event=event)
+        publish_assignments(event, upserts=[serializer.data])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -361,16 +758,145 @@ def conference_seat_assignment_detail(request, event_id, assignment_id):
     event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
     assignment = get_object_or_404(ConferenceSeatAssignment, id=assignment_id, event=event)
     assignment.delete()
+    bump_generation(event)
+    publish_assignments(event, deletes=[assignment_id])
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def conference_seat_assignments_bulk(request, event_id):
+    """Create, move and delete many seat assignments in one transaction.
+
+    Body: {create: [{guest, element, seat_number?}], move: [{id, element?, seat_number?}], delete: [id]}
+    Nothing is written if any item conflicts; conflicts are reported per item.
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    creates = request.data.get('create', [])
+    moves = request.data.get('move', [])
+    deletes = request.data.get('delete', [])
+    if not all(isinstance(items, list) for items in (creates, moves, deletes)):
+        return Response({'error': 'create, move and delete must be lists'}, status=status.HTTP_400_BAD_REQUEST)
+    errors = [
+        {'op': op, 'index': index, 'errors': ['item must be an object']}
+        for op, items in (('create', creates), ('move', moves))
+        for index, item in enumerate(items) if not isinstance(item, dict)
+    ]
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    guest_ids = {parse_uuid(item.get('guest')) for item in creates} - {None}
+    plan, conflicts = SeatAssignmentBatch.write(event, guest_ids=guest_ids, creates=creates, moves=moves, deletes=deletes)
+    if conflicts:
+        return Response({'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+
+    bump_generation(event)
+    result = {
+        'created': ConferenceSeatAssignmentSerializer(plan['create'], many=True).data,
+        'moved': ConferenceSeatAssignmentSerializer(plan['move'], many=True).data,
+        'deleted': [str(a.id) for a in plan['delete']],
+    }
+    publish_assignments(event, upserts=[*result['created'], *result['moved']], deletes=result['deleted'])
+    return Response(result)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def conference_seat_assignments_auto(request, event_id):
+    """Automatically seat guests at tables, keeping groups together and balancing table fill.
+
+    Body: {dry_run?: bool, reseat_all?: bool, pinned?: [guest_id]}
+    Existing assignments are kept unless reseat_all is set, in which case only `pinned` guests keep their seats.
+    """
+    event = get_object_or_404(ConferenceEvent, id=event_id, user=request.user)
+    dry_run, dry_run_error = parse_flag(request.data, 'dry_run')
+    reseat_all, reseat_error = parse_flag(request.data, 'reseat_all')
+    pinned_raw = request.data.get('pinned', [])
+    if dry_run_error or reseat_error:
+        return Response({'error': dry_run_error or reseat_error}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(pinned_raw, list):
+        return Response({'error': 'pinned must be a list of guest ids'}, status=status.HTTP_400_BAD_REQUEST)
+    pinned_ids = {parse_uuid(guest_id) for guest_id in pinned_raw}
+    if None in pinned_ids:
+        invalid = [str(guest_id) for guest_id in pinned_raw if parse_uuid(guest_id) is None]
+        return Response({'error': f"pinned contains invalid guest ids: {', '.join(invalid)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    # Seating is read under the event's seating lock, so no other batch writes between solve and save
+    try:
+        with transaction.atomic():
+            if not dry_run:
+                lock_seating(event)
+            tables = {
+                element_id: (label, seats)
+                for element_id, label, seats in ConferenceElement.objects.filter(
+                    event=event, element_type__in=ConferenceElement.TABLE_TYPES, seats__gt=0
+                ).values_list('id', 'label', 'seats')
+            }
+            guests = {
+                guest_id: (name, group_id)
+                for guest_id, name, group_id in ConferenceGuest.objects.filter(event=event).values_list('id', 'name', 'group_id')
+            }
+            existing = ConferenceSeatAssignment.objects.filter(event=event).values_list('guest_id', 'element_id', 'seat_number')
+            pinned = {
+                guest_id: (element_id, seat_number)
+                for guest_id, element_id, seat_number in existing
+                if not reseat_all or guest_id in pinned_ids
+            }
+
+            problem = {
+                'tables': [(element_id, seats) for element_id, (_, seats) in tables.items()],
+                'guests': [(guest_id, group_id) for guest_id, (_, group_id) in guests.items() if guest_id not in pinned],
+                'pinned': pinned,
+                'groups': {guest_id: group_id for guest_id, (_, group_id) in guests.items()},
+            }
+            result = solve_best(problem)
+
+            if not dry_run:
+                if reseat_all:
+                    ConferenceSeatAssignment.objects.filter(event=event).exclude(guest_id__in=list(pinned)).delete()
+                ConferenceSeatAssignment.objects.bulk_create([
+                    ConferenceSeatAssignment(event=event, guest_id=guest_id, element_id=element_id, seat_number=seat_number)
+                    for guest_id, (element_id, seat_number) in result['assignments'].items()
+                ])
+    except IntegrityError:
+        return Response({'conflicts': [CONCURRENT_CONFLICT]}, status=status.HTTP_409_CONFLICT)
+
+    if not dry_run:
+        bump_generation(event)
+        publish_assignments(event, reload=True)
+
+    return Response({
+        'dry_run': dry_run,
+        'assignments': [
+            {
+                'guest': str(guest_id),
+                'guest_name': guests[guest_id][0],
+                'element': str(element_id),
+                'element_label': tables[element_id][0],
+                'seat_number': seat_number,
+            }
+            for guest_id, (element_id, seat_number) in result['assignments'].items()
+        ],
+        'unseated': [str(guest_id) for guest_id in result['unseated']],
+        'split_groups': result['split_groups'],
+        'imbalance': round(result['imbalance'], 4),
+    }, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
 # ========================================== Public Share Views ==========================================
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes(PUBLIC_THROTTLES)
 def conference_shared_view(request, share_token):
     """Public endpoint to view shared conference event data (no authentication required)"""
     event = get_object_or_404(ConferenceEvent, share_token=share_token)
-    
+    # Rebuilt only after a write to the event (see api.invalidation)
+    return Response(snapshots.get(event_key(event), 'shared', lambda: conference_snapshot(event)))
+
+
+def conference_snapshot(event):
+    """Public read-only view of an event: details, elements and guests"""
     # Get event details
     event_data = {
         'id': str(event.id),
@@ -390,8 +916,8 @@ def conference_shared_view(request, share_token):
     guests = ConferenceGuest.objects.filter(event=event).select_related('group').prefetch_related('seat_assignments')
     guests_data = ConferenceGuestSerializer(guests, many=True).data
     
-    return Response({
+    return {
         'event': event_data,
         'elements': elements_data,
         'guests': guests_data,
-    })
+    }
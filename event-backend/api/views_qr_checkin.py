@@ -3,7 +3,7 @@ QR Code Check-in Views
 Public API endpoints for QR code based check-in without authentication
 """
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
@@ -13,6 +13,8 @@ from .models import (
     ConferenceEvent, ConferenceGuest,
     TradeshowEvent, TradeshowVendor
 )
+from .realtime import publish_checkin
+from .throttling import PUBLIC_THROTTLES
 from .serializers import (
     ConferenceGuestSerializer,
     TradeshowVendorSerializer
@@ -21,6 +23,7 @@ from .serializers import (
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(PUBLIC_THROTTLES)
 def qr_checkin_conference(request, event_id, guest_id):
     """
     Public endpoint for QR code check-in of conference guests
@@ -44,16 +47,19 @@ def qr_checkin_conference(request, event_id, guest_id):
     guest.checked_in = True
     guest.check_in_time = timezone.now()
     guest.save()
+    data = ConferenceGuestSerializer(guest).data
+    publish_checkin(event, data)
     
     return Response({
         'success': True,
         'message': f'{guest.name} checked in successfully!',
-        'guest': ConferenceGuestSerializer(guest).data
+        'guest': data
     }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(PUBLIC_THROTTLES)
 def qr_checkin_tradeshow(request, event_id, vendor_id):
     """
     Public endpoint for QR code check-in of tradeshow vendors
@@ -77,16 +83,19 @@ def qr_checkin_tradeshow(request, event_id, vendor_id):
     vendor.checked_in = True
     vendor.check_in_time = timezone.now()
     vendor.save()
+    data = TradeshowVendorSerializer(vendor).data
+    publish_checkin(event, data)
     
     return Response({
         'success': True,
         'message': f'{vendor.name} checked in successfully!',
-        'vendor': TradeshowVendorSerializer(vendor).data
+        'vendor': data
     }, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes(PUBLIC_THROTTLES)
 def qr_guest_info(request, event_id, guest_id):
     """
     Public endpoint to get guest information by QR code
@@ -108,6 +117,7 @@ def qr_guest_info(request, event_id, guest_id):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes(PUBLIC_THROTTLES)
 def qr_vendor_info(request, event_id, vendor_id):
     """
     Public endpoint to get vendor information by QR code
@@ -0,0 +1,133 @@
+"""
+Real-time Views
+Live layout, assignment and check-in updates for one event, as Server-Sent Events or over a
+WebSocket. Both need the ASGI server (uvicorn clover.asgi:application): the SSE view is async, and
+WebSockets are routed by clover.asgi before Django sees them. Under WSGI the stream would hold a
+worker forever without sending anything, so it answers 501 there. Streams only see writes made in
+their own process unless REALTIME uses PostgresBroker, which every multi-process or multi-replica
+deployment needs. Browsers cannot set headers on EventSource or WebSocket requests, so the JWT may
+also be passed as ?token=.
+"""
+
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+
+from .authentication import user_from_token
+from .invalidation import owned_event_or_404
+from .models import ConferenceEvent, TradeshowEvent
+from .realtime import channel_name, frame_stream, get_broker
+
+EVENT_MODELS = {'conference': ConferenceEvent, 'tradeshow': TradeshowEvent}
+WEBSOCKET_PATH = re.compile(r'^/ws/(conference|tradeshow)/events/([0-9a-f-]{36})/$')
+
+
+def resolve_event(kind, event_id, token):
+    """The event if `token` belongs to its owner, else None"""
+    if not token:
+        return None
+    try:
+        user = user_from_token(token)
+    except exceptions.AuthenticationFailed:
+        return None
+    try:
+        return owned_event_or_404(EVENT_MODELS[kind], event_id, user)
+    except Http404:
+        return None
+
+
+def hello(event):
+    """First message of every stream: where the client's copy must be to apply what follows.
+
+    Read from the database after subscribing, so a write that lands while the stream is opening is
+    in this state, in the stream, or both - never in neither.
+    """
+    state = (type(event).objects.filter(pk=event.pk).values('layout_version', 'op_seq').first()
+             or {'layout_version': event.layout_version, 'op_seq': event.op_seq})
+    return {'type': 'hello', 'layout_version': state['layout_version'], 'seq': state['op_seq']}
+
+
+def request_token(request):
+    auth = request.headers.get('Authorization', '').split()
+    if len(auth) == 2 and auth[0].lower() == 'bearer':
+        return auth[1]
+    return request.GET.get('token')
+
+
+# ========================================== Server-Sent Events ==========================================
+async def layout_stream(request, kind, event_id):
+    """GET /api/<conference|tradeshow>/events/<id>/stream/ - text/event-stream of change frames"""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'Live updates need the ASGI server.'}, status=501)
+    event = await sync_to_async(resolve_event)(kind, event_id, request_token(request))
+    if event is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    async def events():
+        subscription = get_broker().subscribe(channel_name(event))
+        try:
+            yield f'event: hello\ndata: {json.dumps(await sync_to_async(hello)(event))}\n\n'
+            async for frame in frame_stream(subscription):
+                if frame is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield f"event: {frame['type']}\ndata: {json.dumps(frame, default=str)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+
+async def conference_event_stream(request, event_id):
+    return await layout_stream(request, 'conference', event_id)
+
+
+async def tradeshow_event_stream(request, event_id):
+    return await layout_stream(request, 'tradeshow', event_id)
+
+
+# ========================================== WebSocket ==========================================
+async def websocket_application(scope, receive, send):
+    """Raw ASGI WebSocket handler for /ws/<conference|tradeshow>/events/<id>/?token=<jwt>.
+
+    Server to client only: frames are JSON objects as in the SSE stream, plus {type: 'ping'}
+    heartbeats. Anything the client sends is ignored.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    match = WEBSOCKET_PATH.match(scope['path'])
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    event = await sync_to_async(resolve_event)(*match.groups(), token) if match else None
+    if event is None:
+        await send({'type': 'websocket.close', 'code': 4404 if match is None else 4403})
+        return
+
+    await send({'type': 'websocket.accept'})
+    subscription = get_broker().subscribe(channel_name(event))
+
+    async def sender():
+        await send({'type': 'websocket.send', 'text': json.dumps(await sync_to_async(hello)(event))})
+        async for frame in frame_stream(subscription):
+            await send({'type': 'websocket.send', 'text': json.dumps(frame or {'type': 'ping'}, default=str)})
+
+    async def until_disconnect():
+        while (await receive())['type'] != 'websocket.disconnect':
+            pass
+
+    tasks = [asyncio.ensure_future(sender()), asyncio.ensure_future(until_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        subscription.close()
+        for task in tasks:
+            task.cancel()
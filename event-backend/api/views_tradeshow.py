@@ -1,19 +1,39 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from django.db.models import Count
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from .models import (
     TradeshowEvent, TradeshowBooth, TradeshowVendor,
-    TradeshowBoothAssignment, TradeshowRoute
+    TradeshowBoothAssignment, TradeshowRoute, TradeshowLayoutOperation
 )
+from .booth_allocation import ALLOCATION_TIMEOUT, BOOTH_TYPE_RANK, WORKER_THRESHOLD, allocate
+from .booth_presets import PRESETS, generate_preset
+from .event_clone import clone_tradeshow_event, parse_clone_name
+from .geometry import Footprints
+from .invalidation import bump_generation, event_key, owned_event_or_404, search_results, snapshots
+from .layout_edits import (
+    LayoutSync, apply_transform, conditional_update, expected_version, parse_transform, parse_version, pose_data,
+    version_headers,
+)
+from .layout_ops import LayoutOpLog, compact_if_due, entry_data
+from .layout_validation import VALIDATION_MODES, has_violations, validation_headers, validate_tradeshow_layout
+from .pathfinding import WALKING_ROUTE_MAX_STOPS, route_paths
+from .realtime import publish_assignments, publish_checkin, publish_layout
+from .routing import optimize_booth_route
+from .spatial_index import booth_indexes, parse_bbox, parse_point
+from .throttling import PUBLIC_THROTTLES
+from .utils import parse_flag, parse_uuid
+from .workers import run_in_worker
 from .serializers import (
     TradeshowEventSerializer, TradeshowEventListSerializer,
     TradeshowBoothSerializer, TradeshowVendorSerializer,
     TradeshowBoothAssignmentSerializer, TradeshowRouteSerializer
 )
+from concurrent.futures import TimeoutError as FuturesTimeout
 import csv
 import io
 
@@ -53,7 +73,9 @@ def tradeshow_event_detail(request, event_id):
         serializer = TradeshowEventSerializer(event, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response(serializer.data)
+            if {'hall_width', 'hall_height'} & set(request.data):
+                event.bump_layout_version()
+            return Response(TradeshowEventSerializer(event).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
@@ -70,26 +92,110 @@ def tradeshow_event_share(request, event_id):
     return Response({'share_token': event.share_token})
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tradeshow_event_clone(request, event_id):
+    """Duplicate an event as a template: booths, vendors, booth assignments, routes and sessions.
+
+    Body: {name?}
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    name, error = parse_clone_name(request.data, TradeshowEvent)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    copy, counts = clone_tradeshow_event(event, request.user, name=name)
+    return Response({**TradeshowEventSerializer(copy).data, 'copied': counts}, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def tradeshow_event_apply_preset(request, event_id):
+    """List presets (GET) or lay the hall out from one (POST).
+
+    Body: {preset_id, hall_width?, hall_height?, replace?: bool (default true), dry_run?: bool}
+    With replace, every existing booth (and its vendor assignment) is removed first.
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    if request.method == 'GET':
+        return Response({'presets': list(PRESETS), 'current': event.preset_layout})
+
+    preset_id = request.data.get('preset_id')
+    dry_run, dry_run_error = parse_flag(request.data, 'dry_run')
+    replace, replace_error = parse_flag(request.data, 'replace', default=True)
+    if dry_run_error or replace_error:
+        return Response({'error': dry_run_error or replace_error}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        hall_width = float(request.data.get('hall_width', event.hall_width))
+        hall_height = float(request.data.get('hall_height', event.hall_height))
+        booths = generate_preset(preset_id, hall_width, hall_height)
+    except (TypeError, ValueError) as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if dry_run:
+        return Response({'dry_run': True, 'preset_id': preset_id, 'booths': booths})
+
+    with transaction.atomic():
+        removed = []
+        if replace:
+            removed = list(TradeshowBooth.objects.filter(event=event).values_list('id', flat=True))
+            TradeshowBooth.objects.filter(event=event).delete()
+        created = TradeshowBooth.objects.bulk_create([TradeshowBooth(event=event, **booth) for booth in booths])
+        event.preset_layout = preset_id
+        event.hall_width = hall_width
+        event.hall_height = hall_height
+        event.save(update_fields=['preset_layout', 'hall_width', 'hall_height', 'updated_at'])
+    event.bump_layout_version()
+    data = TradeshowBoothSerializer(created, many=True).data
+    booth_indexes.apply(event, upserts=data, deletes=removed)
+    publish_layout(event, upserts=data, deletes=removed)
+    return Response({
+        'dry_run': False,
+        'preset_id': preset_id,
+        'removed': len(removed),
+        'booths': data,
+    }, status=status.HTTP_201_CREATED)
+
+
 # ========================================== Tradeshow Booth Views ==========================================
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def tradeshow_booths(request, event_id):
     """List all booths for an event or create new ones"""
-    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    event = owned_event_or_404(TradeshowEvent, event_id, request.user)
 
     if request.method == 'GET':
         booths = TradeshowBooth.objects.filter(event=event).order_by('label')
+        if 'bbox' in request.query_params:
+            # Viewport query: only booths whose bounding boxes intersect the visible area
+            try:
+                bbox = parse_bbox(request.query_params['bbox'])
+            except ValueError:
+                return Response({'error': 'bbox must be min_x,min_y,max_x,max_y'}, status=status.HTTP_400_BAD_REQUEST)
+            booths = booths.filter(id__in=booth_indexes.for_event(event).query(bbox))
         serializer = TradeshowBoothSerializer(booths, many=True)
-        return Response(serializer.data)
+        # Log position the listing reflects - clients resume the operation log from here
+        return Response(serializer.data, headers={'X-Layout-Seq': str(event.op_seq)})
 
     # POST - create new booth
     serializer = TradeshowBoothSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(event=event)
+        event.bump_layout_version()
+        booth_indexes.apply(event, upserts=[serializer.data])
+        publish_layout(event, upserts=[serializer.data])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def booth_conflict(event, booth_id):
+    """409 for a write based on an outdated version, with the current row to merge against"""
+    current = TradeshowBooth.objects.filter(id=booth_id, event=event).first()
+    if current is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'error': 'Booth was changed by another edit', 'current': TradeshowBoothSerializer(current).data},
+                    status=status.HTTP_409_CONFLICT, headers=version_headers(current))
+
+
 @api_view(['GET', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def tradeshow_booth_detail(request, event_id, booth_id):
@@ -99,33 +205,61 @@ def tradeshow_booth_detail(request, event_id, booth_id):
 
     if request.method == 'GET':
         serializer = TradeshowBoothSerializer(booth)
-        return Response(serializer.data)
+        return Response(serializer.data, headers=version_headers(booth))
 
-    elif request.method == 'PATCH':
+    # Writes are conditional when the client sends If-Match: "<version>" (or a version field)
+    try:
+        expected = expected_version(request, request.data if request.method == 'PATCH' else None)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'PATCH':
         serializer = TradeshowBoothSerializer(booth, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+            if not conditional_update(booth, serializer.validated_data, expected):
+                return booth_conflict(event, booth_id)
+            event.bump_layout_version()
+            booth_indexes.apply(event, upserts=[serializer.data])
+            publish_layout(event, upserts=[serializer.data])
+            return Response(serializer.data, headers=version_headers(booth))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
-        booth.delete()
+        rows = TradeshowBooth.objects.filter(id=booth_id, event=event)
+        if expected is not None:
+            rows = rows.filter(version=expected)
+        if not rows.delete()[0]:
+            return booth_conflict(event, booth_id)
+        event.bump_layout_version()
+        booth_indexes.apply(event, deletes=[booth_id])
+        publish_layout(event, deletes=[booth_id])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@transaction.atomic
 def tradeshow_booths_bulk(request, event_id):
     """Bulk create/update booths - only creates new booths, doesn't delete existing ones"""
     event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
     booths_data = request.data.get('booths', [])
+    mode = request.data.get('validation', 'report')
+    if mode not in VALIDATION_MODES:
+        return Response({'error': f"validation must be one of {', '.join(VALIDATION_MODES)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
 
     created_booths = []
-    for booth_data in booths_data:
+    conflicts = []
+    for index, booth_data in enumerate(booths_data):
         booth_data['event'] = str(event.id)
         
         # Check if booth has an ID (if it's a valid UUID, try to update; otherwise create new)
         booth_id = booth_data.get('id')
+        try:
+            expected = parse_version(booth_data.get('version'))
+        except ValueError as exc:
+            transaction.set_rollback(True)
+            return Response({'version': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
         if booth_id:
             try:
                 # Try to get existing booth
@@ -133,9 +267,14 @@ def tradeshow_booths_bulk(request, event_id):
                 # Update existing booth
                 serializer = TradeshowBoothSerializer(existing_booth, data=booth_data, partial=True)
                 if serializer.is_valid():
-                    booth = serializer.save()
-                    created_booths.append(serializer.data)
+                    # Items carrying the version they were read at are only written if it is still current
+                    if conditional_update(existing_booth, serializer.validated_data, expected):
+                        created_booths.append(serializer.data)
+                    else:
+                        conflicts.append({'index': index, 'id': str(booth_id),
+                                          'errors': ['changed by another edit; reload and retry']})
                 else:
+                    transaction.set_rollback(True)
                     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             except (TradeshowBooth.DoesNotExist, ValueError):
                 # Booth doesn't exist or invalid UUID, create new one
@@ -145,6 +284,7 @@ def tradeshow_booths_bulk(request, event_id):
                     booth = serializer.save(event=event)
                     created_booths.append(serializer.data)
                 else:
+                    transaction.set_rollback(True)
                     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         else:
             # No ID provided, create new booth
@@ -153,12 +293,190 @@ def tradeshow_booths_bulk(request, event_id):
                 booth = serializer.save(event=event)
                 created_booths.append(serializer.data)
             else:
+                transaction.set_rollback(True)
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    return Response(created_booths, status=status.HTTP_201_CREATED)
+    if conflicts:
+        current = dict(TradeshowBooth.objects.filter(event=event, id__in=[c['id'] for c in conflicts])
+                       .values_list('id', 'version'))
+        for conflict in conflicts:
+            conflict['version'] = current.get(parse_uuid(conflict['id']))
+        transaction.set_rollback(True)
+        return Response({'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+
+    headers = {}
+    if mode != 'off':
+        # Only pairs touching the submitted items are reported, so untouched legacy layouts stay quiet
+        report = validate_tradeshow_layout(event, focus={item['id'] for item in created_booths})
+        if mode == 'strict' and has_violations(report):
+            transaction.set_rollback(True)
+            return Response({'error': 'Layout validation failed', 'validation': report},
+                            status=status.HTTP_400_BAD_REQUEST)
+        headers = validation_headers(report)
+
+    event.bump_layout_version()
+    booth_indexes.apply(event, upserts=created_booths)
+    publish_layout(event, upserts=created_booths)
+    return Response(created_booths, status=status.HTTP_201_CREATED, headers=headers)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@transaction.atomic
+def tradeshow_booths_sync(request, event_id):
+    """Replace the stored layout with the submitted one, writing only the difference.
+
+    Body: {booths: [booth], validation?: 'report' | 'strict' | 'off', dry_run?: bool}
+    Booths without a known id are created, stored booths missing from the list are deleted and
+    changed booths are updated. Unchanged booths are detected by content hash and never written.
+    Items carrying the version they were read at get 409 conflicts once the stored row moved on.
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    items = request.data.get('booths')
+    if not isinstance(items, list):
+        return Response({'error': 'booths must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+    mode = request.data.get('validation', 'report')
+    if mode not in VALIDATION_MODES:
+        return Response({'error': f"validation must be one of {', '.join(VALIDATION_MODES)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    dry_run, error = parse_flag(request.data, 'dry_run')
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    sync = LayoutSync(event, TradeshowBoothSerializer)
+    plan, errors, conflicts = sync.plan(items)
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    if conflicts:
+        return Response({'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+    changed = plan['create'] or plan['update'] or plan['delete']
+    if dry_run or not changed:
+        return Response({**sync.result(plan), 'dry_run': dry_run})
+
+    sync.apply(plan)
+    result = sync.result(plan)
+    headers = {}
+    if mode != 'off':
+        touched = {item['id'] for item in result['created']} | {item['id'] for item in result['updated']}
+        report = validate_tradeshow_layout(event, focus=touched)
+        if mode == 'strict' and has_violations(report):
+            transaction.set_rollback(True)
+            return Response({'error': 'Layout validation failed', 'validation': report},
+                            status=status.HTTP_400_BAD_REQUEST)
+        headers = validation_headers(report)
+
+    event.bump_layout_version()
+    booth_indexes.apply(event, upserts=[*result['created'], *result['updated']], deletes=result['deleted'])
+    publish_layout(event, upserts=[*result['created'], *result['updated']], deletes=result['deleted'])
+    return Response({**result, 'dry_run': False}, headers=headers)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tradeshow_booths_validate(request, event_id):
+    """Report overlapping booths and clearance violations across the whole layout"""
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    return Response(validate_tradeshow_layout(event))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tradeshow_booths_nearest(request, event_id):
+    """Closest booths to a canvas point, nearest first.
+
+    Query: ?x=&y=&k=1&type=booth_type[,booth_type...]
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    try:
+        x, y = parse_point(request.query_params)
+        k = min(max(int(request.query_params.get('k', 1)), 1), 100)
+    except (KeyError, ValueError):
+        return Response({'error': 'x and y are required numbers, k an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    types = set(request.query_params['type'].split(',')) if request.query_params.get('type') else None
+
+    found = booth_indexes.for_event(event).nearest(x, y, k=k, types=types)
+    booths = {str(item.id): item for item in TradeshowBooth.objects.filter(id__in=[item_id for item_id, _ in found])}
+    return Response([
+        {**TradeshowBoothSerializer(booths[item_id]).data, 'distance': round(distance, 2)}
+        for item_id, distance in found if item_id in booths
+    ])
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tradeshow_booths_transform(request, event_id):
+    """Move, rotate and/or scale a selection of booths in one request.
+
+    Body: {ids: [id], translate?: [dx, dy], rotate?: degrees, scale?: factor, pivot?: [x, y]}
+    Rotation and scaling happen about the pivot (default: centre of the selection), then the
+    translation is applied. Only the booths whose geometry changed are returned.
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    try:
+        ids, params = parse_transform(request.data)
+    except (TypeError, ValueError) as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        pivot, changed, missing = apply_transform(
+            TradeshowBooth.objects.filter(event=event), ids, **params,
+            bounds=(float(event.hall_width), float(event.hall_height)),
+        )
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if missing:
+        return Response({'error': 'Some booths were not found', 'missing': missing}, status=status.HTTP_400_BAD_REQUEST)
+
+    data = [pose_data(item, 'booth_type') for item in changed]
+    if changed:
+        event.bump_layout_version()
+        booth_indexes.apply(event, upserts=data)
+        publish_layout(event, upserts=data)
+    return Response({'pivot': [round(pivot[0], 2), round(pivot[1], 2)], 'booths': data})
 
 
 # ========================================== Tradeshow Vendor Views ==========================================
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def tradeshow_layout_ops(request, event_id):
+    """Read or append to the event's layout operation log.
+
+    GET ?since=N&limit=M - entries after seq N; {reset: true} means reload the layout instead
+    POST {ops: [{op: add|move|update|delete, id?, data?, version?}], client_id?} - applied in order, all or
+        nothing; ops carrying the row version they were made against get 409 conflicts once it moved on
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    log = LayoutOpLog(event, TradeshowBoothSerializer, TradeshowLayoutOperation)
+
+    if request.method == 'GET':
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = min(max(int(request.query_params.get('limit', 1000)), 1), 1000)
+            if since < 0:
+                raise ValueError('since must not be negative')
+            tail = log.since(since, limit)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**tail, 'ops': [entry_data(entry) for entry in tail['ops']]})
+
+    # POST - append a batch
+    ops = request.data.get('ops')
+    if not isinstance(ops, list) or not ops:
+        return Response({'error': 'ops must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    plan, logged, errors, conflicts = log.write(ops, client_id=str(request.data.get('client_id', ''))[:64])
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+    if conflicts:
+        return Response({'conflicts': conflicts}, status=status.HTTP_409_CONFLICT)
+
+    upserts = [pose_data(item, 'booth_type') for item in [*plan['create'], *plan['update']]]
+    booth_indexes.apply(event, upserts=upserts, deletes=plan['delete'])
+    publish_layout(event, upserts=TradeshowBoothSerializer([*plan['create'], *plan['update']], many=True).data, deletes=plan['delete'])
+    compact_if_due(event, TradeshowLayoutOperation)
+    return Response({'seq': event.op_seq, 'ops': [entry_data(entry) for entry in logged]},
+                    status=status.HTTP_201_CREATED)
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def tradeshow_vendors(request, event_id):
@@ -198,6 +516,7 @@ def tradeshow_vendor_detail(request, event_id, vendor_id):
 
     elif request.method == 'DELETE':
         vendor.delete()
+        bump_generation(event)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -258,25 +577,28 @@ def tradeshow_vendor_checkin(request, event_id, vendor_id):
     vendor.save()
 
     serializer = TradeshowVendorSerializer(vendor)
+    publish_checkin(event, serializer.data)
     return Response(serializer.data)
 
 
 @api_view(['GET'])
+@throttle_classes(PUBLIC_THROTTLES)
 def tradeshow_vendor_search(request, event_id):
     """Public endpoint to search vendors by company name for kiosk check-in"""
     query = request.query_params.get('q', '').strip()
     if not query:
         return Response({'error': 'Query parameter required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    event = get_object_or_404(TradeshowEvent, id=event_id)
-
-    vendors = TradeshowVendor.objects.filter(
-        event=event,
-        company_name__icontains=query
-    )
+    def search():
+        event = get_object_or_404(TradeshowEvent, id=event_id)
+        vendors = TradeshowVendor.objects.filter(
+            event=event,
+            company_name__icontains=query
+        )
+        return TradeshowVendorSerializer(vendors[:10], many=True).data
 
-    serializer = TradeshowVendorSerializer(vendors[:10], many=True)
-    return Response(serializer.data)
+    # Kiosks repeat the same few prefixes; results live until the event's vendors change
+    return Response(search_results.get(event_key(TradeshowEvent, event_id), query.lower(), search))
 
 
 # ========================================== Tradeshow Booth Assignment Views ==========================================
@@ -295,6 +617,7 @@ def tradeshow_booth_assignments(request, event_id):
     serializer = TradeshowBoothAssignmentSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(event=event)
+        publish_assignments(event, upserts=[serializer.data])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -306,9 +629,79 @@ def tradeshow_booth_assignment_detail(request, event_id, assignment_id):
     event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
     assignment = get_object_or_404(TradeshowBoothAssignment, id=assignment_id, event=event)
     assignment.delete()
+    bump_generation(event)
+    publish_assignments(event, deletes=[assignment_id])
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tradeshow_booth_assignments_auto(request, event_id):
+    """Allocate free booths to unassigned vendors by size preference, clustering vendor categories.
+
+    Body: {dry_run?: bool}. Existing assignments are kept and anchor their category's cluster.
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    dry_run, error = parse_flag(request.data, 'dry_run')
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    booths = list(TradeshowBooth.objects.filter(event=event, booth_type__in=BOOTH_TYPE_RANK))
+    centers = Footprints.from_rows(booths).centers()
+    center_of = {booth.id: tuple(center) for booth, center in zip(booths, centers.tolist())}
+    existing = list(TradeshowBoothAssignment.objects.filter(event=event).values_list('booth_id', 'vendor_id', 'vendor__category'))
+    taken_booths = {booth_id for booth_id, _, _ in existing}
+    taken_vendors = {vendor_id for _, vendor_id, _ in existing}
+    vendors = TradeshowVendor.objects.filter(event=event).exclude(id__in=taken_vendors).order_by('created_at')
+
+    problem = {
+        'booths': [
+            (booth.id, booth.booth_type, *center_of[booth.id], float(booth.height * booth.scale_y))
+            for booth in booths if booth.id not in taken_booths
+        ],
+        'vendors': [(v.id, v.booth_size_preference, v.category) for v in vendors],
+        'anchors': [
+            (category, *center_of[booth_id])
+            for booth_id, _, category in existing if category and booth_id in center_of
+        ],
+    }
+    try:
+        if len(problem['booths']) >= WORKER_THRESHOLD:
+            result = run_in_worker(allocate, problem, timeout=ALLOCATION_TIMEOUT)
+        else:
+            result = allocate(problem)
+    except FuturesTimeout:
+        return Response({'error': 'allocation took too long; try again shortly'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    assignments = [
+        TradeshowBoothAssignment(event=event, vendor_id=vendor_id, booth_id=booth_id)
+        for vendor_id, booth_id in result['assignments']
+    ]
+    if not dry_run and assignments:
+        # Allocation ran without locks: save only if none of its booths or vendors was taken meanwhile
+        changed = {'error': 'booth assignments changed during allocation; reload and retry'}
+        try:
+            with transaction.atomic():
+                list(TradeshowEvent.objects.select_for_update(no_key=True).filter(pk=event.pk).values_list('pk'))
+                if TradeshowBoothAssignment.objects.filter(event=event).exclude(booth_id__in=taken_booths).exists():
+                    return Response(changed, status=status.HTTP_409_CONFLICT)
+                TradeshowBoothAssignment.objects.bulk_create(assignments)
+        except IntegrityError:
+            return Response(changed, status=status.HTTP_409_CONFLICT)
+        bump_generation(event)
+        publish_assignments(event, reload=True)
+
+    return Response({
+        'dry_run': dry_run,
+        'assignments': [
+            {'vendor': str(a.vendor_id), 'booth': str(a.booth_id)} for a in assignments
+        ],
+        'unassigned': [str(vendor_id) for vendor_id in result['unassigned']],
+        'match_cost': result['match_cost'],
+    }, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
 # ========================================== Tradeshow Route Views ==========================================
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
@@ -324,8 +717,14 @@ def tradeshow_routes(request, event_id):
     # POST - create new route
     serializer = TradeshowRouteSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save(event=event, created_by=request.user.id)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        fields = {}
+        if serializer.validated_data.get('route_type', 'auto') == 'auto':
+            try:
+                fields['booth_order'], _ = optimize_booth_route(event, serializer.validated_data['booth_order'] or [])
+            except ValueError as exc:
+                return Response({'booth_order': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        route = serializer.save(event=event, created_by=request.user.id, **fields)
+        return Response(TradeshowRouteSerializer(route).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -343,22 +742,83 @@ def tradeshow_route_detail(request, event_id, route_id):
     elif request.method == 'PATCH':
         serializer = TradeshowRouteSerializer(route, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+            fields = {}
+            route_type = serializer.validated_data.get('route_type', route.route_type)
+            if route_type == 'auto' and ('booth_order' in request.data or 'route_type' in request.data):
+                booth_order = serializer.validated_data.get('booth_order', route.booth_order)
+                try:
+                    fields['booth_order'], _ = optimize_booth_route(event, booth_order or [])
+                except ValueError as exc:
+                    return Response({'booth_order': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+            route = serializer.save(**fields)
+            return Response(TradeshowRouteSerializer(route).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == 'DELETE':
         route.delete()
+        bump_generation(event)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tradeshow_route_optimize(request, event_id):
+    """Compute a short visiting order for a set of booths without saving a route.
+
+    Body: {booth_ids: [id], start?: booth_id, metric?: 'straight' | 'walking'}
+    """
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    booth_ids = request.data.get('booth_ids', [])
+    if not isinstance(booth_ids, list):
+        return Response({'error': 'booth_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+
+    metric = request.data.get('metric', 'straight')
+    if metric not in ('straight', 'walking'):
+        return Response({'error': "metric must be 'straight' or 'walking'"}, status=status.HTTP_400_BAD_REQUEST)
+    if metric == 'walking' and len(booth_ids) > WALKING_ROUTE_MAX_STOPS:
+        return Response(
+            {'error': f'walking metric supports at most {WALKING_ROUTE_MAX_STOPS} booths'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        booth_order, length = optimize_booth_route(event, booth_ids, start=request.data.get('start'), metric=metric)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    except FuturesTimeout:
+        return Response({'error': 'walking distances took too long; try again shortly or use the straight metric'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response({'booth_order': booth_order, 'distance': round(length, 2), 'metric': metric})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tradeshow_route_path(request, event_id, route_id):
+    """Obstacle-aware walking polylines for each leg of a route"""
+    event = get_object_or_404(TradeshowEvent, id=event_id, user=request.user)
+    route = get_object_or_404(TradeshowRoute, id=route_id, event=event)
+    try:
+        return Response(route_paths(event, route.booth_order or []))
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    except FuturesTimeout:
+        return Response({'error': 'walking paths took too long; try again shortly'},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
 # ========================================== Public Share Views ==========================================
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@throttle_classes(PUBLIC_THROTTLES)
 def tradeshow_shared_view(request, share_token):
     """Public endpoint to view shared tradeshow event data (no authentication required)"""
     event = get_object_or_404(TradeshowEvent, share_token=share_token)
-    
+    # Rebuilt only after a write to the event (see api.invalidation)
+    return Response(snapshots.get(event_key(event), 'shared', lambda: tradeshow_snapshot(event)))
+
+
+def tradeshow_snapshot(event):
+    """Public read-only view of an event: details, booths, vendors and routes"""
     # Get event details
     event_data = {
         'id': str(event.id),
@@ -383,9 +843,9 @@ def tradeshow_shared_view(request, share_token):
     routes = TradeshowRoute.objects.filter(event=event).order_by('created_at')
     routes_data = TradeshowRouteSerializer(routes, many=True).data
     
-    return Response({
+    return {
         'event': event_data,
         'booths': booths_data,
         'vendors': vendors_data,
         'routes': routes_data,
-    })
+    }
@@ -0,0 +1,43 @@
+"""
+Shared process pool for CPU-heavy planning work (seating, allocation, layout search)
+Tasks must be plain functions over picklable data - no ORM access inside workers.
+
+Workers are spawned, not forked: the web process runs threads (request threads, realtime and
+invalidation listeners), and a forked child can inherit a lock some other thread was holding.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+_executor = None
+
+
+def cpu_count():
+    return os.cpu_count() or 1
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=min(4, cpu_count()), mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def run_in_worker(fn, *args, timeout=None):
+    """Run fn(*args) in the pool and wait for it; runs inline (without a timeout) on single-core hosts.
+
+    Raises concurrent.futures.TimeoutError after `timeout` seconds; the task itself still finishes.
+    """
+    if cpu_count() < 2:
+        return fn(*args)
+    return get_executor().submit(fn, *args).result(timeout=timeout)
+
+
+def map_in_workers(fn, *iterables):
+    """Parallel map over the pool; runs inline on single-core hosts"""
+    if cpu_count() < 2:
+        return list(map(fn, *iterables))
+    return list(get_executor().map(fn, *iterables))
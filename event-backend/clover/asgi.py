@@ -2,6 +2,8 @@
 ASGI config for clover project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP goes to Django; WebSocket connections (live layout updates) go to
+api.views_realtime.websocket_application.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clover.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api.views_realtime import websocket_application  # noqa: E402 - needs the app registry loaded above
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -151,6 +152,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # 2. 中间件头部插入
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.AdmissionControlMiddleware',
     *MIDDLEWARE,
 ]
 
@@ -162,6 +164,11 @@ if not CORS_ALLOW_ALL_ORIGINS:
     CORS_ALLOWED_ORIGINS = os.getenv(
         'CORS_ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
 
+# Headers the frontend may read from cross-origin responses
+CORS_EXPOSE_HEADERS = ['X-Layout-Overlaps', 'X-Layout-Clearance-Violations', 'X-Layout-Seq', 'ETag']
+# Request headers beyond the defaults: If-Match carries row versions for optimistic concurrency
+CORS_ALLOW_HEADERS = (*default_headers, 'if-match')
+
 # 4. REST 框架默认配置
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -172,6 +179,9 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
+    # Proxies in front of Django that append to X-Forwarded-For; throttles key on the client
+    # address they saw. 0 = use REMOTE_ADDR only (direct / runserver)
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
 # 5. 媒体文件目录
@@ -202,3 +212,71 @@ LOGGING = {
         },
     },
 }
+
+# 7. 缓存 - 多 worker / 多 pod 部署时请配置共享缓存 (e.g. django.core.cache.backends.redis.RedisCache)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# 8. 公共接口限流 (token bucket) - BACKEND: 'cache' 跨 worker 共享, 'memory' 仅当前进程
+PUBLIC_RATE_LIMIT = {
+    'ENABLED': os.getenv('RATE_LIMIT_ENABLED', 'True') == 'True',
+    'BACKEND': os.getenv('RATE_LIMIT_BACKEND', 'cache'),
+    'RATES': {
+        'ip': {'capacity': 30, 'refill_rate': 5.0},
+        'event': {'capacity': 200, 'refill_rate': 40.0},
+    },
+}
+
+# 9. 请求准入控制 - 按类别限制并发, 优先保证签到请求 (check-in > interactive > bulk/export)
+ADMISSION_CONTROL = {
+    'ENABLED': os.getenv('ADMISSION_CONTROL_ENABLED', 'True') == 'True',
+    'LIMITS': {'checkin': None, 'interactive': 32, 'bulk': 4},
+    'QUEUE_TIMEOUT': {'interactive': 2.0, 'bulk': 5.0},
+    'CHECKIN_PRESSURE': 8,
+    'RETRY_AFTER': 5,
+}
+
+# 10. 布局校验 - 固体元素之间的最小净距 (米); bulk 保存时按 validation 参数 report/strict/off 执行
+LAYOUT_VALIDATION = {
+    'CLEARANCE': {'conference': 0.9, 'tradeshow': 1.2},
+}
+
+# 11. 布局操作日志 - 每个活动至少保留最新 RETAIN_OPS 条, 且不压缩 MIN_AGE_MINUTES 内的操作; 由 compact_layout_ops 定期压缩
+LAYOUT_OPS = {
+    'RETAIN_OPS': int(os.getenv('LAYOUT_OPS_RETAIN', '1000')),
+    'MIN_AGE_MINUTES': int(os.getenv('LAYOUT_OPS_MIN_AGE_MINUTES', '60')),
+    'COMPACT_AT': 5000,
+}
+
+# 12. 实时推送 (SSE / WebSocket, 需 ASGI 服务器 uvicorn) - BACKEND: InMemoryBroker 仅当前进程, PostgresBroker 经 LISTEN/NOTIFY 跨 pod; 多进程或多副本部署必须用 PostgresBroker
+REALTIME = {
+    'BACKEND': os.getenv('REALTIME_BACKEND', 'api.realtime.InMemoryBroker'),
+    'COALESCE_MS': 50,
+    'QUEUE_SIZE': 1000,
+    'HEARTBEAT_SECONDS': 20,
+}
+
+# 13. 缓存失效总线 - 各 worker 的进程内缓存按活动 generation 失效; BACKEND: LocalBus 仅当前进程 (不启用缓存), CacheBus 经共享缓存轮询 (POLL_SECONDS, LocMemCache 时不启用缓存), PostgresBus 经 LISTEN/NOTIFY; 使用 PostgreSQL 时默认 PostgresBus
+INVALIDATION_BUS = {
+    'BACKEND': os.getenv('INVALIDATION_BUS_BACKEND', 'api.invalidation.PostgresBus'
+                         if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+                         else 'api.invalidation.LocalBus'),
+    'POLL_SECONDS': float(os.getenv('INVALIDATION_BUS_POLL_SECONDS', '1.0')),
+}
+
+# 14. 设计版本存储 - 关键帧 + 结构化增量; 每 KEYFRAME_INTERVAL 个版本 (或增量不够小时) 存一次完整 JSON
+DESIGN_VERSIONS = {
+    'KEYFRAME_INTERVAL': 20,
+    'KEYFRAME_RATIO': 0.5,
+    'CACHE_SIZE': 128,
+}
+
+# 15. 设计版本保留 - 按年龄分层: 1 天内全部保留, 1 周内每小时保留最新一个, 更早每天保留最新一个; 带备注的版本和最新版本始终保留; 由 compact_design_versions 定期压缩
+DESIGN_RETENTION = {
+    'TIERS': [(24, None), (24 * 7, 1), (None, 24)],
+    'KEEP_NOTED': True,
+}